@@ -0,0 +1,39 @@
+import argparse
+import sys
+import time
+
+from src import config
+from src.common import dates
+from src.infrastructure.database.advisory_lock import AdvisoryLock
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replaces the stored next actions of the devices that already passed, '
+                                                 'without pushing them. It refuses to run along with '
+                                                 'dispatch_scheduled_actions.py, which already does it')
+    parser.add_argument('--batch-size', type=int, default=config.NEXT_ACTIONS_ADVANCE_BATCH_SIZE,
+                        help='Next actions replaced by each transaction')
+    parser.add_argument('--interval', type=float, default=0,
+                        help=f'Seconds between passes, e.g. {config.NEXT_ACTIONS_ADVANCE_INTERVAL}. '
+                             f'0 runs a single pass')
+    args = parser.parse_args()
+    repository = DeviceSchedulerPGRepository()
+    # The actions advanced here are not pushed, so they would never reach the devices served by a dispatcher
+    lock = AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY)
+    while True:
+        if not lock.acquire(wait=False):
+            sys.exit('A scheduled actions dispatcher is running, which already advances the next actions')
+        try:
+            start_time = time.perf_counter()
+            advanced = 0
+            while True:
+                batch_advanced = len(repository.advance_next_scheduling_actions(dates.now(), args.batch_size))
+                advanced += batch_advanced
+                if batch_advanced < args.batch_size:
+                    break
+        finally:
+            lock.release()
+        print(f'Advanced {advanced} next actions in {time.perf_counter() - start_time:.2f} seconds')
+        if not args.interval:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Tuple
+
+from src import config
+from src.infrastructure.database.db_migrator import DBMigrator
+
+BENCHMARK_DB_NAME = 'devices_management_benchmark'
+
+
+@contextmanager
+def benchmark_database() -> Iterator[DBMigrator]:
+    """
+    Creates a migrated database only for the benchmark and drops it when finished
+    """
+    config.DB_NAME = BENCHMARK_DB_NAME
+    migrator = DBMigrator()
+    migrator.run_migrations()
+    try:
+        yield migrator
+    finally:
+        migrator.drop_db()
+
+
+def measure_time(func: Callable, repetitions: int = 1) -> Tuple[float, object]:
+    """
+    Returns the mean seconds taken by func and the result of its last execution
+    """
+    result = None
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = func()
+    return (time.perf_counter() - start) / repetitions, result
+
+
+def print_table(headers: list, rows: list) -> None:
+    widths = [max(len(str(x)) for x in column) for column in zip(headers, *rows)]
+    print(' | '.join(str(x).rjust(width) for x, width in zip(headers, widths)))
+    print('-+-'.join('-' * width for width in widths))
+    for row in rows:
+        print(' | '.join(str(x).rjust(width) for x, width in zip(row, widths)))
@@ -0,0 +1,158 @@
+"""
+Load test of the device events streams. Many simulated devices connect to one ASGI worker, which is driven in-process
+(the server would only add the sockets), and the test measures the connection rate, the memory held by each idle
+stream, the delay to deliver the instant actions pushed meanwhile and the event loop lag while the streams heartbeat
+Usage: python -m benchmarks.device_events_load_test [devices] [pushes]
+"""
+import asyncio
+import random
+import resource
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from benchmarks.benchmark_utils import benchmark_database, print_table
+from src import config
+from src.app import api
+from src.app.asgi_app import AsgiApp
+from src.app.container import Container
+from src.app.utils.auth.device_token import DeviceToken
+from src.common import dates
+from src.domain.models.device import Device
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.models.user import User
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+DEFAULT_DEVICES = 10_000
+DEFAULT_PUSHES = 1_000
+PUSHES_BATCH_SIZE = 100
+HEARTBEAT_INTERVAL = 1  # Seconds, shorter than the configured one so the idle phase does not take long
+IDLE_TIME = 5  # Seconds
+LAG_PROBE_INTERVAL = 0.01  # Seconds
+
+
+class SimulatedDevice:
+
+    def __init__(self, device_id: str, user_id: str) -> None:
+        self.device_id = device_id
+        self._token = DeviceToken(device_id=device_id, user_id=user_id, timestamp=dates.now()).encode()
+        self.connected = asyncio.Event()
+        self.instant_action_received = asyncio.Event()
+        self.heartbeats = 0
+        self._requested = False
+        self._disconnected = asyncio.Event()
+
+    async def connect(self, app: AsgiApp) -> None:
+        await app({
+            'type': 'http', 'method': 'GET', 'path': f'/api/deviceevents/stream/{self.device_id}',
+            'headers': [(b'authorization', f'Bearer {self._token}'.encode('latin-1'))], 'query_string': b''
+        }, self._receive, self._send)
+
+    def disconnect(self) -> None:
+        self._disconnected.set()
+
+    async def _receive(self) -> dict:
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self._disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def _send(self, message: dict) -> None:
+        body = message.get('body', b'')
+        if body == b':\n\n':
+            self.heartbeats += 1
+        elif body.startswith(b'event: next_action'):
+            self.connected.set()
+        elif body.startswith(b'event: instant_action'):
+            self.instant_action_received.set()
+
+
+def create_devices(count: int) -> Tuple[str, List[str]]:
+    user = User(username='benchmark', email='benchmark@benchmark.com', password='Benchmark1')
+    UserPGRepository().create(user)
+    device_repository = DevicePGRepository()
+    device_ids = []
+    for _ in range(count):
+        device = Device(name='benchmark')
+        device_repository.create(device, user.user_id)
+        device_ids.append(device.device_id)
+    return user.user_id, device_ids
+
+
+async def push_instant_action(device: SimulatedDevice, user_id: str) -> float:
+    pusher = Container.get_instance().instant_action_pusher
+    device.instant_action_received.clear()
+    start = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(
+        None, lambda: pusher.push(device.device_id, user_id, TaskAction.TURN_DEVICE_ON))
+    await device.instant_action_received.wait()
+    return time.perf_counter() - start
+
+
+async def measure_loop_lag(duration: float) -> List[float]:
+    lags = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_PROBE_INTERVAL)
+    return lags
+
+
+async def run_load(user_id: str, device_ids: List[str], pushes: int) -> list:
+    devices = [SimulatedDevice(device_id, user_id) for device_id in device_ids]
+    app = AsgiApp(api.router, api.app, max_streams=len(devices))
+    memory_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    connections = [asyncio.ensure_future(device.connect(app)) for device in devices]
+    await asyncio.gather(*[device.connected.wait() for device in devices])
+    connect_time = time.perf_counter() - start
+    # Peak resident memory, in KiB on Linux
+    memory_per_stream = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory_before) * 1024 / len(devices)
+
+    lags = await measure_loop_lag(IDLE_TIME)
+    heartbeats = sum(device.heartbeats for device in devices)
+
+    latencies = []
+    for batch_start in range(0, pushes, PUSHES_BATCH_SIZE):
+        batch = random.sample(devices, min(PUSHES_BATCH_SIZE, pushes - batch_start))
+        latencies += await asyncio.gather(*[push_instant_action(device, user_id) for device in batch])
+
+    for device in devices:
+        device.disconnect()
+    await asyncio.gather(*connections)
+    return [
+        ['connected streams', f'{len(devices):,}'],
+        ['connection time (s)', f'{connect_time:,.2f}'],
+        ['connections per second', f'{len(devices) / connect_time:,.0f}'],
+        ['memory per idle stream (KiB)', f'{memory_per_stream / 1024:,.1f}'],
+        [f'heartbeats in {IDLE_TIME}s', f'{heartbeats:,}'],
+        ['idle loop lag p99 / max (ms)', f'{np.percentile(lags, 99) * 1000:,.1f} / {max(lags) * 1000:,.1f}'],
+        [f'instant actions pushed ({PUSHES_BATCH_SIZE} at once)', f'{len(latencies):,}'],
+        ['push to event p50 / p99 (ms)',
+         f'{np.percentile(latencies, 50) * 1000:,.1f} / {np.percentile(latencies, 99) * 1000:,.1f}'],
+        ['open streams after disconnecting', f'{app.streams:,}'],
+    ]
+
+
+def run(devices_count: int, pushes: int) -> None:
+    # Device tokens prove the ownership, like in a fleet configured for streaming
+    config.TRUST_DEVICE_TOKENS = True
+    config.DEVICE_EVENTS_HEARTBEAT_INTERVAL = HEARTBEAT_INTERVAL
+    with benchmark_database():
+        user_id, device_ids = create_devices(devices_count)
+        try:
+            rows = asyncio.run(run_load(user_id, device_ids, pushes))
+        finally:
+            # The notifications listener connection keeps the database in use
+            Container.reset()
+    print_table(['metric', 'value'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEVICES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PUSHES)
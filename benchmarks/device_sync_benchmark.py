@@ -0,0 +1,92 @@
+"""
+Measures the cycle of a device (reporting its state and measures, pulling its instant action and getting its next
+scheduler action) through the whole API, comparing the four requests it took before with the single sync request,
+and counts the pooled connections checked out by each cycle
+Usage: python -m benchmarks.device_sync_benchmark [cycles] [measures per cycle]
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.benchmark_utils import benchmark_database, measure_time, print_table
+from src.app import api
+from src.app.container import Container
+from src.app.utils.auth.device_token import DeviceToken
+from src.common import dates
+from src.domain.models.device import Device
+from src.domain.models.measure import Measure
+from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.models.user import User
+from src.domain.serializers.measure_serializer import MeasureSerializer
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+DEFAULT_CYCLES = 500
+DEFAULT_MEASURES = 5
+
+
+def create_device() -> DeviceToken:
+    user = User(username='benchmark', email='benchmark@benchmark.com', password='Benchmark1')
+    UserPGRepository().create(user)
+    device = Device(name='benchmark')
+    device_repository = DevicePGRepository()
+    device_repository.create(device, user.user_id)
+    device_repository.set_scheduling_tasks(device.device_id, [
+        Task(action=TaskAction.TURN_DEVICE_ON, moment=dates.now() + timedelta(days=1))])
+    return DeviceToken(device_id=device.device_id, user_id=user.user_id, timestamp=dates.now())
+
+
+def separate_requests_cycle(client, token: DeviceToken, measures: list) -> None:
+    headers = {'Authorization': f'Bearer {token.encode()}'}
+    device_id = token.device_id
+    for response in [
+        client.post(f'/api/devices/update_state/{device_id}', json={'turned_on': True}, headers=headers),
+        client.post(f'/api/devices/add_measures/{device_id}', json=measures, headers=headers),
+        client.get(f'/api/instantactions/action/{device_id}', headers=headers),
+        client.get(f'/api/scheduler/get_next_scheduling_action/{device_id}', headers=headers),
+    ]:
+        assert response.status_code < 300, response.get_data()
+
+
+def sync_request_cycle(client, token: DeviceToken, measures: list) -> None:
+    headers = {'Authorization': f'Bearer {token.encode()}'}
+    response = client.post(f'/api/devices/sync/{token.device_id}', json={'turned_on': True, 'measures': measures},
+                           headers=headers)
+    assert response.status_code == 200, response.get_data()
+
+
+def run(cycles: int, measures_count: int) -> None:
+    rows = []
+    with benchmark_database():
+        token = create_device()
+        measures = MeasureSerializer.serialize_all([Measure(timestamp=dates.now(), voltage=220.0, current=5.0)
+                                                    for _ in range(measures_count)])
+        client = api.app.test_client()
+        pool = ConnectionPool.get_instance()
+        acquire = pool.acquire
+        checkouts = [0]
+
+        def counted_acquire():
+            checkouts[0] += 1
+            return acquire()
+
+        pool.acquire = counted_acquire
+        try:
+            cycles_by_name = [('4 separate requests', separate_requests_cycle), ('1 sync request', sync_request_cycle)]
+            for name, cycle in cycles_by_name:
+                # Warms up the prepared statements and the caches
+                cycle(client, token, measures)
+                checkouts[0] = 0
+                cycle_time, _ = measure_time(lambda: cycle(client, token, measures), cycles)
+                rows.append([name, f'{cycle_time * 1000:,.2f}', f'{checkouts[0] / cycles:,.1f}'])
+        finally:
+            pool.acquire = acquire
+            # The notifications listener connection keeps the database in use
+            Container.reset()
+    print_table(['device cycle', 'ms per cycle', 'connections per cycle'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CYCLES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_MEASURES)
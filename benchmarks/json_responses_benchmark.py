@@ -0,0 +1,70 @@
+"""
+Measures the time taken to serialize and encode the responses with 10k measures and 1k devices, comparing the
+previous path (serializing each measure and encoding with the standard json module, like flask jsonify does) with
+the bulk measure serializer and every available JSON backend
+Usage: python -m benchmarks.json_responses_benchmark [measures] [devices]
+"""
+import json
+import random
+import sys
+from datetime import timedelta
+
+from benchmarks.benchmark_utils import measure_time, print_table
+from src.app.utils.http.json_backend import JSONBackend
+from src.common import dates
+from src.domain.models.device import Device
+from src.domain.models.measure import Measure
+from src.domain.serializers.device_serializer import DeviceSerializer
+from src.domain.serializers.measure_serializer import MeasureSerializer
+
+DEFAULT_MEASURES = 10_000
+DEFAULT_DEVICES = 1_000
+MEASURES_PER_DEVICE = 5
+REPETITIONS = 10
+
+
+def create_measures(count: int) -> list:
+    # Measures read from the database have naive UTC timestamps
+    base_timestamp = dates.to_naive_utc(dates.now())
+    return [Measure(timestamp=base_timestamp + timedelta(seconds=x), voltage=random.uniform(210, 230),
+                    current=random.uniform(0, 20)) for x in range(count)]
+
+
+def create_devices(count: int) -> list:
+    return [Device(name=f'Device {x}', measures=create_measures(MEASURES_PER_DEVICE)) for x in range(count)]
+
+
+def previous_encoding(body) -> bytes:
+    return json.dumps(body, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def previous_measures_serialization(measures: list) -> list:
+    return [MeasureSerializer.serialize(x) for x in measures]
+
+
+def previous_devices_serialization(devices: list) -> list:
+    return [{**DeviceSerializer.serialize(x), 'measures': previous_measures_serialization(x.measures)}
+            for x in devices]
+
+
+def run(measures_count: int, devices_count: int) -> None:
+    measures = create_measures(measures_count)
+    devices = create_devices(devices_count)
+    cases = [
+        (f'{measures_count} measures', previous_measures_serialization, MeasureSerializer.serialize_all, measures),
+        (f'{devices_count} devices', previous_devices_serialization, DeviceSerializer.serialize_all, devices),
+    ]
+    rows = []
+    for name, previous_serialization, serialization, models in cases:
+        previous_time, _ = measure_time(lambda: previous_encoding(previous_serialization(models)), REPETITIONS)
+        rows.append([name, 'previous (json)', f'{previous_time * 1000:,.1f}', '1.0x'])
+        for backend in JSONBackend.BACKENDS:
+            JSONBackend.use(backend)
+            backend_time, _ = measure_time(lambda: JSONBackend.dumps(serialization(models)), REPETITIONS)
+            rows.append([name, backend, f'{backend_time * 1000:,.1f}', f'{previous_time / backend_time:,.1f}x'])
+    print_table(['response', 'encoding', 'ms', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MEASURES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DEVICES)
@@ -0,0 +1,54 @@
+"""
+Compares the rows/sec of the INSERT and COPY ingestion paths of MeasurePGRepository.create_multiple
+Usage: python -m benchmarks.measures_bulk_insert_benchmark [sizes...]
+"""
+import random
+import sys
+from datetime import timedelta
+
+from benchmarks.benchmark_utils import benchmark_database, measure_time, print_table
+from src.common import dates
+from src.domain.models.device import Device
+from src.domain.models.measure import Measure
+from src.domain.models.user import User
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+
+def create_device() -> str:
+    user = User(username='benchmark', email='benchmark@benchmark.com', password='Benchmark1')
+    UserPGRepository().create(user)
+    device = Device(name='benchmark')
+    DevicePGRepository().create(device, user.user_id)
+    return device.device_id
+
+
+def create_measures(size: int) -> list:
+    now = dates.now()
+    return [
+        Measure(timestamp=now - timedelta(seconds=x), voltage=random.uniform(210, 230),
+                current=random.uniform(0, 20))
+        for x in range(size)
+    ]
+
+
+def run(sizes: list) -> None:
+    rows = []
+    with benchmark_database():
+        device_id = create_device()
+        insert_repository = MeasurePGRepository(copy_threshold=sys.maxsize)
+        copy_repository = MeasurePGRepository(copy_threshold=0)
+        for size in sizes:
+            measures = create_measures(size)
+            insert_time, _ = measure_time(lambda: insert_repository.create_multiple(measures, device_id))
+            copy_time, _ = measure_time(lambda: copy_repository.create_multiple(measures, device_id))
+            rows.append([size, f'{size / insert_time:,.0f}', f'{size / copy_time:,.0f}',
+                         f'{insert_time / copy_time:.2f}x'])
+    print_table(['measures', 'INSERT rows/sec', 'COPY rows/sec', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or DEFAULT_SIZES)
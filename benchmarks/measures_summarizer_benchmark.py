@@ -0,0 +1,78 @@
+"""
+Measures the time taken to summarize synthetic measures into MAX_SUMMARIZED_MEASURES_TO_SHOW time slices
+Usage: python -m benchmarks.measures_summarizer_benchmark [sizes...]
+"""
+import sys
+from datetime import timedelta
+
+import numpy as np
+
+from benchmarks.benchmark_utils import measure_time, print_table
+from src import config
+from src.common import dates
+from src.domain.models.measure import Measure
+from src.domain.services.devices.device_measure_summarizer import DeviceMeasureSummarizer
+from src.domain.services.devices.measure_time_slicer import MeasureTimeSlicer
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+TIME_INTERVAL = 24 * 60  # One day, in minutes
+MAX_MEASURE_OBJECTS = 100_000  # Bigger sizes only run the array engine, as building the objects dominates the time
+MAX_LEGACY_SIZE = 10_000  # The previous implementation is quadratic
+
+
+def legacy_summarize_measures(measures: list, time_interval: int) -> list:
+    summarization_minutes_interval = float(time_interval) / float(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
+    time_slices = [measures[0].timestamp + timedelta(minutes=summarization_minutes_interval * x) for x in
+                   range(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)]
+    grouped_measures = []
+    ungrouped_measures = [measure for measure in measures]
+    for dt in time_slices:
+        filtered_measures = [measure for measure in ungrouped_measures if measure.timestamp <= dt]
+        if not filtered_measures:
+            continue
+        ungrouped_measures = [measure for measure in ungrouped_measures if measure not in filtered_measures]
+        grouped_measures.append(Measure(
+            timestamp=dt,
+            current=np.mean([measure.current for measure in filtered_measures]),
+            voltage=np.mean([measure.voltage for measure in filtered_measures])
+        ))
+    return grouped_measures
+
+
+def create_arrays(size: int) -> tuple:
+    rng = np.random.default_rng(size)
+    interval_microseconds = TIME_INTERVAL * 60 * 1_000_000
+    offsets = np.sort(rng.integers(0, interval_microseconds, size, dtype=np.int64))
+    slice_offsets = np.arange(config.MAX_SUMMARIZED_MEASURES_TO_SHOW, dtype=np.int64) * (
+        interval_microseconds // config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
+    return offsets, rng.uniform(210, 230, size), rng.uniform(0, 20, size), slice_offsets
+
+
+def create_measures(offsets: np.ndarray, voltages: np.ndarray, currents: np.ndarray) -> list:
+    base_timestamp = dates.now()
+    return [
+        Measure(timestamp=base_timestamp + timedelta(microseconds=offset), voltage=voltage, current=current)
+        for offset, voltage, current in zip(offsets.tolist(), voltages.tolist(), currents.tolist())
+    ]
+
+
+def run(sizes: list) -> None:
+    rows = []
+    for size in sizes:
+        offsets, voltages, currents, slice_offsets = create_arrays(size)
+        engine_time, _ = measure_time(lambda: MeasureTimeSlicer.summarize(offsets, voltages, currents, slice_offsets))
+        summarizer_time = legacy_time = None
+        if size <= MAX_MEASURE_OBJECTS:
+            measures = create_measures(offsets, voltages, currents)
+            summarizer_time, _ = measure_time(
+                lambda: DeviceMeasureSummarizer._summarize_measures(measures, TIME_INTERVAL))
+            if size <= MAX_LEGACY_SIZE:
+                legacy_time, _ = measure_time(lambda: legacy_summarize_measures(measures, TIME_INTERVAL))
+        rows.append([size, f'{engine_time * 1000:,.1f}',
+                     '-' if summarizer_time is None else f'{summarizer_time * 1000:,.1f}',
+                     '-' if legacy_time is None else f'{legacy_time * 1000:,.1f}'])
+    print_table(['measures', 'engine ms', 'summarizer ms', 'previous summarizer ms'], rows)
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or DEFAULT_SIZES)
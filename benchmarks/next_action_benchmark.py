@@ -0,0 +1,56 @@
+"""
+Measures the time taken to find the next scheduler action of a device, by mapping its stored tasks and going through
+all of them on every poll like before, and by looking it up in its cached compiled schedule
+Usage: python -m benchmarks.next_action_benchmark [tasks counts...]
+"""
+import random
+import sys
+from datetime import timedelta
+
+from benchmarks.benchmark_utils import measure_time, print_table
+from src.common import dates
+from src.common.weekday import Weekday
+from src.domain.mappers.scheduling.tasks.task_mapper import TaskMapper
+from src.domain.models.scheduling.compiled_schedule import CompiledSchedule
+from src.domain.models.scheduling.scheduling_stack import SchedulingStack
+from src.domain.models.scheduling.tasks.daily_task import DailyTask
+from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.serializers.scheduling.tasks.task_serializer import TaskSerializer
+
+DEFAULT_TASKS_COUNTS = [1, 10, 100, 1_000]
+REPETITIONS = 1_000
+
+
+def create_serialized_tasks(count: int) -> list:
+    random.seed(count)
+    now = dates.now()
+    tasks = []
+    for _ in range(count):
+        action = random.choice(list(TaskAction))
+        moment = now + timedelta(minutes=random.randint(-7 * 24 * 60, 7 * 24 * 60))
+        if random.random() < 0.5:
+            tasks.append(DailyTask(action=action, moment=moment,
+                                   weekdays=random.sample(list(Weekday), random.randint(1, len(Weekday)))))
+        else:
+            tasks.append(Task(action=action, moment=moment))
+    return TaskSerializer.serialize_all(tasks)
+
+
+def run(tasks_counts: list) -> None:
+    rows = []
+    for count in tasks_counts:
+        serialized_tasks = create_serialized_tasks(count)
+        repetitions = max(REPETITIONS // count, 10)
+        previous_time, _ = measure_time(
+            lambda: SchedulingStack(TaskMapper.map_all(serialized_tasks)).get_next_action(), repetitions)
+        compile_time, schedule = measure_time(
+            lambda: CompiledSchedule(TaskMapper.map_all(serialized_tasks)), repetitions)
+        lookup_time, _ = measure_time(lambda: schedule.get_next_action(dates.now()), REPETITIONS * 10)
+        rows.append([count, f'{previous_time * 1_000_000:,.1f}', f'{compile_time * 1_000_000:,.1f}',
+                     f'{lookup_time * 1_000_000:,.2f}', f'{previous_time / lookup_time:,.0f}x'])
+    print_table(['tasks', 'previous poll us', 'compilation us', 'cached poll us', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or DEFAULT_TASKS_COUNTS)
@@ -0,0 +1,56 @@
+"""
+Measures the time taken by a gateway to get the next scheduler actions of the devices it serves, with one request per
+device and with a single batch request, which checks their ownership and reads their next actions at once
+Usage: python -m benchmarks.next_actions_batch_benchmark [devices counts...]
+"""
+import sys
+from datetime import timedelta
+
+from benchmarks.benchmark_utils import benchmark_database, measure_time, print_table
+from src.common import dates
+from src.domain.models.device import Device
+from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.models.user import User
+from src.domain.services.device_scheduler.device_scheduler_retriever import DeviceSchedulerRetriever
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+DEFAULT_DEVICES_COUNTS = [10, 50, 200]
+REPETITIONS = 20
+
+
+def create_devices(user_id: str, count: int) -> list:
+    device_repository = DevicePGRepository()
+    device_scheduler_repository = DeviceSchedulerPGRepository()
+    device_ids = []
+    for i in range(count):
+        device = Device(name='benchmark')
+        device_repository.create(device, user_id)
+        device_scheduler_repository.set_scheduling_tasks(device.device_id, [
+            Task(action=TaskAction.TURN_DEVICE_ON, moment=dates.now() + timedelta(hours=i + 1))])
+        device_ids.append(device.device_id)
+    return device_ids
+
+
+def run(devices_counts: list) -> None:
+    rows = []
+    with benchmark_database():
+        user = User(username='benchmark', email='benchmark@benchmark.com', password='Benchmark1')
+        UserPGRepository().create(user)
+        # Without the ownership and schedules caches, so every request reaches the database
+        retriever = DeviceSchedulerRetriever(DevicePGRepository(), DeviceSchedulerPGRepository())
+        for count in devices_counts:
+            device_ids = create_devices(user.user_id, count)
+            single_time, _ = measure_time(
+                lambda: [retriever.get_next_scheduling_action(x, user.user_id) for x in device_ids], REPETITIONS)
+            batch_time, _ = measure_time(
+                lambda: retriever.get_next_scheduling_actions(device_ids, user.user_id), REPETITIONS)
+            rows.append([count, f'{single_time * 1000:,.2f}', f'{batch_time * 1000:,.2f}',
+                         f'{single_time / batch_time:,.0f}x'])
+    print_table(['devices', 'one request per device ms', 'batch request ms', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or DEFAULT_DEVICES_COUNTS)
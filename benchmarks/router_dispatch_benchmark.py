@@ -0,0 +1,67 @@
+"""
+Measures the routing throughput with many controllers registered, comparing the indexed dispatch with a linear
+lookup over every controller and method like the one the router used before
+Usage: python -m benchmarks.router_dispatch_benchmark [controllers_counts...]
+"""
+import contextlib
+import io
+import sys
+from typing import List, Optional, Type
+
+from benchmarks.benchmark_utils import measure_time, print_table
+from src.app.routing.method_route import MethodRoute
+from src.app.routing.router import Router
+from src.app.utils.http import http_methods
+from src.app.utils.auth.permission_level import PermissionLevel
+
+DEFAULT_CONTROLLERS_COUNTS = [10, 100, 1000]
+METHODS_PER_CONTROLLER = 10
+LOOKUPS = 100_000
+
+
+def create_controllers(count: int) -> List[Type]:
+    return [type(f'Benchmark{x}Controller', (), {}) for x in range(count)]
+
+
+class BenchmarkRouter(Router):
+
+    def __init__(self, controllers: List[Type]) -> None:
+        self._controllers = controllers
+        super().__init__()
+
+    def _discover_controllers(self) -> List[Type]:
+        for controller in self._controllers:
+            for x in range(METHODS_PER_CONTROLLER):
+                Router.register_http_method({
+                    'type': http_methods.GET if x % 2 else http_methods.POST, 'alias': None,
+                    'class_name': controller.__name__, 'method_name': f'method_{x}',
+                    'min_permission_level': PermissionLevel.USER
+                })
+        return self._controllers
+
+    def linear_routed_method(self, controller_name: str, method: str, http_method: str) -> Optional[MethodRoute]:
+        for cont_route in self.routes:
+            if cont_route.route() == controller_name:
+                for cont_method in cont_route.methods:
+                    if cont_method.get_path() == method and cont_method.http_type == http_method:
+                        return cont_method
+        return None
+
+
+def run(controllers_counts: list) -> None:
+    rows = []
+    for count in controllers_counts:
+        with contextlib.redirect_stdout(io.StringIO()):
+            router = BenchmarkRouter(create_controllers(count))
+        # Methods of the last controller are the worst case of the linear lookup
+        lookup = (f'benchmark{count - 1}', f'/method_{METHODS_PER_CONTROLLER - 1}', http_methods.GET)
+        lookups = LOOKUPS if count <= 100 else LOOKUPS // 100
+        linear_time, linear_route = measure_time(lambda: router.linear_routed_method(*lookup), lookups)
+        indexed_time, indexed_route = measure_time(lambda: router._get_routed_method(*lookup), lookups)
+        assert linear_route is indexed_route is not None
+        rows.append([count, count * METHODS_PER_CONTROLLER, f'{1 / linear_time:,.0f}', f'{1 / indexed_time:,.0f}'])
+    print_table(['controllers', 'methods', 'linear lookups/s', 'indexed lookups/s'], rows)
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or DEFAULT_CONTROLLERS_COUNTS)
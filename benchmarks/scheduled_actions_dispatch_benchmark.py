@@ -0,0 +1,131 @@
+"""
+Measures the lag of ScheduledActionsDispatcher pushing the due actions of a dense schedule, in which many devices of a
+big fleet have their next action in the same few seconds, and the cost of its passes when nothing is due
+Usage: python -m benchmarks.scheduled_actions_dispatch_benchmark [devices] [due devices] [window seconds]
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.benchmark_utils import benchmark_database, measure_time, print_table
+from src.common import dates
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.models.user import User
+from src.domain.services.device_scheduler.scheduled_actions_dispatcher import ScheduledActionsDispatcher
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+DEFAULT_DEVICES = 1_000_000
+DEFAULT_DUE_DEVICES = 50_000
+DEFAULT_WINDOW = 10  # Seconds
+WINDOW_DELAY = 2  # Seconds between the schedule of the due devices and the start of their window
+IDLE_REPETITIONS = 100
+
+# Every device has a daily task of every weekday, whose time is its next action
+_TASKS = "jsonb_build_array(jsonb_build_object('action', 'TURN_DEVICE_ON', " \
+         "'moment', to_char(S.moment, 'YYYY-MM-DD\"T\"HH24:MI:SS.US\"+00:00\"'), " \
+         "'weekdays', jsonb_build_array(0, 1, 2, 3, 4, 5, 6)))"
+_CREATE_DEVICES = "INSERT INTO Devices (device_id, user_id, name, turned_on) " \
+                  "SELECT 'device-' || i, %s, 'benchmark', false FROM generate_series(1, %s) i"
+# Idle devices have their next action between one hour and a day later
+_CREATE_TASKS = "INSERT INTO DeviceTasks (device_id, tasks, next_action, next_action_at) " \
+                f"SELECT S.device_id, {_TASKS}, 'TURN_DEVICE_ON', S.moment FROM (" \
+                "    SELECT 'device-' || i AS device_id, " \
+                "    (NOW() AT TIME ZONE 'UTC') + INTERVAL '1 hour' + random() * INTERVAL '22 hours' AS moment " \
+                "    FROM generate_series(1, %s) i" \
+                ") S"
+_SCHEDULE_DUE_DEVICES = f"UPDATE DeviceTasks SET tasks = {_TASKS}, next_action_at = S.moment FROM (" \
+                        "    SELECT 'device-' || i AS device_id, " \
+                        "    (NOW() AT TIME ZONE 'UTC') + (%s + random() * %s) * INTERVAL '1 second' AS moment " \
+                        "    FROM generate_series(1, %s) i" \
+                        ") S WHERE DeviceTasks.device_id = S.device_id"
+
+
+class RecordingDeviceSchedulerRepository(DeviceSchedulerPGRepository):
+
+    def __init__(self) -> None:
+        self.moments: Dict[str, datetime] = {}
+
+    def advance_next_scheduling_actions(self, after: datetime, limit: int) -> List[Tuple[str, SchedulerAction]]:
+        advanced = super().advance_next_scheduling_actions(after, limit)
+        for device_id, action in advanced:
+            self.moments[device_id] = action.moment
+        return advanced
+
+
+class RecordingInstantActionRepository(InstantActionPGRepository):
+
+    def __init__(self, moments: Dict[str, datetime]) -> None:
+        self.lags: List[float] = []
+        self._moments = moments
+
+    def push_all(self, actions: List[Tuple[str, TaskAction]]) -> None:
+        super().push_all(actions)
+        now = dates.now()
+        self.lags += [(now - self._moments[device_id]).total_seconds() for device_id, _ in actions]
+
+
+def execute(query: str, params: tuple = ()) -> None:
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+        finally:
+            cursor.close()
+        conn.commit()
+
+
+def create_fleet(devices: int) -> float:
+    user = User(username='benchmark', email='benchmark@benchmark.com', password='Benchmark1')
+    UserPGRepository().create(user)
+    start = time.perf_counter()
+    execute(_CREATE_DEVICES, (user.user_id, devices))
+    execute(_CREATE_TASKS, (devices,))
+    execute('ANALYZE DeviceTasks')
+    return time.perf_counter() - start
+
+
+def run(devices: int, due_devices: int, window: float) -> None:
+    with benchmark_database():
+        creation_time = create_fleet(devices)
+        scheduler_repository = RecordingDeviceSchedulerRepository()
+        instant_action_repository = RecordingInstantActionRepository(scheduler_repository.moments)
+        dispatcher = ScheduledActionsDispatcher(scheduler_repository, instant_action_repository,
+                                                transaction=PostgresRepository.shared_transaction)
+        first_moment_time, _ = measure_time(scheduler_repository.get_first_next_action_moment, IDLE_REPETITIONS)
+        idle_dispatch_time, _ = measure_time(lambda: dispatcher.dispatch_due_actions(dates.now()), IDLE_REPETITIONS)
+
+        execute(_SCHEDULE_DUE_DEVICES, (WINDOW_DELAY, window, due_devices))
+        thread = threading.Thread(target=dispatcher.run)
+        thread.start()
+        deadline = time.perf_counter() + WINDOW_DELAY + window + 60
+        while len(instant_action_repository.lags) < due_devices and time.perf_counter() < deadline:
+            time.sleep(0.1)
+        dispatcher.stop()
+        thread.join()
+
+    lags = np.array(instant_action_repository.lags) * 1000
+    print_table(['metric', 'value'], [
+        ['scheduled devices', f'{devices:,}'],
+        ['fleet creation (s)', f'{creation_time:,.1f}'],
+        ['first next action query (ms)', f'{first_moment_time * 1000:,.2f}'],
+        ['dispatch pass with nothing due (ms)', f'{idle_dispatch_time * 1000:,.2f}'],
+        [f'devices due in {window:g}s', f'{due_devices:,}'],
+        ['pushed actions', f'{len(lags):,}'],
+        ['lag p50 / p99 / max (ms)',
+         f'{np.percentile(lags, 50):,.1f} / {np.percentile(lags, 99):,.1f} / {lags.max():,.1f}'],
+    ])
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEVICES,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DUE_DEVICES,
+        float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WINDOW)
@@ -0,0 +1,53 @@
+"""
+Measures the cold start of the web workers, i.e. the time since a worker process is created until the app (with
+its route table) is ready to serve, when every worker imports the app and when it is preloaded by the master
+Usage: python -m benchmarks.worker_startup_benchmark [workers]
+"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.benchmark_utils import print_table
+
+DEFAULT_WORKERS = 4
+IMPORT_APP = 'import src.app.api'
+
+
+def worker_importing_the_app() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', IMPORT_APP], check=True, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def worker_forked_from_preloaded_master() -> float:
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        # Like gunicorn workers, the forked process imports the app, which is already loaded
+        import src.app.api  # noqa: F401
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return time.perf_counter() - start
+
+
+def run(workers: int) -> None:
+    rows = []
+    import_times = [worker_importing_the_app() for _ in range(workers)]
+    rows.append(['import per worker', '-', f'{sum(import_times) / workers * 1000:,.1f}',
+                 f'{sum(import_times) * 1000:,.1f}'])
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        import src.app.api  # noqa: F401
+    preload_time = time.perf_counter() - start
+    fork_times = [worker_forked_from_preloaded_master() for _ in range(workers)]
+    rows.append(['preloaded by master', f'{preload_time * 1000:,.1f}', f'{sum(fork_times) / workers * 1000:,.1f}',
+                 f'{(preload_time + sum(fork_times)) * 1000:,.1f}'])
+    print_table(['mode', 'master ms', 'worker ms', f'total ms ({workers} workers)'], rows)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS)
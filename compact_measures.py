@@ -0,0 +1,20 @@
+import argparse
+
+from src import config
+from src.app.utils.logging.logger import Logger
+from src.infrastructure.database.measure_compactor import MeasureCompactor
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Creates the upcoming measures partitions and removes the measures '
+                                                 'and rollups older than their retention periods')
+    parser.add_argument('--retention-days', type=int, default=config.MEASURES_RETENTION_DAYS,
+                        help='Days the raw measures are kept. 0 keeps them forever')
+    parser.add_argument('--rollups-retention-days', type=int, default=config.MEASURES_ROLLUPS_RETENTION_DAYS,
+                        help='Days the measures rollups are kept. 0 keeps them forever')
+    parser.add_argument('--chunk-size', type=int, default=config.MEASURES_COMPACTION_CHUNK_SIZE,
+                        help='Rows deleted by each transaction')
+    args = parser.parse_args()
+    compactor = MeasureCompactor(retention_days=args.retention_days,
+                                 rollups_retention_days=args.rollups_retention_days, chunk_size=args.chunk_size,
+                                 on_error=Logger.error)
+    print(compactor.run())
@@ -0,0 +1,36 @@
+import argparse
+import signal
+
+from src import config
+from src.app.utils.logging.logger import Logger
+from src.domain.services.device_scheduler.scheduled_actions_dispatcher import ScheduledActionsDispatcher
+from src.infrastructure.database.advisory_lock import AdvisoryLock
+from src.infrastructure.database.pg_notification_listener import PGNotificationListener
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pushes the scheduler actions of every device as instant actions '
+                                                 'when they are due, until it is terminated')
+    parser.add_argument('--batch-size', type=int, default=config.SCHEDULED_ACTIONS_DISPATCH_BATCH_SIZE,
+                        help='Due actions advanced and pushed by each transaction')
+    args = parser.parse_args()
+    dispatcher = ScheduledActionsDispatcher(DeviceSchedulerPGRepository(), InstantActionPGRepository(),
+                                            batch_size=args.batch_size, on_error=Logger.error,
+                                            transaction=PostgresRepository.shared_transaction)
+    # New tasks may be due before the action the dispatcher is waiting for
+    listener = PGNotificationListener({config.DEVICE_SCHEDULER_CHANNEL: lambda device_id: dispatcher.wake_up()},
+                                      on_connect=dispatcher.wake_up, on_error=Logger.error)
+    # Keeps advance_next_actions.py from advancing actions without pushing them while the dispatcher runs
+    lock = AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY, shared=True)
+    lock.acquire()
+    listener.start()
+    signal.signal(signal.SIGTERM, lambda *args: dispatcher.stop())
+    try:
+        dispatcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.stop()
+        lock.release()
@@ -8,6 +8,7 @@ from src.app.utils.logging.logger import Logger
 from src.app.utils.http import http_methods
 from src.app.utils.logo_printer import LogoPrinter
 from src.infrastructure.database.db_migrator import DBMigrator
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
 
 app = Flask(__name__)
 cors = CORS(app)
@@ -50,6 +51,7 @@ def on_starting(server=None):
     router.print_routemap()
     LogoPrinter.print_logo()
     DBMigrator().run_migrations()
+    MeasurePartitionManager().run_maintenance()
     Logger.info("App started")
 
 
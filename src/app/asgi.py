@@ -0,0 +1,5 @@
+from src.app import api
+from src.app.asgi_app import AsgiApp
+
+# Served with an ASGI server, e.g. python -m uvicorn src.app.asgi:app
+app = AsgiApp(api.router, api.app, on_startup=api.on_starting)
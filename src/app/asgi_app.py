@@ -0,0 +1,189 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from flask import Flask
+from werkzeug.test import EnvironBuilder
+
+from src import config
+from src.app.routing.router import Router
+from src.app.utils.http.event_stream_response import EventStreamFlaskResponse
+from src.app.utils.http.asgi_request import AsgiRequest
+from src.app.utils.logging.logger import Logger
+from src.domain.exceptions.server_busy_exception import ServerBusyException
+
+
+class AsgiApp:
+    """
+    Serves the API routes under ASGI. Connections are held by the event loop, async endpoints run on it and
+    the blocking ones run on a bounded thread pool, so a worker can keep many more open requests than threads.
+    The repositories are built on psycopg2, which is synchronous, so database calls always run on that pool.
+    Event streams are sent while their client is connected and receives them fast enough.
+    Only the API is served, the client app is still served by the WSGI app
+    """
+
+    def __init__(self, router: Router, flask_app: Flask, on_startup: Optional[Callable[[], Any]] = None,
+                 thread_pool_size: int = config.ASGI_THREAD_POOL_SIZE,
+                 max_pending_calls: int = config.ASGI_MAX_PENDING_CALLS,
+                 max_streams: int = config.DEVICE_EVENTS_MAX_STREAMS,
+                 stream_send_timeout: float = config.DEVICE_EVENTS_SEND_TIMEOUT) -> None:
+        self._router = router
+        self._flask_app = flask_app
+        self._on_startup = on_startup
+        self._thread_pool_size = thread_pool_size
+        self._max_pending_calls = max_pending_calls
+        self._max_streams = max_streams
+        self._stream_send_timeout = stream_send_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._blocking_calls = 0
+        self._streams = 0
+        self._base_path = f'/{Router.get_base_url()}/'
+
+    @property
+    def blocking_calls(self) -> int:
+        """
+        Blocking calls running or waiting for a thread
+        """
+        return self._blocking_calls
+
+    @property
+    def streams(self) -> int:
+        """
+        Event streams being sent
+        """
+        return self._streams
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._serve_lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._serve_http(scope, receive, send)
+
+    async def run_blocking(self, call: Callable[[], Any]) -> Any:
+        self._start()
+        if self._blocking_calls >= self._thread_pool_size + self._max_pending_calls:
+            raise ServerBusyException()
+        self._blocking_calls += 1
+        try:
+            return await self._loop.run_in_executor(self._executor, call)
+        finally:
+            self._blocking_calls -= 1
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        # Error and CORS responses are built with flask, so it needs an app context in every thread
+        self._flask_app.app_context().push()
+        self._executor = ThreadPoolExecutor(max_workers=self._thread_pool_size, thread_name_prefix='asgi',
+                                            initializer=lambda: self._flask_app.app_context().push())
+
+    async def _serve_lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    if self._on_startup is not None:
+                        await self.run_blocking(self._on_startup)
+                except Exception as e:
+                    Logger.error(e)
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _serve_http(self, scope: dict, receive: Callable, send: Callable) -> None:
+        self._start()
+        path = scope['path']
+        if not path.startswith(self._base_path):
+            response = self._router.error_response('Not found', 404)
+        else:
+            request = AsgiRequest.from_scope(scope, await self._read_body(receive))
+            try:
+                response = await self._router.route_async(request, path[len(self._base_path):], self.run_blocking)
+            except ServerBusyException:
+                response = self._router.error_response('Server busy', 503)
+        if isinstance(response, EventStreamFlaskResponse):
+            if self._streams < self._max_streams:
+                await self._send_stream(self._process_response(scope, response), receive, send)
+                return
+            await response.async_body.aclose()
+            response = self._router.error_response('Server busy', 503)
+        response = self._process_response(scope, response)
+        await send(self._get_response_start(response))
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+    def _process_response(self, scope: dict, response: Any) -> Any:
+        # Runs the flask after request handlers, like the WSGI app does, so CORS headers are added to the responses
+        # and their bodies compressed
+        environ = EnvironBuilder(path=scope['path'], method=scope['method'], query_string=scope.get('query_string'),
+                                 headers=[(name.decode('latin-1'), value.decode('latin-1'))
+                                          for name, value in scope['headers']]).get_environ()
+        with self._flask_app.request_context(environ):
+            return self._flask_app.process_response(response)
+
+    async def _send_stream(self, response: EventStreamFlaskResponse, receive: Callable, send: Callable) -> None:
+        self._streams += 1
+        try:
+            await send(self._get_response_start(response))
+            sending = asyncio.ensure_future(self._send_stream_chunks(response, send))
+            disconnection = asyncio.ensure_future(self._wait_for_disconnection(receive))
+            await asyncio.wait([sending, disconnection], return_when=asyncio.FIRST_COMPLETED)
+            sending.cancel()
+            disconnection.cancel()
+            for result in await asyncio.gather(sending, disconnection, return_exceptions=True):
+                if isinstance(result, asyncio.TimeoutError):
+                    Logger.info('Event stream closed, as its client was not receiving the events')
+                elif isinstance(result, Exception):
+                    Logger.error(result)
+            await response.async_body.aclose()
+        finally:
+            self._streams -= 1
+
+    async def _send_stream_chunks(self, response: EventStreamFlaskResponse, send: Callable) -> None:
+        async for chunk in response.async_body:
+            # The server makes send wait while the client is not reading, so slow clients keep no events queued.
+            # asyncio.wait instead of wait_for, which may swallow the cancellation when the send ends at that time
+            sending = asyncio.ensure_future(send({'type': 'http.response.body', 'body': chunk, 'more_body': True}))
+            try:
+                done, _ = await asyncio.wait([sending], timeout=self._stream_send_timeout)
+            finally:
+                sending.cancel()
+            if not done:
+                raise asyncio.TimeoutError()
+            sending.result()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    @staticmethod
+    def _get_response_start(response: Any) -> dict:
+        return {
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), str(value).encode('latin-1'))
+                        for name, value in response.headers.items()]
+        }
+
+    @staticmethod
+    async def _wait_for_disconnection(receive: Callable) -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
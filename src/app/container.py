@@ -0,0 +1,252 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src import config
+from src.app.utils.logging.logger import Logger
+from src.common.keyed_notifier import KeyedNotifier
+from src.common.ttl_lru_cache import TTLLRUCache
+from src.domain.repositories.device_repository import DeviceRepository
+from src.domain.repositories.device_scheduler_repository import DeviceSchedulerRepository
+from src.domain.repositories.device_token_revocation_repository import DeviceTokenRevocationRepository
+from src.domain.repositories.instant_action_repository import InstantActionRepository
+from src.domain.repositories.measure_repository import MeasureRepository
+from src.domain.repositories.user_repository import UserRepository
+from src.domain.services.auth.device_token_generator import DeviceTokenGenerator
+from src.domain.services.auth.device_token_revocation_list import DeviceTokenRevocationList
+from src.domain.services.auth.device_tokens_revoker import DeviceTokensRevoker
+from src.domain.services.auth.user_logger import UserLogger
+from src.domain.services.auth.user_obtainer import UserObtainer
+from src.domain.services.auth.user_registerer import UserRegisterer
+from src.domain.services.device_scheduler.device_scheduler_retriever import DeviceSchedulerRetriever
+from src.domain.services.device_scheduler.device_scheduler_updater import DeviceSchedulerUpdater
+from src.domain.services.devices.device_creator import DeviceCreator
+from src.domain.services.devices.device_measure_aggregator import DeviceMeasureAggregator
+from src.domain.services.devices.device_measure_summarizer import DeviceMeasureSummarizer
+from src.domain.services.devices.device_state.device_state_modifier import DeviceStateModifier
+from src.domain.services.devices.device_state.device_state_retriever import DeviceStateRetriever
+from src.domain.services.devices.device_synchronizer import DeviceSynchronizer
+from src.domain.services.devices.devices_obtainer import DevicesRetriever
+from src.domain.services.instant_actions.instant_action_puller import InstantActionPuller
+from src.domain.services.instant_actions.instant_action_pusher import InstantActionPusher
+from src.infrastructure.database.pg_notification_listener import PGNotificationListener
+from src.infrastructure.repositories.cached_device_repository import CachedDeviceRepository
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from src.infrastructure.repositories.device_token_revocation_pg_repository import DeviceTokenRevocationPGRepository
+from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
+from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
+from src.infrastructure.repositories.user_pg_repository import UserPGRepository
+
+
+class Container:
+    """
+    Creates the repositories and services the first time they are needed and hands the same instances to every
+    request of the process. Repositories and services keep no request data, which is given to the controllers.
+    Forked workers get their own container
+    """
+    _instance: Optional['Container'] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def get_instance(cls) -> 'Container':
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = cls()
+                cls._instance_pid = os.getpid()
+            return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Forgets every created instance, so the next requests get new ones
+        """
+        with cls._instance_lock:
+            if cls._instance is not None and cls._instance_pid == os.getpid():
+                listener = cls._instance._instances.get('notifications_listener')
+                if listener is not None:
+                    listener.stop()
+            cls._instance = None
+            cls._instance_pid = None
+
+    # Repositories
+
+    @property
+    def device_repository(self) -> DeviceRepository:
+        return self._get('device_repository', lambda: CachedDeviceRepository(DevicePGRepository()))
+
+    @property
+    def device_scheduler_repository(self) -> DeviceSchedulerRepository:
+        return self._get('device_scheduler_repository', DeviceSchedulerPGRepository)
+
+    @property
+    def device_token_revocation_repository(self) -> DeviceTokenRevocationRepository:
+        return self._get('device_token_revocation_repository', DeviceTokenRevocationPGRepository)
+
+    @property
+    def instant_action_repository(self) -> InstantActionRepository:
+        return self._get('instant_action_repository', InstantActionPGRepository)
+
+    @property
+    def measure_repository(self) -> MeasureRepository:
+        return self._get('measure_repository', MeasurePGRepository)
+
+    @property
+    def user_repository(self) -> UserRepository:
+        return self._get('user_repository', UserPGRepository)
+
+    # Auth services
+
+    @property
+    def device_token_generator(self) -> DeviceTokenGenerator:
+        return self._get('device_token_generator', lambda: DeviceTokenGenerator(self.device_repository))
+
+    @property
+    def device_token_revocation_list(self) -> DeviceTokenRevocationList:
+        return self._get('device_token_revocation_list',
+                         lambda: DeviceTokenRevocationList(self.device_token_revocation_repository))
+
+    @property
+    def device_tokens_revoker(self) -> DeviceTokensRevoker:
+        return self._get('device_tokens_revoker',
+                         lambda: DeviceTokensRevoker(self.device_repository, self.device_token_revocation_list))
+
+    @property
+    def user_logger(self) -> UserLogger:
+        return self._get('user_logger', lambda: UserLogger(self.user_repository))
+
+    @property
+    def user_obtainer(self) -> UserObtainer:
+        return self._get('user_obtainer', lambda: UserObtainer(self.user_repository))
+
+    @property
+    def user_registerer(self) -> UserRegisterer:
+        return self._get('user_registerer', lambda: UserRegisterer(self.user_repository))
+
+    # Devices services
+
+    @property
+    def device_creator(self) -> DeviceCreator:
+        return self._get('device_creator', lambda: DeviceCreator(self.device_repository))
+
+    @property
+    def device_measure_aggregator(self) -> DeviceMeasureAggregator:
+        return self._get('device_measure_aggregator',
+                         lambda: DeviceMeasureAggregator(self.device_repository, self.measure_repository))
+
+    @property
+    def device_measure_summarizer(self) -> DeviceMeasureSummarizer:
+        return self._get('device_measure_summarizer',
+                         lambda: DeviceMeasureSummarizer(self.device_repository, self.measure_repository))
+
+    @property
+    def device_state_modifier(self) -> DeviceStateModifier:
+        return self._get('device_state_modifier',
+                         lambda: DeviceStateModifier(self.device_repository, self.device_state_notifier))
+
+    @property
+    def device_state_retriever(self) -> DeviceStateRetriever:
+        return self._get('device_state_retriever', lambda: DeviceStateRetriever(self.device_repository))
+
+    @property
+    def devices_retriever(self) -> DevicesRetriever:
+        return self._get('devices_retriever', lambda: DevicesRetriever(self.device_repository))
+
+    @property
+    def device_synchronizer(self) -> DeviceSynchronizer:
+        return self._get('device_synchronizer', lambda: DeviceSynchronizer(
+            self.device_repository, self.device_state_modifier, self.device_measure_aggregator,
+            self.instant_action_puller, self.device_scheduler_retriever,
+            transaction=PostgresRepository.shared_transaction
+        ))
+
+    # Scheduling services
+
+    @property
+    def device_scheduler_retriever(self) -> DeviceSchedulerRetriever:
+        return self._get('device_scheduler_retriever', lambda: DeviceSchedulerRetriever(
+            self.device_repository, self.device_scheduler_repository, self.device_schedules_cache,
+            is_cache_synced=lambda: self.notifications_listener.is_listening
+        ))
+
+    @property
+    def device_scheduler_updater(self) -> DeviceSchedulerUpdater:
+        return self._get('device_scheduler_updater',
+                         lambda: DeviceSchedulerUpdater(self.device_repository, self.device_scheduler_repository,
+                                                        self.device_scheduler_notifier, self.device_schedules_cache))
+
+    @property
+    def device_schedules_cache(self) -> TTLLRUCache:
+        return self._get('device_schedules_cache', lambda: TTLLRUCache(config.DEVICE_SCHEDULES_CACHE_SIZE))
+
+    @property
+    def instant_action_puller(self) -> InstantActionPuller:
+        return self._get('instant_action_puller',
+                         lambda: InstantActionPuller(self.device_repository, self.instant_action_repository))
+
+    @property
+    def instant_action_pusher(self) -> InstantActionPusher:
+        return self._get('instant_action_pusher',
+                         lambda: InstantActionPusher(self.device_repository, self.instant_action_repository,
+                                                     self.instant_actions_notifier))
+
+    # Notifications
+
+    @property
+    def instant_actions_notifier(self) -> KeyedNotifier:
+        return self._get('instant_actions_notifier', KeyedNotifier)
+
+    @property
+    def device_state_notifier(self) -> KeyedNotifier:
+        return self._get('device_state_notifier', KeyedNotifier)
+
+    @property
+    def device_scheduler_notifier(self) -> KeyedNotifier:
+        return self._get('device_scheduler_notifier', KeyedNotifier)
+
+    @property
+    def notifications_listener(self) -> PGNotificationListener:
+        """
+        Wakes up the devices waiting on this worker for the changes made by any worker. It is started by the
+        first waiting device. Every device is woken up when it (re)connects, and the cached schedules are dropped,
+        as notifications may have been missed
+        """
+        return self._get('notifications_listener', self._create_notifications_listener)
+
+    def _create_notifications_listener(self) -> PGNotificationListener:
+        notifiers = {
+            config.INSTANT_ACTIONS_CHANNEL: self.instant_actions_notifier,
+            config.DEVICE_STATE_CHANNEL: self.device_state_notifier,
+            config.DEVICE_SCHEDULER_CHANNEL: self.device_scheduler_notifier
+        }
+        schedules_cache = self.device_schedules_cache
+        handlers = {channel: notifier.notify for channel, notifier in notifiers.items()}
+
+        def on_scheduler_changed(device_id: str) -> None:
+            # Dropped before waking up the devices, so they get the new schedule
+            schedules_cache.delete(device_id)
+            self.device_scheduler_notifier.notify(device_id)
+
+        def on_connect() -> None:
+            schedules_cache.clear()
+            for notifier in notifiers.values():
+                notifier.notify_all()
+
+        handlers[config.DEVICE_SCHEDULER_CHANNEL] = on_scheduler_changed
+        return PGNotificationListener(handlers, on_connect=on_connect, on_error=Logger.error)
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # Reentrant, as creating a service also gets the repositories it depends on
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = factory()
+            return self._instances[name]
@@ -14,29 +14,23 @@ from src.domain.exceptions.invalid_user_exception import InvalidUserException
 from src.domain.exceptions.unregistered_device_exception import UnregisteredDeviceException
 from src.domain.mappers.user_mapper import UserMapper
 from src.domain.serializers.user_serializer import UserSerializer
-from src.domain.services.auth.device_token_generator import DeviceTokenGenerator
-from src.domain.services.auth.user_logger import UserLogger
-from src.domain.services.auth.user_obtainer import UserObtainer
-from src.domain.services.auth.user_registerer import UserRegisterer
 from src.app.utils.http import http_methods
 from src.app.utils.http.response import Response
 from src.app.utils.http.route import route
-from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
-from src.infrastructure.repositories.user_pg_repository import UserPGRepository
 
 
 class AuthController(BaseController):
 
     def __init__(self, request: Request, token: Optional[Token] = None) -> None:
         super().__init__(request, token)
-        self.user_repository = UserPGRepository()
-        self.device_repository = DevicePGRepository()
+        self.user_repository = self._container.user_repository
+        self.device_repository = self._container.device_repository
 
     @route(http_methods.POST, min_permission_level=PermissionLevel.PUBLIC)
     def register(self) -> Response:
         try:
             user = UserMapper.map(self.get_json_body())
-            user_registerer = UserRegisterer(self.user_repository)
+            user_registerer = self._container.user_registerer
             user_registerer.register_user(user)
             return Response.created_successfully()
         except ModelValidationException as e:
@@ -50,7 +44,7 @@ class AuthController(BaseController):
     @route(http_methods.POST, min_permission_level=PermissionLevel.PUBLIC)
     def login(self) -> Response:
         body = self.get_json_body()
-        user_logger = UserLogger(self.user_repository)
+        user_logger = self._container.user_logger
         try:
             user = user_logger.login_user(body['email'], body['password'])
             auth_info = UserToken.from_user(user)
@@ -63,7 +57,7 @@ class AuthController(BaseController):
 
     @route(http_methods.GET, alias='get_data')
     def get_logged_user_data(self) -> Response:
-        user_obtainer = UserObtainer(self.user_repository)
+        user_obtainer = self._container.user_obtainer
         try:
             user = user_obtainer.get_user(self.get_authenticated_user_id())
         except InvalidUserException:
@@ -75,7 +69,7 @@ class AuthController(BaseController):
 
     @route(http_methods.GET)
     def generate_device_token(self, device_id: str) -> Response:
-        token_generator = DeviceTokenGenerator(self.device_repository)
+        token_generator = self._container.device_token_generator
         try:
             device_token = token_generator.generate(self.get_authenticated_user_id(), device_id)
         except UnregisteredDeviceException:
@@ -84,3 +78,15 @@ class AuthController(BaseController):
             Logger.error(e)
             return Response.server_error('An error has occurred while logging in user')
         return Response.success({'token': device_token.encode()})
+
+    @route(http_methods.POST)
+    def revoke_device_tokens(self, device_id: str) -> Response:
+        tokens_revoker = self._container.device_tokens_revoker
+        try:
+            tokens_revoker.revoke(self.get_authenticated_user_id(), device_id)
+        except UnregisteredDeviceException:
+            return Response.bad_request(message='Invalid device')
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while revoking the device tokens')
+        return Response.success()
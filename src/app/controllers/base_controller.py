@@ -1,17 +1,25 @@
-from typing import Optional
+import asyncio
+from datetime import timedelta
+from typing import Callable, Optional, TypeVar
 
+from src import config
+from src.app.container import Container
 from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.auth.token import Token
 from src.app.utils.auth.user_token import UserToken
 from src.app.utils.http.request import Request
+from src.common import dates
 from src.domain.models.user import User
 
+T = TypeVar('T')
+
 
 class BaseController:
 
     def __init__(self, request: Request, token: Optional[Token] = None) -> None:
         self._request = request
         self._token = token
+        self._container = Container.get_instance()
 
     def get_json_body(self):
         return self._request.body
@@ -31,6 +39,30 @@ class BaseController:
             return
         if device_id != self._token.device_id:
             raise PermissionError()
+        if self._container.device_token_revocation_list.is_revoked(device_id, self._token.timestamp):
+            raise PermissionError()
+
+    def _is_ownership_proven_by_token(self, device_id: str) -> bool:
+        """
+        When device tokens are trusted, an unexpired one proves the ownership of its device, so the database check
+        can be skipped. Revoked tokens are already refused by _validate_device_permission
+        """
+        if not config.TRUST_DEVICE_TOKENS or not isinstance(self._token, DeviceToken):
+            return False
+        if device_id != self._token.device_id:
+            return False
+        return dates.now() - self._token.timestamp < timedelta(seconds=config.DEVICE_TOKENS_TRUST_LIFETIME)
 
     def get_query_param(self, name: str, default: Optional[str] = None) -> str:
+        if not self._request:
+            return default
         return self._request.query_params.get(name, default)
+
+    async def _run_blocking(self, call: Callable[[], T]) -> T:
+        """
+        Runs a blocking call (like a database access) of an async endpoint out of the event loop. Under the ASGI
+        app it runs on its bounded thread pool, raising ServerBusyException when too many calls are waiting
+        """
+        if self._request is not None and self._request.run_blocking is not None:
+            return await self._request.run_blocking(call)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from typing import AsyncGenerator, Optional, Union
+
+from src import config
+from src.app.utils.auth.permission_level import PermissionLevel
+from src.app.utils.auth.token import Token
+from src.app.utils.http.event_stream_response import EventStreamResponse, ServerSentEvent
+from src.app.utils.http.request import Request
+from src.common import dates
+from src.domain.exceptions.server_busy_exception import ServerBusyException
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.serializers.scheduling.scheduler_action_serializer import SchedulerActionSerializer
+from src.app.utils.http.response import Response
+from src.app.utils.http.route import route
+from src.app.utils.logging.logger import Logger
+from src.app.controllers.base_controller import BaseController
+from src.app.utils.http import http_methods
+
+
+class DeviceEventsController(BaseController):
+
+    def __init__(self, request: Request, token: Optional[Token] = None) -> None:
+        super().__init__(request, token)
+        self.device_repository = self._container.device_repository
+
+    @route(http_methods.GET, alias='stream', min_permission_level=PermissionLevel.DEVICE)
+    async def stream_events(self, device_id: str) -> Union[Response, EventStreamResponse]:
+        """
+        Server-Sent Events stream of the device. The device state, its next scheduler action and its pending
+        instant action are sent when connecting, and then again every time any of them changes
+        """
+        try:
+            await self._run_blocking(lambda: self._validate_device_permission(device_id))
+            user_id = self.get_authenticated_user_id()
+            if not self._is_ownership_proven_by_token(device_id):
+                # Ownership is only checked when connecting, instead of on every event
+                exists = await self._run_blocking(lambda: self.device_repository.exists_for_user(device_id, user_id))
+                if not exists:
+                    return Response.bad_request('Provided device_id does not match any of the user devices')
+            self._container.notifications_listener.start()
+            use_epochs = self.get_query_param('use_epochs', 'false').lower() == 'true'
+            return EventStreamResponse(self._generate_events(device_id, user_id, use_epochs),
+                                       retry_delay=config.DEVICE_EVENTS_RETRY_DELAY)
+        except PermissionError:
+            return Response.unauthorized()
+        except ServerBusyException:
+            raise
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while streaming the device events')
+
+    async def _generate_events(self, device_id: str, user_id: str,
+                               use_epochs: bool) -> AsyncGenerator[ServerSentEvent, None]:
+        container = self._container
+        wake_up = asyncio.Event()
+        with container.instant_actions_notifier.subscribe(device_id, wake_up) as instant_actions, \
+                container.device_state_notifier.subscribe(device_id, wake_up) as state, \
+                container.device_scheduler_notifier.subscribe(device_id, wake_up) as scheduler:
+            # Everything is sent when connecting, as the changes made while disconnected were not notified
+            pull_action, send_state, send_next_action = True, True, True
+            next_action = None
+            revocations_checked_at = time.monotonic()
+            while True:
+                if pull_action:
+                    action = await self._run_blocking(
+                        lambda: container.instant_action_puller.pull(device_id, user_id, verify_ownership=False))
+                    if action is not None:
+                        yield ServerSentEvent('instant_action', {'action': action.value})
+                if send_state:
+                    turned_on = await self._run_blocking(
+                        lambda: container.device_state_retriever.get(device_id, user_id, verify_ownership=False))
+                    yield ServerSentEvent('state', {'turned_on': turned_on})
+                if send_next_action:
+                    next_action = await self._run_blocking(
+                        lambda: container.device_scheduler_retriever.get_next_scheduling_action(
+                            device_id, user_id, verify_ownership=False))
+                    yield self._get_next_action_event(next_action, use_epochs)
+                await self._wait_for_changes(wake_up, next_action)
+                pull_action = instant_actions.consume()
+                send_state = state.consume()
+                send_next_action = scheduler.consume() or (next_action is not None and
+                                                           next_action.moment <= dates.now())
+                if not (pull_action or send_state or send_next_action):
+                    # Revocations are checked as often as they are refreshed, not on every heartbeat
+                    if time.monotonic() - revocations_checked_at >= config.DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL:
+                        if await self._run_blocking(lambda: self._is_token_revoked(device_id)):
+                            return
+                        revocations_checked_at = time.monotonic()
+                    yield ServerSentEvent.heartbeat()
+
+    @staticmethod
+    def _get_next_action_event(next_action: Optional[SchedulerAction], use_epochs: bool) -> ServerSentEvent:
+        if next_action is None:
+            return ServerSentEvent('next_action', {})
+        return ServerSentEvent('next_action', SchedulerActionSerializer.serialize(next_action, use_epochs=use_epochs))
+
+    @staticmethod
+    async def _wait_for_changes(wake_up: asyncio.Event, next_action: Optional[SchedulerAction]) -> None:
+        timeout = config.DEVICE_EVENTS_HEARTBEAT_INTERVAL
+        if next_action is not None:
+            # Woken up when the next action moment passes, to send the following one
+            timeout = min(timeout, max((next_action.moment - dates.now()).total_seconds(), 1))
+        # asyncio.wait instead of wait_for, which may swallow the cancellation of a closed stream when the event is
+        # set at the same time
+        waiting = asyncio.ensure_future(wake_up.wait())
+        try:
+            await asyncio.wait([waiting], timeout=timeout)
+        finally:
+            waiting.cancel()
+        wake_up.clear()
+
+    def _is_token_revoked(self, device_id: str) -> bool:
+        try:
+            self._validate_device_permission(device_id)
+            return False
+        except PermissionError:
+            return True
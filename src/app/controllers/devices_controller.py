@@ -10,33 +10,26 @@ from src.domain.mappers.device_mapper import DeviceMapper
 from src.domain.mappers.measure_mapper import MeasureMapper
 from src.domain.serializers.device_serializer import DeviceSerializer
 from src.domain.serializers.measure_serializer import MeasureSerializer
-from src.domain.services.devices.device_creator import DeviceCreator
-from src.domain.services.devices.device_measure_aggregator import DeviceMeasureAggregator
-from src.domain.services.devices.device_measure_summarizer import DeviceMeasureSummarizer
-from src.domain.services.devices.device_state.device_state_modifier import DeviceStateModifier
-from src.domain.services.devices.device_state.device_state_retriever import DeviceStateRetriever
-from src.domain.services.devices.devices_obtainer import DevicesRetriever
+from src.domain.serializers.scheduling.scheduler_action_serializer import SchedulerActionSerializer
 from src.app.utils.http.response import Response
 from src.app.utils.http.route import route
 from src.app.utils.logging.logger import Logger
 from src.app.controllers.base_controller import BaseController
 from src.app.utils.http import http_methods
-from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
-from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
 
 
 class DevicesController(BaseController):
 
     def __init__(self, request: Request, token: Optional[Token] = None) -> None:
         super().__init__(request, token)
-        self.device_repository = DevicePGRepository()
-        self.measure_repository = MeasurePGRepository()
+        self.device_repository = self._container.device_repository
+        self.measure_repository = self._container.measure_repository
 
     @route(http_methods.POST)
     def create(self) -> Response:
         try:
             device = DeviceMapper.map(self.get_json_body(), set_id=False)
-            device_creator = DeviceCreator(self.device_repository)
+            device_creator = self._container.device_creator
             device_id = device_creator.create_device(device, self.get_authenticated_user_id())
             return Response.created_successfully(device_id)
         except ModelValidationException as e:
@@ -52,8 +45,11 @@ class DevicesController(BaseController):
         try:
             self._validate_device_permission(device_id)
             measure = MeasureMapper.map(self.get_json_body())
-            device_measure_aggregator = DeviceMeasureAggregator(self.device_repository, self.measure_repository)
-            device_measure_aggregator.add_measure_to_device(device_id, self.get_authenticated_user_id(), measure)
+            device_measure_aggregator = self._container.device_measure_aggregator
+            device_measure_aggregator.add_measure_to_device(
+                device_id, self.get_authenticated_user_id(), measure,
+                verify_ownership=not self._is_ownership_proven_by_token(device_id)
+            )
             return Response.created_successfully()
         except PermissionError:
             return Response.unauthorized()
@@ -70,8 +66,11 @@ class DevicesController(BaseController):
         try:
             self._validate_device_permission(device_id)
             measures = MeasureMapper.map_all(self.get_json_body())
-            device_measure_aggregator = DeviceMeasureAggregator(self.device_repository, self.measure_repository)
-            device_measure_aggregator.add_measures_to_device(device_id, self.get_authenticated_user_id(), measures)
+            device_measure_aggregator = self._container.device_measure_aggregator
+            device_measure_aggregator.add_measures_to_device(
+                device_id, self.get_authenticated_user_id(), measures,
+                verify_ownership=not self._is_ownership_proven_by_token(device_id)
+            )
             return Response.created_successfully()
         except PermissionError:
             return Response.unauthorized()
@@ -86,8 +85,10 @@ class DevicesController(BaseController):
     @route(http_methods.GET)
     def get_measures(self, device_id: str, time_interval: int) -> Response:
         try:
-            summarizer = DeviceMeasureSummarizer(self.device_repository, self.measure_repository)
-            measures = summarizer.get_summarized_measures(device_id, self.get_authenticated_user_id(), time_interval)
+            summarizer = self._container.device_measure_summarizer
+            measures = summarizer.get_summarized_measures(device_id, self.get_authenticated_user_id(), time_interval,
+                                                          summarize_in_db=self._summarize_in_db(),
+                                                          use_rollups=self._use_rollups())
             return Response.success(MeasureSerializer.serialize_all(measures))
         except UnregisteredDeviceException:
             return Response.bad_request(message='Device identifier is not valid for logged user')
@@ -98,7 +99,7 @@ class DevicesController(BaseController):
     @route(http_methods.GET, alias='get_all')
     def get_all_for_user(self) -> Response:
         try:
-            devices_retriever = DevicesRetriever(self.device_repository)
+            devices_retriever = self._container.devices_retriever
             devices = devices_retriever.get_user_devices(self.get_authenticated_user_id())
             return Response.success(DeviceSerializer.serialize_all(devices))
         except Exception as e:
@@ -108,8 +109,10 @@ class DevicesController(BaseController):
     @route(http_methods.GET)
     def get_measures_for_all_devices(self, time_interval: int) -> Response:
         try:
-            summarizer = DeviceMeasureSummarizer(self.device_repository, self.measure_repository)
-            measures = summarizer.get_all_devices_summarized_measures(self.get_authenticated_user_id(), time_interval)
+            summarizer = self._container.device_measure_summarizer
+            measures = summarizer.get_all_devices_summarized_measures(self.get_authenticated_user_id(), time_interval,
+                                                                      summarize_in_db=self._summarize_in_db(),
+                                                                      use_rollups=self._use_rollups())
             return Response.success(MeasureSerializer.serialize_all(measures))
         except Exception as e:
             Logger.error(e)
@@ -122,8 +125,9 @@ class DevicesController(BaseController):
             turned_on = self.get_json_body().get('turned_on')
             if not isinstance(turned_on, bool):
                 return Response.bad_request(message='turned_on must be a valid boolean')
-            device_state_updater = DeviceStateModifier(self.device_repository)
-            device_state_updater.update(device_id, self.get_authenticated_user_id(), turned_on)
+            device_state_updater = self._container.device_state_modifier
+            device_state_updater.update(device_id, self.get_authenticated_user_id(), turned_on,
+                                        verify_ownership=not self._is_ownership_proven_by_token(device_id))
             return Response.success()
         except PermissionError:
             return Response.unauthorized()
@@ -137,8 +141,9 @@ class DevicesController(BaseController):
     def get_state(self, device_id: str) -> Response:
         try:
             self._validate_device_permission(device_id)
-            device_state_retriever = DeviceStateRetriever(self.device_repository)
-            turned_on = device_state_retriever.get(device_id, self.get_authenticated_user_id())
+            device_state_retriever = self._container.device_state_retriever
+            turned_on = device_state_retriever.get(device_id, self.get_authenticated_user_id(),
+                                                   verify_ownership=not self._is_ownership_proven_by_token(device_id))
             return Response.success({'turned_on': turned_on})
         except PermissionError:
             return Response.unauthorized()
@@ -147,3 +152,51 @@ class DevicesController(BaseController):
         except Exception as e:
             Logger.error(e)
             return Response.server_error('An error has occurred while getting the state')
+
+    @route(http_methods.POST, min_permission_level=PermissionLevel.DEVICE)
+    def sync(self, device_id: str) -> Response:
+        """
+        Whole cycle of a device in a single request and transaction: its state (if turned_on is given) and its
+        measures are saved, and its pending instant action and its next scheduler action are returned
+        """
+        try:
+            self._validate_device_permission(device_id)
+            body = self.get_json_body() or {}
+            if not isinstance(body, dict):
+                return Response.bad_request(message='A JSON object is expected')
+            turned_on = body.get('turned_on')
+            if turned_on is not None and not isinstance(turned_on, bool):
+                return Response.bad_request(message='turned_on must be a valid boolean')
+            measures = MeasureMapper.map_all(body.get('measures', []))
+            # Compiled schedules are cached while the listener tells which ones change
+            self._container.notifications_listener.start()
+            device_synchronizer = self._container.device_synchronizer
+            instant_action, next_action = device_synchronizer.sync(
+                device_id, self.get_authenticated_user_id(), turned_on, measures,
+                verify_ownership=not self._is_ownership_proven_by_token(device_id)
+            )
+            use_epochs = self.get_query_param('use_epochs', 'false').lower() == 'true'
+            return Response.success({
+                'instant_action': instant_action.value if instant_action is not None else None,
+                'next_action': SchedulerActionSerializer.serialize(
+                    next_action,
+                    use_epochs=use_epochs
+                ) if next_action is not None else {}
+            })
+        except PermissionError:
+            return Response.unauthorized()
+        except ModelValidationException as e:
+            return Response.bad_request(message=str(e))
+        except UnregisteredDeviceException:
+            return Response.bad_request(message='Device identifier is not valid for logged user')
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while syncing the device')
+
+    def _summarize_in_db(self) -> bool:
+        # Measures are summarized by the database only when it is requested, the default is summarizing them in Python
+        return self.get_query_param('summarize_in_db', 'false').lower() == 'true'
+
+    def _use_rollups(self) -> bool:
+        # Rollups are used by default for the intervals long enough to be summarized from them
+        return self.get_query_param('use_rollups', 'true').lower() == 'true'
@@ -1,33 +1,32 @@
+import asyncio
 from typing import Optional
 
+from src import config
 from src.app.utils.auth.permission_level import PermissionLevel
 from src.app.utils.auth.token import Token
 from src.app.utils.http.request import Request
 from src.domain.exceptions.device_not_found_exception import DeviceNotFoundException
+from src.domain.exceptions.server_busy_exception import ServerBusyException
 from src.domain.models.scheduling.tasks.task_action import TaskAction
 from src.app.utils.http.response import Response
 from src.app.utils.http.route import route
 from src.app.utils.logging.logger import Logger
 from src.app.controllers.base_controller import BaseController
 from src.app.utils.http import http_methods
-from src.domain.services.instant_actions.instant_action_puller import InstantActionPuller
-from src.domain.services.instant_actions.instant_action_pusher import InstantActionPusher
-from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
-from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
 
 
 class InstantActionsController(BaseController):
 
     def __init__(self, request: Request, token: Optional[Token] = None) -> None:
         super().__init__(request, token)
-        self.device_repository = DevicePGRepository()
-        self.instant_action_repository = InstantActionPGRepository()
+        self.device_repository = self._container.device_repository
+        self.instant_action_repository = self._container.instant_action_repository
 
     @route(http_methods.POST, alias='action')
     def push_instant_action(self, device_id: str) -> Response:
         try:
             action = TaskAction(self.get_json_body().get('action'))
-            pusher = InstantActionPusher(self.device_repository, self.instant_action_repository)
+            pusher = self._container.instant_action_pusher
             pusher.push(device_id, self.get_authenticated_user_id(), action)
             return Response.success()
         except ValueError as e:
@@ -44,12 +43,53 @@ class InstantActionsController(BaseController):
     def pull_instant_action(self, device_id: str) -> Response:
         try:
             self._validate_device_permission(device_id)
-            puller = InstantActionPuller(self.device_repository, self.instant_action_repository)
-            action = puller.pull(device_id, self.get_authenticated_user_id())
+            puller = self._container.instant_action_puller
+            action = puller.pull(device_id, self.get_authenticated_user_id(),
+                                 verify_ownership=not self._is_ownership_proven_by_token(device_id))
             return Response.success({'action': action.value if action is not None else None})
+        except PermissionError:
+            return Response.unauthorized()
         except DeviceNotFoundException as e:
             Logger.error(e)
             return Response.bad_request('Provided device_id does not match any of the user devices')
         except Exception as e:
             Logger.error(e)
             return Response.server_error('An error has occurred when pushing the instant action')
+
+    @route(http_methods.GET, alias='action_wait', min_permission_level=PermissionLevel.DEVICE)
+    async def wait_instant_action(self, device_id: str) -> Response:
+        """
+        Long polling variant of pull_instant_action. When there is no pending action, the request is held until
+        one is pushed or the timeout (seconds, query param) is reached, then the action or null is returned
+        """
+        try:
+            timeout = min(float(self.get_query_param('timeout', config.INSTANT_ACTIONS_WAIT_DEFAULT_TIMEOUT)),
+                          config.INSTANT_ACTIONS_WAIT_MAX_TIMEOUT)
+            if not timeout >= 0:
+                raise ValueError(timeout)
+        except ValueError:
+            return Response.bad_request('Provided timeout is not valid')
+        try:
+            await self._run_blocking(lambda: self._validate_device_permission(device_id))
+            self._container.notifications_listener.start()
+            puller = self._container.instant_action_puller
+            user_id = self.get_authenticated_user_id()
+            verify_ownership = not self._is_ownership_proven_by_token(device_id)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            # Subscribed before the first pull, so an action pushed in between still wakes the request up
+            with self._container.instant_actions_notifier.subscribe(device_id) as subscription:
+                action = await self._run_blocking(lambda: puller.pull(device_id, user_id, verify_ownership))
+                while action is None and await subscription.wait(deadline - loop.time()):
+                    action = await self._run_blocking(lambda: puller.pull(device_id, user_id, False))
+            return Response.success({'action': action.value if action is not None else None})
+        except PermissionError:
+            return Response.unauthorized()
+        except DeviceNotFoundException as e:
+            Logger.error(e)
+            return Response.bad_request('Provided device_id does not match any of the user devices')
+        except ServerBusyException:
+            raise
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred when waiting for the instant action')
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from src import config
 from src.app.utils.auth.permission_level import PermissionLevel
 from src.app.utils.auth.token import Token
 from src.app.utils.http.request import Request
@@ -8,29 +9,25 @@ from pymodelio.exceptions.model_validation_exception import ModelValidationExcep
 from src.domain.mappers.scheduling.tasks.task_mapper import TaskMapper
 from src.domain.serializers.scheduling.scheduler_action_serializer import SchedulerActionSerializer
 from src.domain.serializers.scheduling.tasks.task_serializer import TaskSerializer
-from src.domain.services.device_scheduler.device_scheduler_retriever import DeviceSchedulerRetriever
-from src.domain.services.device_scheduler.device_scheduler_updater import DeviceSchedulerUpdater
 from src.app.utils.http.response import Response
 from src.app.utils.http.route import route
 from src.app.utils.logging.logger import Logger
 from src.app.controllers.base_controller import BaseController
 from src.app.utils.http import http_methods
-from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
-from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
 
 
 class SchedulerController(BaseController):
 
     def __init__(self, request: Request, token: Optional[Token] = None) -> None:
         super().__init__(request, token)
-        self.device_repository = DevicePGRepository()
-        self.device_scheduler_repository = DeviceSchedulerPGRepository()
+        self.device_repository = self._container.device_repository
+        self.device_scheduler_repository = self._container.device_scheduler_repository
 
     @route(http_methods.POST)
     def set_scheduling_tasks(self, device_id: str) -> Response:
         try:
             tasks = TaskMapper.map_all(self.get_json_body())
-            updater = DeviceSchedulerUpdater(self.device_repository, self.device_scheduler_repository)
+            updater = self._container.device_scheduler_updater
             updater.set_scheduling_tasks(device_id, self.get_authenticated_user_id(), tasks)
             return Response.success()
         except ModelValidationException as e:
@@ -46,7 +43,7 @@ class SchedulerController(BaseController):
     @route(http_methods.GET)
     def get_scheduling_tasks(self, device_id: str) -> Response:
         try:
-            retriever = DeviceSchedulerRetriever(self.device_repository, self.device_scheduler_repository)
+            retriever = self._container.device_scheduler_retriever
             tasks = retriever.get_scheduling_tasks(device_id, self.get_authenticated_user_id())
             return Response.success(TaskSerializer.serialize_all(tasks))
         except ModelValidationException as e:
@@ -63,8 +60,13 @@ class SchedulerController(BaseController):
     def get_next_scheduling_action(self, device_id: str) -> Response:
         try:
             self._validate_device_permission(device_id)
-            retriever = DeviceSchedulerRetriever(self.device_repository, self.device_scheduler_repository)
-            scheduler_action = retriever.get_next_scheduling_action(device_id, self.get_authenticated_user_id())
+            # Compiled schedules are cached while the listener tells which ones change
+            self._container.notifications_listener.start()
+            retriever = self._container.device_scheduler_retriever
+            scheduler_action = retriever.get_next_scheduling_action(
+                device_id, self.get_authenticated_user_id(),
+                verify_ownership=not self._is_ownership_proven_by_token(device_id)
+            )
             use_epochs = self.get_query_param('use_epochs', 'false').lower() == 'true'
             return Response.success(
                 SchedulerActionSerializer.serialize(
@@ -83,3 +85,34 @@ class SchedulerController(BaseController):
         except Exception as e:
             Logger.error(e)
             return Response.server_error('An error has occurred while getting device next scheduling action')
+
+    @route(http_methods.POST)
+    def get_next_scheduling_actions(self) -> Response:
+        """
+        Next scheduler actions of a list of devices, for gateways serving many of them. The body is the list of
+        device ids, and the response maps each of them to its next action
+        """
+        try:
+            device_ids = self.get_json_body()
+            if not isinstance(device_ids, list) or not all(isinstance(x, str) for x in device_ids):
+                return Response.bad_request('A list of device ids is expected')
+            if len(device_ids) > config.NEXT_ACTIONS_BATCH_MAX_DEVICES:
+                return Response.bad_request(
+                    f'At most {config.NEXT_ACTIONS_BATCH_MAX_DEVICES} device ids can be requested at once')
+            self._container.notifications_listener.start()
+            retriever = self._container.device_scheduler_retriever
+            next_actions = retriever.get_next_scheduling_actions(device_ids, self.get_authenticated_user_id())
+            use_epochs = self.get_query_param('use_epochs', 'false').lower() == 'true'
+            return Response.success({
+                device_id: SchedulerActionSerializer.serialize(
+                    scheduler_action,
+                    use_epochs=use_epochs
+                ) if scheduler_action is not None else {}
+                for device_id, scheduler_action in next_actions.items()
+            })
+        except DeviceNotFoundException as e:
+            Logger.error(e)
+            return Response.bad_request('Some of the provided device ids do not match any of the user devices')
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while getting devices next scheduling actions')
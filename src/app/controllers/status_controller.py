@@ -0,0 +1,26 @@
+from src.app.controllers.base_controller import BaseController
+from src.app.utils.http import http_methods
+from src.app.utils.http.response import Response
+from src.app.utils.http.route import route
+from src.app.utils.logging.logger import Logger
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.repositories.cached_device_repository import CachedDeviceRepository
+
+
+class StatusController(BaseController):
+
+    @route(http_methods.GET, alias='db_pool')
+    def get_db_pool_stats(self) -> Response:
+        try:
+            return Response.success(ConnectionPool.get_instance().stats())
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while obtaining database pool stats')
+
+    @route(http_methods.GET, alias='device_ownership_cache')
+    def get_device_ownership_cache_stats(self) -> Response:
+        try:
+            return Response.success(CachedDeviceRepository.stats())
+        except Exception as e:
+            Logger.error(e)
+            return Response.server_error('An error has occurred while obtaining device ownership cache stats')
@@ -1,3 +1,12 @@
-from src.app.api import on_starting
+from src.app import api
+from src.infrastructure.database.connection_pool import ConnectionPool
 
-on_starting()
+# The app, including its route table, is built once by the master and shared by the forked workers,
+# instead of each worker importing the controllers and mapping the routes again
+preload_app = True
+
+
+def on_starting(server):
+    api.on_starting(server)
+    # Workers must not inherit the connections opened by the migrations
+    ConnectionPool.close_instance()
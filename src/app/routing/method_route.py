@@ -1,3 +1,5 @@
+import inspect
+
 from src.app.utils.auth.permission_level import PermissionLevel
 
 
@@ -13,3 +15,6 @@ class MethodRoute:
 
     def get_path(self) -> str:
         return self.alias if self.alias is not None else F'/{self.method_name}'
+
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(getattr(self.controller_class, self.method_name, None))
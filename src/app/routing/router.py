@@ -1,4 +1,6 @@
-from typing import List, Optional, Type, cast
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, cast
 import os
 import pkgutil
 from pydoc import locate
@@ -17,6 +19,7 @@ from src.app.utils.http.response import Response
 import src.app.controllers as controllers_module
 from src.app.utils.auth.token import Token
 from src.app.utils.http.request import Request
+from src.domain.exceptions.server_busy_exception import ServerBusyException
 
 EXCLUDED_CONTROLLERS = ['base_controller']
 
@@ -29,6 +32,8 @@ class Router:
     def __init__(self) -> None:
         self.routes: List[ControllerRoute] = []
         self.http_methods = []
+        # Routed methods by (controller route, method path, http method), built once the routes are mapped
+        self._routed_methods: Dict[Tuple[str, str, str], MethodRoute] = {}
         self._register_instance()
         self._map_routes()
 
@@ -48,6 +53,36 @@ class Router:
             global_variables.ROUTER_INSTANCE.http_methods.append(http_method)
 
     def route(self, request, path):
+        response, routed_call = self._resolve_routed_call(request, path)
+        if routed_call is None:
+            return response
+        routed_method, token, params = routed_call
+        return self._handle_call_errors(lambda: self._call_controller_method(routed_method, request, token, *params))
+
+    async def route_async(self, request, path, run_blocking: Callable[[Callable[[], Any]], Awaitable]):
+        """
+        Routes the request from an event loop. Async controller methods run on the loop itself, while the
+        blocking ones are given to run_blocking
+        """
+        response, routed_call = self._resolve_routed_call(request, path)
+        if routed_call is None:
+            return response
+        routed_method, token, params = routed_call
+        if not routed_method.is_async():
+            return await run_blocking(lambda: self._handle_call_errors(
+                lambda: self._call_controller_method(routed_method, request, token, *params)))
+        try:
+            return await self._call_controller_method_async(routed_method, request, token, run_blocking, *params)
+        except ServerBusyException:
+            raise
+        except Exception as ex:
+            return self._get_call_error_response(ex)
+
+    def _resolve_routed_call(self, request, path) -> Tuple[Any, Optional[Tuple[MethodRoute, Optional[Token], list]]]:
+        """
+        Returns the response when the request must not reach a controller, or the routed method, the token and
+        the params of the method otherwise
+        """
         split_path = path.split('/')  # Aunque sea un string vacio, el primer elemento siempre existe
         controller_name = split_path[0]
         method_name = F'/{split_path[1]}' if len(split_path) > 1 else '/'
@@ -57,31 +92,37 @@ class Router:
         if cors_solver.is_cors_request():
             wanted_method = self._get_routed_method(controller_name, method_name, cors_solver.get_wanted_http_metod())
             if wanted_method is None:
-                return self.error_response('Not found', 404)
-            return cors_solver.get_cors_response()
+                return self.error_response('Not found', 404), None
+            return cors_solver.get_cors_response(), None
 
         routed_method = self._get_routed_method(controller_name, method_name, request.method)
         if routed_method is None:
-            return self.error_response('Not found', 404)
+            return self.error_response('Not found', 404), None
 
         # If a token is required
         token_parser = TokenParser(request)
         if not self._has_permission(routed_method.min_permission_level, token_parser.token):
-            return self.error_response('Unauthorized', 401)
+            return self.error_response('Unauthorized', 401), None
 
         params = []
         if len(split_path) > 2:
             params = split_path[2:]
+        return None, (routed_method, token_parser.token, params)
+
+    def _handle_call_errors(self, call: Callable[[], Any]):
         try:
-            return self._call_controller_method(routed_method, request, token_parser.token, *params)
-        except TypeError as ex:
+            return call()
+        except Exception as ex:
+            return self._get_call_error_response(ex)
+
+    def _get_call_error_response(self, ex: Exception):
+        if isinstance(ex, TypeError):
             print(
                 F'{console_colors.ERROR}An error has ocurred with message:'
                 F' {ex}{console_colors.ENDC}')
             return self.error_response('Bad method arguments', 400)
-        except Exception as ex:
-            print(F'{console_colors.ERROR}{ex}{console_colors.ENDC}')
-            return self.error_response('Internal server error', 500)
+        print(F'{console_colors.ERROR}{ex}{console_colors.ENDC}')
+        return self.error_response('Internal server error', 500)
 
     def print_routemap(self):  # pragma: no cover
         print(
@@ -103,15 +144,28 @@ class Router:
         Logger.debug("Mapeo de rutas iniciado...")
         print(F'\n{console_colors.INFO}Comenzando el mapeo de rutas:{console_colors.ENDC}')
         # self.http_methods se llena al cargar los controlles ya que importa los modulos
-        for controller in self._discover_controllers():
+        controllers = self._discover_controllers()
+        methods_by_class: Dict[str, list] = {}
+        for method in self.http_methods:
+            methods_by_class.setdefault(method['class_name'], []).append(method)
+        for controller in controllers:
             controller_route = ControllerRoute(controller)
             self.routes.append(controller_route)
-            for method in self.http_methods:
-                if method['class_name'] == controller_route.controller_name():
-                    controller_route.add_method(method['method_name'], method['type'], method['alias'],
-                                                method['min_permission_level'])
+            for method in methods_by_class.get(controller_route.controller_name(), []):
+                controller_route.add_method(method['method_name'], method['type'], method['alias'],
+                                            method['min_permission_level'])
+        self._index_routes()
         Logger.debug("Mapeo de rutas finalizado...")
 
+    def _index_routes(self) -> None:
+        self._routed_methods = {}
+        for cont_route in self.routes:
+            controller_name = cont_route.route()
+            for cont_method in cont_route.methods:
+                # The first method mapped to a path wins, like when they were looked up one by one
+                self._routed_methods.setdefault((controller_name, cont_method.get_path(), cont_method.http_type),
+                                                cont_method)
+
     @classmethod
     def _discover_controllers_modules(cls):
         controllers_path = os.path.dirname(controllers_module.__file__)
@@ -143,24 +197,33 @@ class Router:
                 self._discover_controllers_modules() if controllers_module]
 
     def _get_routed_method(self, controller_name: str, method: str, http_method: str) -> Optional[MethodRoute]:
-        for cont_route in self.routes:
-            if cont_route.route() == controller_name:
-                for cont_method in cont_route.methods:
-                    if cont_method.get_path() == method and cont_method.http_type == http_method:
-                        return cont_method
-        return None
+        return self._routed_methods.get((controller_name, method, http_method))
 
     @classmethod
     def _call_controller_method(cls, method_route: MethodRoute, request, token: Token, *method_params):
+        result = cls._get_controller_method(method_route, request, token)(*method_params)
+        if inspect.isawaitable(result):
+            # Async methods block the calling thread when they are not routed from an event loop
+            result = asyncio.run(result)
+        return result.jsonify()
+
+    @classmethod
+    async def _call_controller_method_async(cls, method_route: MethodRoute, request, token: Token,
+                                            run_blocking: Callable[[Callable[[], Any]], Awaitable], *method_params):
+        result: Response = await cls._get_controller_method(method_route, request, token, run_blocking)(
+            *method_params)
+        return result.jsonify()
+
+    @classmethod
+    def _get_controller_method(cls, method_route: MethodRoute, request, token: Token,
+                               run_blocking: Optional[Callable[[Callable[[], Any]], Awaitable]] = None) -> Callable:
         internal_request = Request(request.method, request.path, request.json if len(request.data) > 0 else {},
-                                   dict(request.args))
+                                   dict(request.args), run_blocking)
         controller_instance = method_route.controller_class(**{
             'request': internal_request,
             'token': token
         })
-        method = getattr(controller_instance, method_route.method_name)
-        result: Response = method(*method_params)
-        return result.jsonify()
+        return getattr(controller_instance, method_route.method_name)
 
     @classmethod
     def _has_permission(cls, min_permission_level: PermissionLevel, token: Optional[Token]) -> bool:
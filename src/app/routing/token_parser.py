@@ -1,11 +1,25 @@
+import os
+import threading
+from typing import Dict, Optional, Type
+
+from src import config
 from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.auth.token import Token
 from src.app.utils.auth.user_token import UserToken
+from src.app.utils.jwt_helper import JWTHelper
+from src.common import dates
+from src.common.ttl_lru_cache import TTLLRUCache
 
 
 class TokenParser:
     TOKEN_TYPE = 'Bearer'
     AUTH_HEADER = 'Authorization'
+    # Token classes by the prefix of their encoded form
+    TOKEN_CLASSES: Dict[str, Type[Token]] = {x._get_type_prefix(): x for x in [UserToken, DeviceToken]}
+    # Already validated tokens by their encoded form, shared by every request of the process
+    _cache: Optional[TTLLRUCache] = None
+    _cache_pid: Optional[int] = None
+    _cache_lock = threading.Lock()
 
     def __init__(self, request) -> None:
         self._request = request
@@ -16,18 +30,45 @@ class TokenParser:
     def token(self) -> Token:
         return self._token
 
+    @classmethod
+    def get_cache(cls) -> TTLLRUCache:
+        with cls._cache_lock:
+            if cls._cache is None or cls._cache_pid != os.getpid():
+                cls._cache = TTLLRUCache(config.TOKENS_CACHE_SIZE)
+                cls._cache_pid = os.getpid()
+            return cls._cache
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Forgets every decoded token, e.g. after changing the secret they are signed with
+        """
+        cls.get_cache().clear()
+
     def __parse_token(self) -> None:
         try:
             token = self.__get_token_from_header()
             if not token or self.TOKEN_TYPE not in token:
                 return
             token = self.__remove_token_type(token)
-            for token_type in {UserToken, DeviceToken}:
-                if token_type.is_encoded_form(token):
-                    self._token = token_type.from_encoded(token)
+            cache = self.get_cache()
+            found, self._token = cache.get(token)
+            if found:
+                return
+            token_class = self.TOKEN_CLASSES.get(token[:1])
+            if token_class is None:
+                return
+            self._token = token_class.from_encoded(token)
+            cache.set(token, self._token, self.__get_cache_ttl(token_class, token))
         except Exception:
             pass
 
+    def __get_cache_ttl(self, token_class: Type[Token], token: str) -> float:
+        expiration = JWTHelper.get_expiration(token_class._clean_type_prefix(token))
+        if expiration is None:
+            return config.TOKENS_CACHE_TTL
+        return min(config.TOKENS_CACHE_TTL, expiration - dates.timestamp_now())
+
     def __get_token_from_header(self) -> str:
         return self._request.headers[self.AUTH_HEADER]
 
@@ -0,0 +1,34 @@
+import json
+from typing import Optional, Union
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import Headers
+
+
+class AsgiRequest:
+    """
+    Request received by the ASGI app, with the attributes of the flask requests used by the router
+    """
+
+    def __init__(self, method: str, path: str, headers: Headers, query_string: bytes, data: bytes) -> None:
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.data = data
+        # Like flask, only the first value of each query param is kept
+        self.args = {}
+        for name, value in parse_qsl(query_string.decode('latin-1'), keep_blank_values=True):
+            self.args.setdefault(name, value)
+
+    @classmethod
+    def from_scope(cls, scope: dict, data: bytes) -> 'AsgiRequest':
+        headers = Headers([(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']])
+        return cls(scope['method'], scope['path'], headers, scope.get('query_string', b''), data)
+
+    @property
+    def json(self) -> Optional[Union[dict, list]]:
+        # Like flask, bodies are only parsed when they are declared as JSON
+        mimetype = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if mimetype != 'application/json' and not mimetype.endswith('+json'):
+            return None
+        return json.loads(self.data)
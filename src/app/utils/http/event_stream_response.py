@@ -0,0 +1,91 @@
+import asyncio
+from typing import AsyncGenerator, Iterator, Optional, Union
+
+from flask import Response as FlaskResponse
+
+from src.app.utils.http.json_backend import JSONBackend
+
+
+class ServerSentEvent:
+    """
+    Event of a text/event-stream response. Events without name are sent as comments, which clients ignore, so
+    they are used as heartbeats
+    """
+
+    def __init__(self, name: Optional[str] = None, data: Optional[Union[dict, list]] = None) -> None:
+        self._name = name
+        self._data = data
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
+    @property
+    def data(self) -> Optional[Union[dict, list]]:
+        return self._data
+
+    @classmethod
+    def heartbeat(cls) -> 'ServerSentEvent':
+        return cls()
+
+    def encode(self) -> bytes:
+        if self._name is None:
+            return b':\n\n'
+        return b'event: ' + self._name.encode('utf-8') + b'\ndata: ' + JSONBackend.dumps(self._data) + b'\n\n'
+
+
+class EventStreamResponse:
+    """
+    Response of a Server-Sent Events endpoint, whose events are produced while the connection is open
+    """
+
+    def __init__(self, events: AsyncGenerator[ServerSentEvent, None], retry_delay: Optional[float] = None) -> None:
+        self._events = events
+        self._retry_delay = retry_delay
+
+    @property
+    def status_code(self) -> int:
+        return 200
+
+    @property
+    def events(self) -> AsyncGenerator[ServerSentEvent, None]:
+        return self._events
+
+    def jsonify(self) -> 'EventStreamFlaskResponse':
+        return EventStreamFlaskResponse(self._encode())
+
+    async def _encode(self) -> AsyncGenerator[bytes, None]:
+        try:
+            if self._retry_delay is not None:
+                yield f'retry: {int(self._retry_delay * 1000)}\n\n'.encode('utf-8')
+            async for event in self._events:
+                yield event.encode()
+        finally:
+            # The events are closed right away (and not when collected) so their subscriptions end with the stream
+            await self._events.aclose()
+
+
+class EventStreamFlaskResponse(FlaskResponse):
+    """
+    The ASGI app sends the async_body chunks from its event loop. WSGI servers iterate the body instead, which
+    runs the events on an event loop of their own and holds the thread while the connection is open
+    """
+
+    def __init__(self, async_body: AsyncGenerator[bytes, None]) -> None:
+        super().__init__(self._iterate_blocking(async_body), status=200, mimetype='text/event-stream',
+                         headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}, direct_passthrough=True)
+        self.async_body = async_body
+
+    @staticmethod
+    def _iterate_blocking(async_body: AsyncGenerator[bytes, None]) -> Iterator[bytes]:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(async_body.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(async_body.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
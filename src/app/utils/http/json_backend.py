@@ -0,0 +1,53 @@
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict
+
+from src import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # Numeric columns are read as Decimal
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Like orjson, which encodes them natively
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class JSONBackend:
+    """
+    Encodes the response bodies with the library set in JSON_BACKEND, using the standard json one when it is
+    not available
+    """
+    BACKENDS: Dict[str, Callable[[Any], bytes]] = {'json': _json_dumps}
+    if orjson is not None:
+        BACKENDS['orjson'] = _orjson_dumps
+
+    _dumps: Callable[[Any], bytes] = staticmethod(BACKENDS.get(config.JSON_BACKEND, _json_dumps))
+
+    @classmethod
+    def dumps(cls, obj: Any) -> bytes:
+        return cls._dumps(obj)
+
+    @classmethod
+    def name(cls) -> str:
+        return next(name for name, dumps in cls.BACKENDS.items() if dumps is cls._dumps)
+
+    @classmethod
+    def use(cls, name: str) -> None:
+        cls._dumps = staticmethod(cls.BACKENDS.get(name, _json_dumps))
@@ -1,13 +1,15 @@
-from typing import Union
+from typing import Any, Awaitable, Callable, Optional, Union
 
 
 class Request:
 
-    def __init__(self, method: str, path: str, body: Union[dict, list], query_params: dict) -> str:
+    def __init__(self, method: str, path: str, body: Union[dict, list], query_params: dict,
+                 run_blocking: Optional[Callable[[Callable[[], Any]], Awaitable]] = None) -> str:
         self._method = method
         self._path = path
         self._body = body
         self._query_params = query_params
+        self._run_blocking = run_blocking
 
     @property
     def method(self) -> str:
@@ -25,6 +27,13 @@ class Request:
     def query_params(self) -> dict:
         return self._query_params
 
+    @property
+    def run_blocking(self) -> Optional[Callable[[Callable[[], Any]], Awaitable]]:
+        """
+        Runs the blocking calls of the request when it is served from an event loop, like the ASGI app does
+        """
+        return self._run_blocking
+
     @staticmethod
     def from_body(body: Union[dict, list]) -> 'Request':
         return Request(None, None, body, {})
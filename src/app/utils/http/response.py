@@ -1,6 +1,8 @@
 from http.client import HTTPResponse
 from typing import Union, List, Optional
-from flask import jsonify
+from flask import Response as FlaskResponse
+
+from src.app.utils.http.json_backend import JSONBackend
 
 
 class Response:
@@ -57,6 +59,4 @@ class Response:
         })
 
     def jsonify(self) -> HTTPResponse:
-        jsonified_response = jsonify(self.body)
-        jsonified_response.status_code = self.status_code
-        return jsonified_response
+        return FlaskResponse(JSONBackend.dumps(self.body), status=self.status_code, mimetype='application/json')
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import jwt
 
 from src import config
@@ -12,3 +14,10 @@ class JWTHelper:
     @staticmethod
     def encode_token(token_data: dict) -> str:
         return jwt.encode(token_data, config.APP_SECRET, algorithm=config.HASH_ALGORITHM)
+
+    @staticmethod
+    def get_expiration(str_token: str) -> Optional[int]:
+        """
+        Returns the exp claim of an already validated token, as a POSIX timestamp
+        """
+        return jwt.decode(str_token, options={'verify_signature': False}).get('exp')
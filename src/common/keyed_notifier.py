@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from typing import Dict, Hashable, Optional, Set
+
+
+class KeyedNotifier:
+    """
+    Wakes up the coroutines subscribed to a key. Notifications can be sent from any thread, and a subscription
+    remembers a notification sent while it was not waiting, so it is never lost between two waits
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[Hashable, Set['Subscription']] = {}
+
+    def subscribe(self, key: Hashable, event: Optional[asyncio.Event] = None) -> 'Subscription':
+        """
+        Must be called from the event loop that will wait for the notifications. The given event, if any, is set
+        when the subscription is notified
+        """
+        subscription = Subscription(self, key, asyncio.get_running_loop(), event)
+        with self._lock:
+            self._subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def notify(self, key: Hashable) -> int:
+        """
+        Returns the amount of notified subscriptions
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(key, ()))
+        for subscription in subscriptions:
+            subscription.set()
+        return len(subscriptions)
+
+    def notify_all(self) -> int:
+        with self._lock:
+            subscriptions = [subscription for key_subscriptions in self._subscriptions.values()
+                             for subscription in key_subscriptions]
+        for subscription in subscriptions:
+            subscription.set()
+        return len(subscriptions)
+
+    def subscriptions_count(self, key: Hashable) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(key, ()))
+
+    def unsubscribe(self, subscription: 'Subscription') -> None:
+        with self._lock:
+            key_subscriptions = self._subscriptions.get(subscription.key)
+            if key_subscriptions is None:
+                return
+            key_subscriptions.discard(subscription)
+            if not key_subscriptions:
+                del self._subscriptions[subscription.key]
+
+
+class Subscription:
+    """
+    Several subscriptions can share the event they set when notified, so a coroutine can wait for any of them
+    and then check which ones were notified
+    """
+
+    def __init__(self, notifier: KeyedNotifier, key: Hashable, loop: asyncio.AbstractEventLoop,
+                 event: Optional[asyncio.Event] = None) -> None:
+        self._notifier = notifier
+        self._key = key
+        self._loop = loop
+        self._event = event if event is not None else asyncio.Event()
+        self._notified = False
+
+    @property
+    def key(self) -> Hashable:
+        return self._key
+
+    def set(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._set_notified)
+        except RuntimeError:
+            # The loop was closed, so nobody is waiting anymore
+            pass
+
+    def consume(self) -> bool:
+        """
+        Returns if the subscription was notified since the last time it was consumed
+        """
+        notified = self._notified
+        self._notified = False
+        return notified
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Returns if the subscription was notified before the timeout, in seconds
+        """
+        if not self._notified:
+            # asyncio.wait instead of wait_for, which may swallow a cancellation when the event is set at that time
+            waiting = asyncio.ensure_future(self._event.wait())
+            try:
+                await asyncio.wait([waiting], timeout=timeout)
+            finally:
+                waiting.cancel()
+        self._event.clear()
+        return self.consume()
+
+    def close(self) -> None:
+        self._notifier.unsubscribe(self)
+
+    def _set_notified(self) -> None:
+        self._notified = True
+        self._event.set()
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
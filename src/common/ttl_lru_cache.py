@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLLRUCache:
+    """
+    Thread safe cache bounded to max_size entries, evicting the least recently used one when full.
+    Every entry expires after its own time to live, in seconds. The generation of a key changes every time it is
+    deleted or the cache is cleared, so a value loaded while it was being invalidated is not stored
+    """
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_size = max(max_size, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        # Generations of the last deleted keys. Dropping one changes the base generation of every key instead
+        self._generations: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self._base_generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Returns if the key was found and its value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[0]
+
+    def get_generation(self, key: Hashable) -> Tuple[int, int]:
+        """
+        Returns the generation of the key, to be read before loading a value that is set with it
+        """
+        with self._lock:
+            return self._base_generation, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, ttl: float, generation: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Stores the value, unless the given generation of the key changed (as it was invalidated meanwhile).
+        Returns if it was stored
+        """
+        with self._lock:
+            if generation is not None and generation != (self._base_generation, self._generations.get(key, 0)):
+                return False
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._generations.move_to_end(key)
+            if len(self._generations) > self._max_size:
+                self._generations.popitem(last=False)
+                self._base_generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._base_generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_size': self._max_size,
+                'size': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions
+            }
@@ -8,6 +8,15 @@ APP_USE_RELOADER = False
 APP_RUN_DEBUG_MODE = True
 CLIENT_APP_FOLDER = './client'
 HOST = '0.0.0.0'  # For running it locally, but exposed to the LAN
+# Library used to encode the responses: orjson (falls back to json when it is not installed) or json
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
+
+# --------------------- #
+# -     ASGI APP      - #
+# --------------------- #
+ASGI_THREAD_POOL_SIZE = int(os.environ.get('ASGI_THREAD_POOL_SIZE', 32))  # Threads running the blocking endpoints
+# Blocking calls waiting for a thread, further requests are answered with 503
+ASGI_MAX_PENDING_CALLS = int(os.environ.get('ASGI_MAX_PENDING_CALLS', 1000))
 
 # --------------------- #
 # -     APP INFO      - #
@@ -25,11 +34,99 @@ DB_NAME = os.environ.get('DB_NAME', 'devices_management_dev')
 DB_USERNAME = os.environ.get('DB_USERNAME', 'postgres')
 DB_PASSWORD = os.environ.get('DB_PASSWORD', 'postgres')
 
+# --------------------- #
+# - DATABASE POOLING  - #
+# --------------------- #
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_CHECKOUT_TIMEOUT = 10  # Seconds
+DB_POOL_HEALTH_CHECK_INTERVAL = 30  # Seconds
+DB_POOL_MAX_IDLE_TIME = 300  # Seconds
+
+# --------------------- #
+# -  DEVICES CACHING  - #
+# --------------------- #
+DEVICE_OWNERSHIP_CACHE_SIZE = 10000  # Entries kept by each worker
+DEVICE_OWNERSHIP_CACHE_TTL = 300  # Seconds
+DEVICE_OWNERSHIP_CACHE_NEGATIVE_TTL = 5  # Seconds, shorter as the device may be created later
+
+# --------------------- #
+# - SCHEDULES CACHING - #
+# --------------------- #
+DEVICE_SCHEDULES_CACHE_SIZE = 10000  # Compiled schedules kept by each worker
+DEVICE_SCHEDULES_CACHE_TTL = 3600  # Seconds, schedules are also dropped when any worker sets their tasks
+
+# --------------------- #
+# -   NEXT ACTIONS    - #
+# --------------------- #
+NEXT_ACTIONS_ADVANCE_BATCH_SIZE = 1000  # Passed next actions replaced by each transaction
+NEXT_ACTIONS_ADVANCE_INTERVAL = 60  # Seconds between the passes of advance_next_actions.py when run continuously
+NEXT_ACTIONS_BATCH_MAX_DEVICES = 500  # Devices whose next actions can be requested at once
+
+# --------------------- #
+# - SCHEDULED ACTIONS - #
+# --------------------- #
+SCHEDULED_ACTIONS_DISPATCH_BATCH_SIZE = 1000  # Due actions advanced and pushed by each transaction
+# Seconds the dispatcher waits at most, in case it missed the notification of new tasks
+SCHEDULED_ACTIONS_DISPATCH_MAX_WAIT = 60
+SCHEDULED_ACTIONS_DISPATCH_RETRY_DELAY = 0.05  # Seconds waited when the first due action is being pushed by another one
+# PostgreSQL advisory lock held (shared) by the dispatchers, so advance_next_actions.py does not run along with them
+SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY = 7230001
+
 # --------------------- #
 # -        JWT        - #
 # --------------------- #
 APP_SECRET = os.environ.get('APP_SECRET', 'WeapAppSecret')
 HASH_ALGORITHM = 'HS256'
+TOKENS_CACHE_SIZE = 10000  # Decoded tokens kept by each worker
+TOKENS_CACHE_TTL = 300  # Seconds, tokens with an earlier expiration are kept until then
+
+# --------------------- #
+# -   DEVICE TOKENS   - #
+# --------------------- #
+# Opt-in: a device token proves the ownership of its device, so device requests skip the database check
+TRUST_DEVICE_TOKENS = os.environ.get('TRUST_DEVICE_TOKENS', 'false').lower() == 'true'
+# Seconds since its generation a device token is trusted, older tokens are still checked against the database
+DEVICE_TOKENS_TRUST_LIFETIME = int(os.environ.get('DEVICE_TOKENS_TRUST_LIFETIME', 30 * 24 * 60 * 60))
+DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL = 30  # Seconds
+
+# --------------------- #
+# -   DEVICE EVENTS   - #
+# --------------------- #
+DEVICE_STATE_CHANNEL = 'device_state'  # Notified with the device id when its state is updated
+DEVICE_SCHEDULER_CHANNEL = 'device_scheduler'  # Notified with the device id when its tasks are set
+DEVICE_EVENTS_HEARTBEAT_INTERVAL = 15  # Seconds without events after which a heartbeat is sent
+DEVICE_EVENTS_SEND_TIMEOUT = 30  # Seconds a client can take to receive an event before it is disconnected
+DEVICE_EVENTS_RETRY_DELAY = 5  # Seconds clients wait before connecting again
+# Open event streams kept by each worker, further connections are answered with 503
+DEVICE_EVENTS_MAX_STREAMS = int(os.environ.get('DEVICE_EVENTS_MAX_STREAMS', 50000))
+
+# --------------------- #
+# -MEASURES INGESTION - #
+# --------------------- #
+# Batches with at least this amount of measures are streamed with COPY instead of a single INSERT
+MEASURES_COPY_THRESHOLD = int(os.environ.get('MEASURES_COPY_THRESHOLD', 1000))
+
+# --------------------- #
+# -MEASURES PARTITIONS- #
+# --------------------- #
+MEASURES_PARTITION_DAYS = 7  # Partitions start on mondays when they span whole weeks
+MEASURES_PARTITIONS_AHEAD = 4  # Partitions created in advance after the current one
+MEASURES_RETENTION_DAYS = int(os.environ.get('MEASURES_RETENTION_DAYS', 0))  # 0 keeps the measures forever
+
+# --------------------- #
+# - MEASURES ROLLUPS  - #
+# --------------------- #
+# Minutes. Changing them needs a new migration that builds the rollups of the added resolutions
+MEASURES_ROLLUP_RESOLUTIONS = [1, 15, 60]
+# Rollups are expected to be kept longer than the raw measures. 0 keeps them forever
+MEASURES_ROLLUPS_RETENTION_DAYS = int(os.environ.get('MEASURES_ROLLUPS_RETENTION_DAYS', 0))
+
+# --------------------- #
+# -MEASURES COMPACTION- #
+# --------------------- #
+MEASURES_COMPACTION_CHUNK_SIZE = 10000  # Rows deleted by each transaction
+MEASURES_COMPACTION_LOCK_TIMEOUT = 5  # Seconds waited for the locks needed to drop a partition
 
 # --------------------- #
 # -MEASURES SUMMARIZER- #
@@ -40,3 +137,6 @@ MAX_SUMMARIZED_MEASURES_TO_SHOW = 25
 # -  INSTANT ACTIONS  - #
 # --------------------- #
 INSTANT_ACTIONS_LIFETIME = 20  # Seconds
+INSTANT_ACTIONS_CHANNEL = 'instant_actions'  # Notified with the device id when an action is pushed
+INSTANT_ACTIONS_WAIT_DEFAULT_TIMEOUT = 25  # Seconds a long polling device waits when it does not give a timeout
+INSTANT_ACTIONS_WAIT_MAX_TIMEOUT = int(os.environ.get('INSTANT_ACTIONS_WAIT_MAX_TIMEOUT', 60))  # Seconds
@@ -0,0 +1,2 @@
+class ConnectionPoolExhaustedException(Exception):
+    pass
@@ -0,0 +1,2 @@
+class ServerBusyException(Exception):
+    pass
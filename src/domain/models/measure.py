@@ -8,7 +8,7 @@ from pymodelio.validators import FloatValidator
 
 
 class Measure(PymodelioModel):
-    _ROUND_DECIMALS = 2
+    ROUND_DECIMALS = 2
     _timestamp: Attr(datetime, init_alias='timestamp')
     _voltage: Attr(float, init_alias='voltage', validator=FloatValidator(min_value=0))
     _current: Attr(float, init_alias='current', validator=FloatValidator(min_value=0))
@@ -40,12 +40,19 @@ class Measure(PymodelioModel):
 
     @property
     def voltage(self) -> float:
-        return round(self._voltage, self._ROUND_DECIMALS)
+        return round(self._voltage, self.ROUND_DECIMALS)
 
     @property
     def current(self) -> float:
-        return round(self._current, self._ROUND_DECIMALS)
+        return round(self._current, self.ROUND_DECIMALS)
 
     @property
     def power(self) -> float:
-        return round(self.voltage * self.current, self._ROUND_DECIMALS)
+        return self.compute_power(self.voltage, self.current)
+
+    @classmethod
+    def compute_power(cls, voltage: float, current: float) -> float:
+        """
+        Power of the given (already rounded) voltage and current, rounded like them
+        """
+        return round(voltage * current, cls.ROUND_DECIMALS)
@@ -0,0 +1,55 @@
+import bisect
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.daily_task import DailyTask
+from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+
+_WEEK = timedelta(days=7)
+
+
+class CompiledSchedule:
+    """
+    Scheduling tasks compiled to find the next action after a moment without going through every task. One time
+    tasks are sorted by moment and daily tasks are expanded to their occurrences in a week, sorted by their offset
+    since monday, so both are binary searched. Simultaneous actions are resolved like in SchedulingStack, by the
+    order of the tasks
+    """
+
+    def __init__(self, tasks: List[Task]) -> None:
+        one_time, weekly = [], []
+        for position, task in enumerate(tasks):
+            if isinstance(task, DailyTask):
+                time_offset = timedelta(hours=task.moment.hour, minutes=task.moment.minute,
+                                        seconds=task.moment.second, microseconds=task.moment.microsecond)
+                for weekday in set(task.weekdays):
+                    weekly.append((timedelta(days=weekday.value) + time_offset, position, task.action))
+            else:
+                one_time.append((task.moment, position, task.action))
+        self._one_time = sorted(one_time, key=lambda x: (x[0], x[1]))
+        self._one_time_moments = [x[0] for x in self._one_time]
+        self._weekly = sorted(weekly, key=lambda x: (x[0], x[1]))
+        self._weekly_offsets = [x[0] for x in self._weekly]
+
+    def get_next_action(self, after: datetime) -> Optional[SchedulerAction]:
+        """
+        Returns the first action scheduled at the given moment or later
+        """
+        candidates: List[Tuple[datetime, int, TaskAction]] = []
+        index = bisect.bisect_left(self._one_time_moments, after)
+        if index < len(self._one_time):
+            candidates.append(self._one_time[index])
+        if self._weekly:
+            week_start = (after - timedelta(days=after.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+            index = bisect.bisect_left(self._weekly_offsets, after - week_start)
+            if index == len(self._weekly):
+                # Every occurrence of this week passed, so the first one of the next week is taken
+                index, week_start = 0, week_start + _WEEK
+            offset, position, action = self._weekly[index]
+            candidates.append((week_start + offset, position, action))
+        if not candidates:
+            return None
+        moment, _, action = min(candidates, key=lambda x: (x[0], x[1]))
+        return SchedulerAction(action=action, moment=moment)
@@ -24,15 +24,18 @@ class DailyTask(Task):
 
     def get_next_scheduler_action(self) -> SchedulerAction:
         now = dates.now()
-        current_weekday = Weekday(now.weekday())
-        task_weekday = Weekday.next_after(current_weekday) if now.time() > self.moment.time() else current_weekday
-        # Update the current time to use the same time the moment of the task but shift the days
+        # Update the current time to use the same time the moment of the task, and then shift the days until the
+        # first of its weekdays in which it has not passed yet
         task_moment = now.replace(
             hour=self.moment.hour,
             minute=self.moment.minute,
             second=self.moment.second,
             microsecond=self.moment.microsecond
-        ) + timedelta(days=Weekday.days_between(current_weekday, task_weekday))
+        )
+        if task_moment < now:
+            task_moment += timedelta(days=1)
+        while Weekday(task_moment.weekday()) not in self.weekdays:
+            task_moment += timedelta(days=1)
         return SchedulerAction(
             action=self.action,
             moment=task_moment
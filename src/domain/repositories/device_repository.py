@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List
+from typing import Collection, List
 
 from src.domain.models.device import Device
 from src.domain.models.scheduling.tasks.task import Task
@@ -14,6 +14,9 @@ class DeviceRepository(ABC):
     @abstractmethod
     def exists_for_user(self, device_id: str, user_id: str) -> bool: pass
 
+    @abstractmethod
+    def all_exist_for_user(self, device_ids: Collection[str], user_id: str) -> bool: pass
+
     @abstractmethod
     def get_user_devices(self, user_id: str) -> List[Device]: pass
 
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Tuple
 
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
 from src.domain.models.scheduling.tasks.task import Task
 
 
@@ -11,3 +13,17 @@ class DeviceSchedulerRepository(ABC):
 
     @abstractmethod
     def get_scheduling_tasks(self, device_id: str) -> List[Task]: pass
+
+    @abstractmethod
+    def get_next_scheduling_action(self, device_id: str,
+                                   after: datetime) -> Tuple[bool, Optional[SchedulerAction]]: pass
+
+    @abstractmethod
+    def get_next_scheduling_actions(self, device_ids: Collection[str],
+                                    after: datetime) -> Dict[str, Tuple[bool, Optional[SchedulerAction]]]: pass
+
+    @abstractmethod
+    def advance_next_scheduling_actions(self, after: datetime, limit: int) -> List[Tuple[str, SchedulerAction]]: pass
+
+    @abstractmethod
+    def get_first_next_action_moment(self) -> Optional[datetime]: pass
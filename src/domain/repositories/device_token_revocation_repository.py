@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class DeviceTokenRevocationRepository(ABC):
+
+    @abstractmethod
+    def revoke(self, device_id: str, revoked_before: datetime) -> None: pass
+
+    @abstractmethod
+    def get(self, device_id: str) -> Optional[datetime]: pass
+
+    @abstractmethod
+    def get_all(self, revoked_after: Optional[datetime] = None) -> Dict[str, datetime]: pass
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from src.domain.models.scheduling.tasks.task_action import TaskAction
 
@@ -11,7 +11,7 @@ class InstantActionRepository(ABC):
     def push(self, device_id: str, action: TaskAction) -> None: pass
 
     @abstractmethod
-    def pull(self, device_id: str, pull_until: datetime) -> Optional[TaskAction]: pass
+    def push_all(self, actions: List[Tuple[str, TaskAction]]) -> None: pass
 
     @abstractmethod
-    def clean_for(self, device_id: str) -> None: pass
+    def pull(self, device_id: str, pull_until: datetime) -> Optional[TaskAction]: pass
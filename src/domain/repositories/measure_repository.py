@@ -17,3 +17,19 @@ class MeasureRepository(ABC):
 
     @abstractmethod
     def create_multiple(self, measures: List[Measure], device_id: str) -> None: pass
+
+    @abstractmethod
+    def get_summarized_from_last_minutes(self, device_id: str, time_interval: int,
+                                         slices_count: int) -> List[Measure]: pass
+
+    @abstractmethod
+    def get_all_for_user_summarized_from_last_minutes(self, user_id: str, time_interval: int,
+                                                      slices_count: int) -> List[Measure]: pass
+
+    @abstractmethod
+    def get_summarized_from_rollups(self, device_id: str, time_interval: int, slices_count: int,
+                                    resolution: int) -> List[Measure]: pass
+
+    @abstractmethod
+    def get_all_for_user_summarized_from_rollups(self, user_id: str, time_interval: int, slices_count: int,
+                                                 resolution: int) -> List[Measure]: pass
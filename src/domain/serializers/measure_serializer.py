@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+from typing import List
+
 from src.common import dates
 from src.domain.models.measure import Measure
 from src.domain.serializers.serializer import Serializer
@@ -13,3 +16,31 @@ class MeasureSerializer(Serializer):
             'current': model.current,
             'power': model.power
         }
+
+    @classmethod
+    def serialize_all(cls, models: List[Measure]) -> List[dict]:
+        """
+        Gives the same output than serialize, but writes the timestamps (naive UTC or UTC ones) without building
+        a new datetime for each of them
+        """
+        serialized = []
+        append = serialized.append
+        compute_power = Measure.compute_power
+        for model in models:
+            voltage = model.voltage
+            current = model.current
+            append({
+                'timestamp': cls._to_utc_isostring(model.timestamp),
+                'voltage': voltage,
+                'current': current,
+                'power': compute_power(voltage, current)
+            })
+        return serialized
+
+    @staticmethod
+    def _to_utc_isostring(timestamp: datetime) -> str:
+        if timestamp.tzinfo is None:
+            return timestamp.isoformat() + '+00:00'
+        if timestamp.tzinfo is timezone.utc:
+            return timestamp.isoformat()
+        return dates.to_utc_isostring(timestamp)
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from src import config
+from src.common import dates
+from src.domain.repositories.device_token_revocation_repository import DeviceTokenRevocationRepository
+
+
+class DeviceTokenRevocationList:
+    """
+    In memory set of the revoked device tokens, reloaded from the repository every
+    DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL seconds. Only the moment the tokens of each device were revoked is
+    kept, as every token generated before it is refused. The set is shared by every instance of the process, and
+    forked workers get their own one.
+    A single thread reloads it, while the others keep reading the previous set. When device tokens are trusted, only
+    the revocations of the last DEVICE_TOKENS_TRUST_LIFETIME seconds are loaded, and the older tokens (which are
+    checked against the database anyway) look up their revocation in the repository
+    """
+    _revocations: Dict[str, datetime] = {}
+    # Tokens generated before it may have been revoked by revocations that are not loaded
+    _loaded_after: Optional[datetime] = None
+    _refreshed_at: Optional[float] = None
+    _refreshing = False
+    # Revocations made while reloading, which the reloaded set may miss
+    _revoked_while_refreshing: Dict[str, datetime] = {}
+    _pid: Optional[int] = None
+    _condition = threading.Condition()
+
+    def __init__(self, repository: DeviceTokenRevocationRepository,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._repository = repository
+        self._clock = clock
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Forgets the loaded revocations, so they are reloaded on the next check
+        """
+        with cls._condition:
+            cls._revocations = {}
+            cls._loaded_after = None
+            cls._refreshed_at = None
+
+    def is_revoked(self, device_id: str, issued_at: datetime) -> bool:
+        revocations, loaded_after = self._get_revocations()
+        if loaded_after is not None and issued_at < loaded_after:
+            revoked_before = self._repository.get(device_id)
+        else:
+            revoked_before = revocations.get(device_id)
+        return revoked_before is not None and issued_at < revoked_before
+
+    def revoke(self, device_id: str, revoked_before: datetime) -> None:
+        self._repository.revoke(device_id, revoked_before)
+        cls = type(self)
+        with cls._condition:
+            # Other workers see the revocation on their next refresh
+            cls._revocations = {**cls._revocations, device_id: revoked_before}
+            if cls._refreshing:
+                cls._revoked_while_refreshing[device_id] = revoked_before
+
+    def _get_revocations(self) -> Tuple[Dict[str, datetime], Optional[datetime]]:
+        cls = type(self)
+        with cls._condition:
+            if cls._pid != os.getpid():
+                # The revocations of the parent process are not refreshed in this one
+                cls._revocations = {}
+                cls._loaded_after = None
+                cls._refreshed_at = None
+                cls._refreshing = False
+                cls._pid = os.getpid()
+            while cls._refreshed_at is None and cls._refreshing:
+                # There are no revocations to read until they are first loaded
+                cls._condition.wait()
+            now = self._clock()
+            if cls._refreshing or (cls._refreshed_at is not None and
+                                   now - cls._refreshed_at < config.DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL):
+                return cls._revocations, cls._loaded_after
+            cls._refreshing = True
+            cls._revoked_while_refreshing = {}
+        try:
+            loaded_after = dates.now() - timedelta(seconds=config.DEVICE_TOKENS_TRUST_LIFETIME) \
+                if config.TRUST_DEVICE_TOKENS else None
+            # Loaded without holding the lock, so the requests of other threads are not kept waiting
+            revocations = self._repository.get_all(loaded_after)
+        except Exception:
+            with cls._condition:
+                cls._refreshing = False
+                cls._condition.notify_all()
+            raise
+        with cls._condition:
+            cls._revocations = {**revocations, **cls._revoked_while_refreshing}
+            cls._loaded_after = loaded_after
+            cls._refreshed_at = now
+            cls._refreshing = False
+            cls._condition.notify_all()
+            return cls._revocations, cls._loaded_after
@@ -0,0 +1,19 @@
+from src.common import dates
+from src.domain.exceptions.unregistered_device_exception import UnregisteredDeviceException
+from src.domain.repositories.device_repository import DeviceRepository
+from src.domain.services.auth.device_token_revocation_list import DeviceTokenRevocationList
+
+
+class DeviceTokensRevoker:
+
+    def __init__(self, device_repository: DeviceRepository, revocation_list: DeviceTokenRevocationList) -> None:
+        self._device_repository = device_repository
+        self._revocation_list = revocation_list
+
+    def revoke(self, user_id: str, device_id: str) -> None:
+        """
+        Revokes every token generated for the device until now
+        """
+        if not self._device_repository.exists_for_user(device_id, user_id):
+            raise UnregisteredDeviceException()
+        self._revocation_list.revoke(device_id, dates.now())
@@ -1,8 +1,11 @@
-from typing import List, Optional
+from typing import Callable, Collection, Dict, List, Optional
 
+from src import config
+from src.common import dates
+from src.common.ttl_lru_cache import TTLLRUCache
 from src.domain.exceptions.device_not_found_exception import DeviceNotFoundException
+from src.domain.models.scheduling.compiled_schedule import CompiledSchedule
 from src.domain.models.scheduling.scheduler_action import SchedulerAction
-from src.domain.models.scheduling.scheduling_stack import SchedulingStack
 from src.domain.models.scheduling.tasks.task import Task
 from src.domain.repositories.device_repository import DeviceRepository
 from src.domain.repositories.device_scheduler_repository import DeviceSchedulerRepository
@@ -11,16 +14,74 @@ from src.domain.repositories.device_scheduler_repository import DeviceSchedulerR
 class DeviceSchedulerRetriever:
 
     def __init__(self, device_repository: DeviceRepository,
-                 device_scheduler_repository: DeviceSchedulerRepository) -> None:
+                 device_scheduler_repository: DeviceSchedulerRepository,
+                 schedules_cache: Optional[TTLLRUCache] = None,
+                 is_cache_synced: Callable[[], bool] = lambda: True) -> None:
         self._device_repository = device_repository
         self._device_scheduler_repository = device_scheduler_repository
+        self._schedules_cache = schedules_cache
+        self._is_cache_synced = is_cache_synced
 
-    def get_scheduling_tasks(self, device_id: str, user_id: str) -> List[Task]:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def get_scheduling_tasks(self, device_id: str, user_id: str, verify_ownership: bool = True) -> List[Task]:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise DeviceNotFoundException()
         return self._device_scheduler_repository.get_scheduling_tasks(device_id)
 
-    def get_next_scheduling_action(self, device_id: str, user_id: str) -> Optional[SchedulerAction]:
-        scheduling_tasks = self.get_scheduling_tasks(device_id, user_id)
-        scheduling_stack = SchedulingStack(scheduling_tasks)
-        return scheduling_stack.get_next_action()
+    def get_next_scheduling_action(self, device_id: str, user_id: str,
+                                   verify_ownership: bool = True) -> Optional[SchedulerAction]:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
+            raise DeviceNotFoundException()
+        now = dates.now()
+        schedule = self._get_cached_schedule(device_id)
+        if schedule is not None:
+            return schedule.get_next_action(now)
+        is_valid, next_action = self._device_scheduler_repository.get_next_scheduling_action(device_id, now)
+        if is_valid:
+            return next_action
+        return self._compile_schedule(device_id).get_next_action(now)
+
+    def get_next_scheduling_actions(self, device_ids: Collection[str], user_id: str,
+                                    verify_ownership: bool = True) -> Dict[str, Optional[SchedulerAction]]:
+        """
+        Next actions of many devices, whose ownership is checked at once and whose stored next actions are read
+        by a single query
+        """
+        device_ids = list(dict.fromkeys(device_ids))
+        if verify_ownership and not self._device_repository.all_exist_for_user(device_ids, user_id):
+            raise DeviceNotFoundException()
+        now = dates.now()
+        next_actions = {}
+        uncached_ids = []
+        for device_id in device_ids:
+            schedule = self._get_cached_schedule(device_id)
+            if schedule is not None:
+                next_actions[device_id] = schedule.get_next_action(now)
+            else:
+                uncached_ids.append(device_id)
+        if uncached_ids:
+            stored_actions = self._device_scheduler_repository.get_next_scheduling_actions(uncached_ids, now)
+            for device_id in uncached_ids:
+                is_valid, next_action = stored_actions[device_id]
+                next_actions[device_id] = next_action if is_valid else \
+                    self._compile_schedule(device_id).get_next_action(now)
+        return {x: next_actions[x] for x in device_ids}
+
+    def _compile_schedule(self, device_id: str) -> CompiledSchedule:
+        # The stored next action passed and was not advanced yet, so it is found from the tasks
+        is_cache_used = self._is_cache_used()
+        # Read before the tasks, so the schedule is not cached when its tasks are set (and it is deleted) meanwhile
+        generation = self._schedules_cache.get_generation(device_id) if is_cache_used else None
+        schedule = CompiledSchedule(self._device_scheduler_repository.get_scheduling_tasks(device_id))
+        if is_cache_used:
+            self._schedules_cache.set(device_id, schedule, config.DEVICE_SCHEDULES_CACHE_TTL, generation)
+        return schedule
+
+    def _get_cached_schedule(self, device_id: str) -> Optional[CompiledSchedule]:
+        if not self._is_cache_used():
+            return None
+        _, schedule = self._schedules_cache.get(device_id)
+        return schedule
+
+    def _is_cache_used(self) -> bool:
+        # Cached schedules are only used while the tasks set by other workers are being notified
+        return self._schedules_cache is not None and self._is_cache_synced()
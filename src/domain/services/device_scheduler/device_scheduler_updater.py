@@ -1,5 +1,7 @@
-from typing import List
+from typing import List, Optional
 
+from src.common.keyed_notifier import KeyedNotifier
+from src.common.ttl_lru_cache import TTLLRUCache
 from src.domain.exceptions.device_not_found_exception import DeviceNotFoundException
 from src.domain.models.scheduling.tasks.task import Task
 from src.domain.repositories.device_repository import DeviceRepository
@@ -9,11 +11,20 @@ from src.domain.repositories.device_scheduler_repository import DeviceSchedulerR
 class DeviceSchedulerUpdater:
 
     def __init__(self, device_repository: DeviceRepository,
-                 device_scheduler_repository: DeviceSchedulerRepository) -> None:
+                 device_scheduler_repository: DeviceSchedulerRepository,
+                 notifier: Optional[KeyedNotifier] = None,
+                 schedules_cache: Optional[TTLLRUCache] = None) -> None:
         self._device_repository = device_repository
         self._device_scheduler_repository = device_scheduler_repository
+        self._notifier = notifier
+        self._schedules_cache = schedules_cache
 
     def set_scheduling_tasks(self, device_id: str, user_id: str, tasks: List[Task]) -> None:
         if not self._device_repository.exists_for_user(device_id, user_id):
             raise DeviceNotFoundException()
         self._device_scheduler_repository.set_scheduling_tasks(device_id, tasks)
+        if self._schedules_cache is not None:
+            # Other workers drop it when notified
+            self._schedules_cache.delete(device_id)
+        if self._notifier is not None:
+            self._notifier.notify(device_id)
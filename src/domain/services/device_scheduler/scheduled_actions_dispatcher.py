@@ -0,0 +1,88 @@
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Optional
+
+from src import config
+from src.common import dates
+from src.domain.repositories.device_scheduler_repository import DeviceSchedulerRepository
+from src.domain.repositories.instant_action_repository import InstantActionRepository
+
+
+class ScheduledActionsDispatcher:
+    """
+    Pushes the scheduler actions of every device as instant actions when they are due, so devices waiting for their
+    instant actions do not need to poll their next action. The stored next actions, indexed by moment, are the queue
+    of the whole fleet: due ones are advanced and pushed in batches, and several dispatchers can run at the same time
+    as each one skips the rows locked by the others. Each batch is advanced and pushed inside the given transaction,
+    so its actions are either pushed or left due for the next pass
+    """
+
+    def __init__(self, device_scheduler_repository: DeviceSchedulerRepository,
+                 instant_action_repository: InstantActionRepository,
+                 batch_size: Optional[int] = None, max_wait: Optional[float] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None, error_delay: float = 5,
+                 transaction: Callable[[], ContextManager] = nullcontext) -> None:
+        self._device_scheduler_repository = device_scheduler_repository
+        self._instant_action_repository = instant_action_repository
+        self._batch_size = batch_size or config.SCHEDULED_ACTIONS_DISPATCH_BATCH_SIZE
+        self._max_wait = max_wait if max_wait is not None else config.SCHEDULED_ACTIONS_DISPATCH_MAX_WAIT
+        self._on_error = on_error
+        self._error_delay = error_delay
+        self._transaction = transaction
+        self._woken_up = threading.Event()
+        self._stopped = threading.Event()
+
+    def wake_up(self) -> None:
+        """
+        Makes the dispatcher look for the first due action again, as the tasks of a device were set
+        """
+        self._woken_up.set()
+
+    def dispatch_due_actions(self, now: datetime) -> int:
+        """
+        Pushes the actions due at the given moment. Returns the amount of pushed actions
+        """
+        after = now + timedelta(microseconds=1)
+        expiration = now - timedelta(seconds=config.INSTANT_ACTIONS_LIFETIME)
+        pushed = 0
+        while True:
+            # Advanced and pushed in the same transaction, so a failure in between does not lose the actions
+            with self._transaction():
+                advanced = self._device_scheduler_repository.advance_next_scheduling_actions(after, self._batch_size)
+                # Actions due while no dispatcher was running are skipped, as devices would ignore them anyway
+                actions = [(device_id, x.action) for device_id, x in advanced if x.moment >= expiration]
+                self._instant_action_repository.push_all(actions)
+            pushed += len(actions)
+            if len(advanced) < self._batch_size:
+                return pushed
+
+    def run(self) -> None:
+        """
+        Dispatches the due actions until stopped, waiting for the next one in between
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            self._woken_up.clear()
+            try:
+                self.dispatch_due_actions(dates.now())
+                wait_seconds = self._get_wait_seconds()
+            except Exception as e:
+                if self._on_error is not None:
+                    self._on_error(e)
+                wait_seconds = self._error_delay
+            self._woken_up.wait(wait_seconds)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._woken_up.set()
+
+    def _get_wait_seconds(self) -> float:
+        first_moment = self._device_scheduler_repository.get_first_next_action_moment()
+        if first_moment is None:
+            return self._max_wait
+        wait_seconds = (first_moment - dates.now()).total_seconds()
+        if wait_seconds <= 0:
+            # It became due after the dispatch, or another dispatcher is pushing it
+            return config.SCHEDULED_ACTIONS_DISPATCH_RETRY_DELAY
+        return min(wait_seconds, self._max_wait)
@@ -12,12 +12,14 @@ class DeviceMeasureAggregator:
         self._device_repository = device_repository
         self._measure_repository = measure_repository
 
-    def add_measure_to_device(self, device_id: str, user_id: str, measure: Measure) -> None:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def add_measure_to_device(self, device_id: str, user_id: str, measure: Measure,
+                              verify_ownership: bool = True) -> None:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise UnregisteredDeviceException()
         self._measure_repository.create(measure, device_id)
 
-    def add_measures_to_device(self, device_id: str, user_id: str, measures: List[Measure]) -> None:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def add_measures_to_device(self, device_id: str, user_id: str, measures: List[Measure],
+                               verify_ownership: bool = True) -> None:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise UnregisteredDeviceException()
         self._measure_repository.create_multiple(measures, device_id)
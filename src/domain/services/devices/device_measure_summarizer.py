@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from datetime import timedelta
 
 import numpy as np
@@ -8,6 +8,9 @@ from src.domain.exceptions.unregistered_device_exception import UnregisteredDevi
 from src.domain.models.measure import Measure
 from src.domain.repositories.device_repository import DeviceRepository
 from src.domain.repositories.measure_repository import MeasureRepository
+from src.domain.services.devices.measure_time_slicer import MeasureTimeSlicer
+
+_MICROSECOND = timedelta(microseconds=1)
 
 
 class DeviceMeasureSummarizer:
@@ -16,36 +19,61 @@ class DeviceMeasureSummarizer:
         self._device_repository = device_repository
         self._measure_repository = measure_repository
 
-    def get_summarized_measures(self, device_id: str, user_id: str, time_interval: int) -> List[Measure]:
+    def get_summarized_measures(self, device_id: str, user_id: str, time_interval: int,
+                                summarize_in_db: bool = False, use_rollups: bool = True) -> List[Measure]:
         if not self._device_repository.exists_for_user(device_id, user_id):
             raise UnregisteredDeviceException()
+        resolution = self._get_rollup_resolution(time_interval) if use_rollups else None
+        if resolution is not None:
+            return self._measure_repository.get_summarized_from_rollups(
+                device_id, time_interval, config.MAX_SUMMARIZED_MEASURES_TO_SHOW, resolution)
+        if summarize_in_db:
+            return self._measure_repository.get_summarized_from_last_minutes(
+                device_id, time_interval, config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
         measures = self._measure_repository.get_from_last_minutes(device_id, time_interval)
         return self._summarize_measures(measures, time_interval)
 
-    def get_all_devices_summarized_measures(self, user_id: str, time_interval: int) -> List[Measure]:
+    def get_all_devices_summarized_measures(self, user_id: str, time_interval: int,
+                                            summarize_in_db: bool = False, use_rollups: bool = True) -> List[Measure]:
+        resolution = self._get_rollup_resolution(time_interval) if use_rollups else None
+        if resolution is not None:
+            return self._measure_repository.get_all_for_user_summarized_from_rollups(
+                user_id, time_interval, config.MAX_SUMMARIZED_MEASURES_TO_SHOW, resolution)
+        if summarize_in_db:
+            return self._measure_repository.get_all_for_user_summarized_from_last_minutes(
+                user_id, time_interval, config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
         measures = self._measure_repository.get_all_for_user_from_last_minutes(user_id, time_interval)
         return self._summarize_measures(measures, time_interval)
 
+    @classmethod
+    def _get_rollup_resolution(cls, time_interval: int) -> Optional[int]:
+        """
+        Returns the coarsest rollups resolution that still fits at least one bucket in every time slice, or None when
+        the slices are shorter than every resolution and the raw measures must be summarized
+        """
+        slice_minutes = float(time_interval) / float(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
+        return max([x for x in config.MEASURES_ROLLUP_RESOLUTIONS if x <= slice_minutes], default=None)
+
     @classmethod
     def _summarize_measures(cls, measures: List[Measure], time_interval: int) -> List[Measure]:
+        """
+        Groups the measures into MAX_SUMMARIZED_MEASURES_TO_SHOW time slices starting at the first measure timestamp.
+        Each measure belongs to the first slice that is not before it and each slice returns the mean of its measures
+        """
         if not measures:
             return []
         summarization_minutes_interval = float(time_interval) / float(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
-        time_slices = [measures[0].timestamp + timedelta(minutes=summarization_minutes_interval * x) for x in
+        base_timestamp = measures[0].timestamp
+        time_slices = [base_timestamp + timedelta(minutes=summarization_minutes_interval * x) for x in
                        range(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)]
-        grouped_measures = []
-        # Clone list
-        ungrouped_measures = [measure for measure in measures]
-        for dt in time_slices:
-            filtered_measures = [measure for measure in ungrouped_measures if measure.timestamp <= dt]
-            if not filtered_measures:
-                continue
-            # Update ungrouped
-            ungrouped_measures = [measure for measure in ungrouped_measures if measure not in filtered_measures]
-            grouped_measures.append(Measure(
-                timestamp=dt,
-                current=np.mean([measure.current for measure in filtered_measures]),
-                voltage=np.mean([measure.voltage for measure in filtered_measures])
-            ))
-
-        return grouped_measures
+        summarized = MeasureTimeSlicer.summarize(
+            offsets=np.array([(measure.timestamp - base_timestamp) // _MICROSECOND for measure in measures],
+                             dtype=np.int64),
+            voltages=np.array([measure.voltage for measure in measures], dtype=np.float64),
+            currents=np.array([measure.current for measure in measures], dtype=np.float64),
+            slice_offsets=np.array([(dt - base_timestamp) // _MICROSECOND for dt in time_slices], dtype=np.int64)
+        )
+        return [
+            Measure(timestamp=time_slices[index], voltage=voltage, current=current)
+            for index, voltage, current in summarized
+        ]
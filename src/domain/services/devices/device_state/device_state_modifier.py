@@ -1,15 +1,21 @@
+from typing import Optional
+
 from src.common import dates
+from src.common.keyed_notifier import KeyedNotifier
 from src.domain.exceptions.unregistered_device_exception import UnregisteredDeviceException
 from src.domain.repositories.device_repository import DeviceRepository
 
 
 class DeviceStateModifier:
 
-    def __init__(self, device_repository: DeviceRepository):
+    def __init__(self, device_repository: DeviceRepository, notifier: Optional[KeyedNotifier] = None):
         self._device_repository = device_repository
+        self._notifier = notifier
 
-    def update(self, device_id: str, user_id: str, turned_on: bool) -> None:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def update(self, device_id: str, user_id: str, turned_on: bool, verify_ownership: bool = True) -> None:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise UnregisteredDeviceException()
         last_status_update = dates.now()
         self._device_repository.update_state(device_id, user_id, turned_on, last_status_update)
+        if self._notifier is not None:
+            self._notifier.notify(device_id)
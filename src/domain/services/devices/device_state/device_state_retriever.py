@@ -7,7 +7,7 @@ class DeviceStateRetriever:
     def __init__(self, device_repository: DeviceRepository):
         self._device_repository = device_repository
 
-    def get(self, device_id: str, user_id: str) -> bool:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def get(self, device_id: str, user_id: str, verify_ownership: bool = True) -> bool:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise UnregisteredDeviceException()
         return self._device_repository.get_state(device_id, user_id)
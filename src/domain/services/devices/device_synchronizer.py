@@ -0,0 +1,50 @@
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional, Tuple
+
+from src.domain.exceptions.unregistered_device_exception import UnregisteredDeviceException
+from src.domain.models.measure import Measure
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.repositories.device_repository import DeviceRepository
+from src.domain.services.device_scheduler.device_scheduler_retriever import DeviceSchedulerRetriever
+from src.domain.services.devices.device_measure_aggregator import DeviceMeasureAggregator
+from src.domain.services.devices.device_state.device_state_modifier import DeviceStateModifier
+from src.domain.services.instant_actions.instant_action_puller import InstantActionPuller
+
+
+class DeviceSynchronizer:
+    """
+    Runs the whole cycle of a device (reporting its state and measures, pulling its instant action and getting its
+    next scheduler action) with a single ownership check, inside the given transaction. When any step fails nothing
+    is saved, so the pulled instant action is not lost either
+    """
+
+    def __init__(self, device_repository: DeviceRepository, device_state_modifier: DeviceStateModifier,
+                 device_measure_aggregator: DeviceMeasureAggregator, instant_action_puller: InstantActionPuller,
+                 device_scheduler_retriever: DeviceSchedulerRetriever,
+                 transaction: Callable[[], ContextManager] = nullcontext) -> None:
+        self._device_repository = device_repository
+        self._device_state_modifier = device_state_modifier
+        self._device_measure_aggregator = device_measure_aggregator
+        self._instant_action_puller = instant_action_puller
+        self._device_scheduler_retriever = device_scheduler_retriever
+        self._transaction = transaction
+
+    def sync(self, device_id: str, user_id: str, turned_on: Optional[bool], measures: List[Measure],
+             verify_ownership: bool = True) -> Tuple[Optional[TaskAction], Optional[SchedulerAction]]:
+        """
+        Saves the state (unless it is None) and the measures of the device. Returns its pending instant action and
+        its next scheduler action
+        """
+        with self._transaction():
+            if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
+                raise UnregisteredDeviceException()
+            if turned_on is not None:
+                self._device_state_modifier.update(device_id, user_id, turned_on, verify_ownership=False)
+            if measures:
+                self._device_measure_aggregator.add_measures_to_device(device_id, user_id, measures,
+                                                                       verify_ownership=False)
+            instant_action = self._instant_action_puller.pull(device_id, user_id, verify_ownership=False)
+            next_action = self._device_scheduler_retriever.get_next_scheduling_action(
+                device_id, user_id, verify_ownership=False)
+        return instant_action, next_action
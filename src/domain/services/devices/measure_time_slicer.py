@@ -0,0 +1,33 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class MeasureTimeSlicer:
+    """
+    Vectorized engine used to group measures into time slices.
+    Times are integer offsets (in microseconds) from a common base, so no datetime is compared while grouping
+    """
+
+    @classmethod
+    def summarize(cls, offsets: np.ndarray, voltages: np.ndarray, currents: np.ndarray,
+                  slice_offsets: np.ndarray) -> List[Tuple[int, float, float]]:
+        """
+        Assigns every measure to the first slice whose offset is greater than or equal to the measure one
+        (measures after the last slice are discarded) and returns (slice_index, mean_voltage, mean_current)
+        for every slice that has measures, sorted by slice index
+        """
+        slice_indexes = np.searchsorted(slice_offsets, offsets, side='left')
+        in_range = slice_indexes < len(slice_offsets)
+        slice_indexes = slice_indexes[in_range]
+        counts = np.bincount(slice_indexes, minlength=len(slice_offsets))
+        # A stable sort keeps the original order inside each slice, so means are computed over the same sequence
+        # of values than when iterating the measures one by one (np.mean results are bit to bit equal)
+        order = np.argsort(slice_indexes, kind='stable')
+        boundaries = np.cumsum(counts)[:-1]
+        voltage_groups = np.split(voltages[in_range][order], boundaries)
+        current_groups = np.split(currents[in_range][order], boundaries)
+        return [
+            (index, float(np.mean(voltage_groups[index])), float(np.mean(current_groups[index])))
+            for index in np.flatnonzero(counts).tolist()
+        ]
@@ -15,10 +15,8 @@ class InstantActionPuller:
         self._device_repository = device_repository
         self._instant_action_repository = instant_action_repository
 
-    def pull(self, device_id: str, user_id: str) -> Optional[TaskAction]:
-        if not self._device_repository.exists_for_user(device_id, user_id):
+    def pull(self, device_id: str, user_id: str, verify_ownership: bool = True) -> Optional[TaskAction]:
+        if verify_ownership and not self._device_repository.exists_for_user(device_id, user_id):
             raise DeviceNotFoundException()
         pull_until = dates.now() - timedelta(seconds=INSTANT_ACTIONS_LIFETIME)
-        action = self._instant_action_repository.pull(device_id, pull_until)
-        self._instant_action_repository.clean_for(device_id)
-        return action
+        return self._instant_action_repository.pull(device_id, pull_until)
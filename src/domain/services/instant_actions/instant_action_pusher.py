@@ -1,3 +1,6 @@
+from typing import Optional
+
+from src.common.keyed_notifier import KeyedNotifier
 from src.domain.exceptions.device_not_found_exception import DeviceNotFoundException
 from src.domain.models.scheduling.tasks.task_action import TaskAction
 from src.domain.repositories.device_repository import DeviceRepository
@@ -6,12 +9,16 @@ from src.domain.repositories.instant_action_repository import InstantActionRepos
 
 class InstantActionPusher:
 
-    def __init__(self, device_repository: DeviceRepository, instant_action_repository: InstantActionRepository) -> None:
+    def __init__(self, device_repository: DeviceRepository, instant_action_repository: InstantActionRepository,
+                 notifier: Optional[KeyedNotifier] = None) -> None:
         self._device_repository = device_repository
         self._instant_action_repository = instant_action_repository
+        self._notifier = notifier
 
     def push(self, device_id: str, user_id: str, action: TaskAction) -> None:
         if not self._device_repository.exists_for_user(device_id, user_id):
             raise DeviceNotFoundException()
-        self._instant_action_repository.clean_for(device_id)
         self._instant_action_repository.push(device_id, action)
+        if self._notifier is not None:
+            # Devices waiting on this worker are woken up without waiting for the database notification
+            self._notifier.notify(device_id)
@@ -0,0 +1,55 @@
+from typing import Callable, Optional
+
+from psycopg2 import extensions
+
+from src.infrastructure.database.connection_pool import create_connection
+
+
+class AdvisoryLock:
+    """
+    PostgreSQL session advisory lock, which excludes processes of different roles from each other. Shared holders only
+    exclude the exclusive ones. It uses its own connection, as a session holding a lock can never be given back to the
+    pool, and the lock is released when that connection is closed (also when the process dies)
+    """
+
+    def __init__(self, key: int, shared: bool = False,
+                 connection_factory: Callable[[], extensions.connection] = create_connection) -> None:
+        self._key = key
+        self._shared = shared
+        self._connection_factory = connection_factory
+        self._conn: Optional[extensions.connection] = None
+
+    @property
+    def is_held(self) -> bool:
+        return self._conn is not None
+
+    def acquire(self, wait: bool = True) -> bool:
+        """
+        Acquires the lock, waiting for it to be released by its exclusive holders unless wait is False.
+        Returns whether it was acquired
+        """
+        if self._conn is not None:
+            return True
+        conn = self._connection_factory()
+        try:
+            conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            function = ('pg_advisory_lock' if wait else 'pg_try_advisory_lock') + ('_shared' if self._shared else '')
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f'SELECT {function}(%s)', (self._key,))
+                acquired = wait or cursor.fetchone()[0]
+            finally:
+                cursor.close()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def release(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.close()
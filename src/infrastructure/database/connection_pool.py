@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+from src import config
+from src.domain.exceptions.connection_pool_exhausted_exception import ConnectionPoolExhaustedException
+from src.infrastructure.database.prepared_statement import PreparedStatementsConnection
+
+
+def create_connection(specify_database: bool = True) -> extensions.connection:
+    # The timezone is set once for the whole session instead of on every query
+    conn_string = f"user='{config.DB_USERNAME}' password='{config.DB_PASSWORD}' host='{config.DB_URL}' " \
+                  f"port='{config.DB_PORT}' options='-c timezone=utc'"
+    if specify_database:
+        conn_string += f" dbname='{config.DB_NAME}'"
+    return psycopg2.connect(conn_string, connection_factory=PreparedStatementsConnection)
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of PostgreSQL connections shared by every repository of the process.
+    The pool is bound to the process that created it, so forked workers (gunicorn) get their own one
+    """
+    _instance: Optional['ConnectionPool'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, min_size: int, max_size: int, checkout_timeout: float, health_check_interval: float,
+                 max_idle_time: float,
+                 connection_factory: Callable[[], extensions.connection] = create_connection) -> None:
+        self._min_size = min_size
+        self._max_size = max(max_size, 1)
+        self._checkout_timeout = checkout_timeout
+        self._health_check_interval = health_check_interval
+        self._max_idle_time = max_idle_time
+        self._connection_factory = connection_factory
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        # Used as a stack (LIFO) so the least recently used connections stay at the bottom and can be pruned
+        self._idle: List[Tuple[extensions.connection, float]] = []
+        self._size = 0
+        self._in_use = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._closed = False
+
+    @classmethod
+    def get_instance(cls) -> 'ConnectionPool':
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.pid != os.getpid():
+                # Connections inherited from a parent process must never be used, so a new pool is created
+                cls._instance = cls(
+                    min_size=config.DB_POOL_MIN_SIZE,
+                    max_size=config.DB_POOL_MAX_SIZE,
+                    checkout_timeout=config.DB_POOL_CHECKOUT_TIMEOUT,
+                    health_check_interval=config.DB_POOL_HEALTH_CHECK_INTERVAL,
+                    max_idle_time=config.DB_POOL_MAX_IDLE_TIME
+                )
+            return cls._instance
+
+    @classmethod
+    def close_instance(cls) -> None:
+        with cls._instance_lock:
+            if cls._instance is not None and cls._instance.pid == os.getpid():
+                cls._instance.close()
+            cls._instance = None
+
+    @property
+    def pid(self) -> int:
+        return self._pid
+
+    @contextmanager
+    def connection(self) -> Iterator[extensions.connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def acquire(self) -> extensions.connection:
+        conn, last_used = self._checkout()
+        try:
+            if conn is None:
+                conn = self._connection_factory()
+            elif not self._is_healthy(conn, last_used):
+                self._close_quietly(conn)
+                conn = self._connection_factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        return conn
+
+    def release(self, conn: extensions.connection, discard: bool = False) -> None:
+        discard = discard or conn.closed or not self._reset(conn)
+        with self._condition:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                to_close = [conn]
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close = self._prune_idle()
+            self._condition.notify()
+        for expired in to_close:
+            self._close_quietly(expired)
+
+    def warm_up(self) -> None:
+        """
+        Opens connections until reaching the configured min size
+        """
+        conns = []
+        try:
+            while len(conns) < self._min_size:
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            to_close = [conn for conn, _ in self._idle]
+            self._size -= len(self._idle)
+            self._idle = []
+            self._condition.notify_all()
+        for conn in to_close:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'min_size': self._min_size,
+                'max_size': self._max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waits': self._waits,
+                'timeouts': self._timeouts
+            }
+
+    def _checkout(self) -> Tuple[Optional[extensions.connection], float]:
+        """
+        Reserves a slot of the pool. Returns an idle connection or None if a new one must be opened
+        """
+        deadline = time.monotonic() + self._checkout_timeout
+        waited = False
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ConnectionPoolExhaustedException('Connection pool is closed')
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    return conn, last_used
+                if self._size < self._max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None, time.monotonic()
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise ConnectionPoolExhaustedException(
+                        f'Could not get a database connection after {self._checkout_timeout} seconds')
+                self._condition.wait(remaining)
+
+    def _prune_idle(self) -> List[extensions.connection]:
+        """
+        Removes the idle connections unused for longer than max_idle_time while keeping min_size connections
+        Must be called holding the condition lock
+        """
+        pruned = []
+        now = time.monotonic()
+        while self._idle and self._size > self._min_size and now - self._idle[0][1] > self._max_idle_time:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            pruned.append(conn)
+        return pruned
+
+    def _is_healthy(self, conn: extensions.connection, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self._health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def _reset(cls, conn: extensions.connection) -> bool:
+        """
+        Leaves the connection outside any transaction. Returns False if the connection is not reusable
+        """
+        try:
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def _close_quietly(cls, conn: extensions.connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
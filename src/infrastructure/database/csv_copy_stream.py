@@ -0,0 +1,37 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator
+
+
+class CsvCopyStream:
+    """
+    Read only file-like object that renders rows as CSV on demand, so COPY FROM STDIN can stream big
+    batches without building the whole payload in memory
+    """
+    _ROWS_PER_CHUNK = 1000
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        self._rows: Iterator[tuple] = iter(rows)
+        self._buffer = ''
+        self._exhausted = False
+
+    def read(self, size: int = -1) -> str:
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            self._buffer += self._render_chunk()
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        # Required by psycopg2 file interface but COPY only uses read
+        return self.read(size)
+
+    def _render_chunk(self) -> str:
+        rows = list(islice(self._rows, self._ROWS_PER_CHUNK))
+        if len(rows) < self._ROWS_PER_CHUNK:
+            self._exhausted = True
+        chunk = io.StringIO()
+        csv.writer(chunk, lineterminator='\n').writerows(rows)
+        return chunk.getvalue()
@@ -2,14 +2,21 @@ import sys
 import os
 from src.app.utils import console_colors
 from src import config
-import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 from src.common import dates
+from src.infrastructure.database.connection_pool import ConnectionPool, create_connection
 from src.infrastructure.database.migrations.migration_001 import Migration001
 from src.infrastructure.database.migrations.migration_002 import Migration002
 from src.infrastructure.database.migrations.migration_003 import Migration003
 from src.infrastructure.database.migrations.migration_004 import Migration004
+from src.infrastructure.database.migrations.migration_005 import Migration005
+from src.infrastructure.database.migrations.migration_006 import Migration006
+from src.infrastructure.database.migrations.migration_007 import Migration007
+from src.infrastructure.database.migrations.migration_008 import Migration008
+from src.infrastructure.database.migrations.migration_009 import Migration009
+from src.infrastructure.database.migrations.migration_010 import Migration010
+from src.infrastructure.database.migrations.migration_011 import Migration011
 
 
 class DBMigrator:
@@ -18,6 +25,13 @@ class DBMigrator:
         Migration002,
         Migration003,
         Migration004,
+        Migration005,
+        Migration006,
+        Migration007,
+        Migration008,
+        Migration009,
+        Migration010,
+        Migration011,
     ]
 
     def __init__(self):
@@ -27,7 +41,7 @@ class DBMigrator:
 
     def create_db_if_not_exists(self):
         db_exists = True
-        conn = self.__get_db_connection(specify_database=False)
+        conn = create_connection(specify_database=False)
         # Porque no es posible crear la base en transaccion
         conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         cursor = conn.cursor()
@@ -46,7 +60,9 @@ class DBMigrator:
 
     # Solo para testing
     def drop_db(self):
-        conn = self.__get_db_connection(specify_database=False)
+        # Pooled connections keep the database in use, so they must be closed before dropping it
+        ConnectionPool.close_instance()
+        conn = create_connection(specify_database=False)
         conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         cursor = conn.cursor()
         try:
@@ -56,63 +72,51 @@ class DBMigrator:
         finally:
             conn.close()
 
-    def __get_db_connection(self, specify_database=True):
-        conn_string = f"user='{config.DB_USERNAME}' password='{config.DB_PASSWORD}' host='{config.DB_URL}' " \
-                      f"port='{config.DB_PORT}'"
-        if specify_database:
-            conn_string += f" dbname='{config.DB_NAME}'"
-        return psycopg2.connect(conn_string)
-
     def __create_app_info(self):
-        conn = self.__get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("CREATE TABLE AppInfo (key VARCHAR(255) PRIMARY KEY, value VARCHAR(255) NOT NULL)")
-            cursor.execute(
-                f"INSERT INTO AppInfo (key, value) VALUES ('{config.LAST_MIGRATION_APP_INFO_KEY}', 0), "
-                f"('{config.LAST_MIGRATION_APP_INFO_DATE}', NOW())")
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise Exception(e)
-        finally:
-            conn.close()
+        with ConnectionPool.get_instance().connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("CREATE TABLE AppInfo (key VARCHAR(255) PRIMARY KEY, value VARCHAR(255) NOT NULL)")
+                cursor.execute(
+                    f"INSERT INTO AppInfo (key, value) VALUES ('{config.LAST_MIGRATION_APP_INFO_KEY}', 0), "
+                    f"('{config.LAST_MIGRATION_APP_INFO_DATE}', NOW())")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise Exception(e)
 
     def run_migrations(self):
         print(F'{console_colors.INFO}Corriendo migraciones de la base de datos:{console_colors.ENDC}')
         self.MIGRATIONS.sort(key=lambda x: x.MIGRATION_NUMBER)
         # Todas las migraciones se ejecutan en una sola transaccion
-        conn = self.__get_db_connection()
-        cursor = conn.cursor()
-        for x in self.MIGRATIONS:
-            common_msg = F'la migracion {x.MIGRATION_NUMBER} del archivo {self.get_migration_filename(x)}' \
-                         F'{console_colors.ENDC}'
-            if x.MIGRATION_NUMBER <= self.get_last_applied_migration():
-                print(F'{console_colors.WARNING} ‣ Saltando {common_msg}')
-            else:
-                print(F'{console_colors.OK} ‣ Aplicando {common_msg}')
-                try:
-                    self.__apply_migration(x, cursor)
-                except Exception as e:
-                    conn.rollback()
-                    conn.close()
-                    raise Exception(e)
-        conn.commit()
-        conn.close()
+        with ConnectionPool.get_instance().connection() as conn:
+            cursor = conn.cursor()
+            for x in self.MIGRATIONS:
+                common_msg = F'la migracion {x.MIGRATION_NUMBER} del archivo {self.get_migration_filename(x)}' \
+                             F'{console_colors.ENDC}'
+                if x.MIGRATION_NUMBER <= self.get_last_applied_migration():
+                    print(F'{console_colors.WARNING} ‣ Saltando {common_msg}')
+                else:
+                    print(F'{console_colors.OK} ‣ Aplicando {common_msg}')
+                    try:
+                        self.__apply_migration(x, cursor)
+                    except Exception as e:
+                        conn.rollback()
+                        raise Exception(e)
+            conn.commit()
         print('\n\n')
 
     def load_app_info(self):
-        conn = self.__get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM AppInfo")
-            self.app_info = {}
-            for key, value in cursor.fetchall():
-                self.app_info[key] = value
-        except Exception as e:
-            raise Exception(e)
-        finally:
-            conn.close()
+        with ConnectionPool.get_instance().connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT * FROM AppInfo")
+                self.app_info = {}
+                for key, value in cursor.fetchall():
+                    self.app_info[key] = value
+                conn.commit()
+            except Exception as e:
+                raise Exception(e)
 
     def get_last_applied_migration(self):
         if self.app_info:
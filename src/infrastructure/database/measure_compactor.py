@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, TypeVar
+
+from psycopg2 import errors, extensions
+
+from src import config
+from src.common import dates
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
+from src.infrastructure.database.prepared_statement import PreparedStatement
+
+T = TypeVar('T')
+
+
+class MeasureCompactionReport:
+
+    def __init__(self) -> None:
+        self.created_partitions: List[str] = []
+        self.dropped_partitions: List[str] = []
+        self.skipped_partitions: List[str] = []
+        self.deleted_measures = 0
+        self.deleted_rollups = 0
+        self.elapsed_seconds = 0.0
+
+    def __str__(self) -> str:
+        report = f'Removed {self.deleted_measures} measures ({len(self.dropped_partitions)} dropped partitions) ' \
+                 f'and {self.deleted_rollups} rollups in {self.elapsed_seconds:.2f} seconds'
+        if self.created_partitions:
+            report += f'. Created the partitions {", ".join(self.created_partitions)}'
+        if self.skipped_partitions:
+            report += f'. Skipped the locked partitions {", ".join(self.skipped_partitions)}'
+        return report
+
+
+class MeasureCompactor:
+    """
+    Creates the upcoming measures partitions (which the API only creates on start) and removes the measures and rollups
+    older than their retention periods. Expired partitions are dropped as a whole and the remaining expired rows are
+    deleted in chunks, each one in its own transaction, so locks are held briefly. A partition that cannot be locked
+    in time is skipped (and given to on_error), and its rows are deleted in chunks
+    """
+    _DELETE_MEASURES = PreparedStatement(
+        'compaction_delete_measures',
+        'DELETE FROM Measures WHERE (measure_id, timestamp) IN '
+        '(SELECT measure_id, timestamp FROM Measures WHERE timestamp < $1 LIMIT $2)'
+    )
+    _DELETE_ROLLUPS = PreparedStatement(
+        'compaction_delete_rollups',
+        'DELETE FROM MeasureRollups WHERE (resolution, device_id, bucket_start) IN '
+        '(SELECT resolution, device_id, bucket_start FROM MeasureRollups WHERE bucket_start < $1 LIMIT $2)'
+    )
+    _COUNT_PARTITION_MEASURES = 'SELECT COUNT(*) FROM {partition_name}'
+
+    def __init__(self, retention_days: Optional[int] = None, rollups_retention_days: Optional[int] = None,
+                 chunk_size: Optional[int] = None, on_error: Optional[Callable[[Exception], None]] = None) -> None:
+        self._retention_days = retention_days if retention_days is not None else config.MEASURES_RETENTION_DAYS
+        self._rollups_retention_days = rollups_retention_days if rollups_retention_days is not None \
+            else config.MEASURES_ROLLUPS_RETENTION_DAYS
+        self._chunk_size = chunk_size or config.MEASURES_COMPACTION_CHUNK_SIZE
+        self._on_error = on_error
+
+    def run(self, now: Optional[datetime] = None) -> MeasureCompactionReport:
+        """
+        Creates the upcoming partitions and removes the expired measures and rollups. A retention of 0 days keeps
+        them forever
+        """
+        start_time = time.perf_counter()
+        now = now or dates.to_naive_utc(dates.now())
+        report = MeasureCompactionReport()
+        self._create_upcoming_partitions(now, report)
+        if self._retention_days:
+            expiration = now - timedelta(days=self._retention_days)
+            report.deleted_measures += self._drop_expired_partitions(expiration, report)
+            report.deleted_measures += self._delete_in_chunks(self._DELETE_MEASURES, expiration)
+        if self._rollups_retention_days:
+            expiration = now - timedelta(days=self._rollups_retention_days)
+            report.deleted_rollups += self._delete_in_chunks(self._DELETE_ROLLUPS, expiration)
+        report.elapsed_seconds = time.perf_counter() - start_time
+        return report
+
+    def _create_upcoming_partitions(self, now: datetime, report: MeasureCompactionReport) -> None:
+        partition_manager = MeasurePartitionManager()
+        try:
+            report.created_partitions = self._in_transaction(
+                lambda x: self._create_partitions(x, partition_manager, now))
+        except errors.LockNotAvailable as e:
+            # They are created by the next run, as they are created ahead of time
+            if self._on_error is not None:
+                self._on_error(e)
+
+    @classmethod
+    def _create_partitions(cls, cursor: extensions.cursor, partition_manager: MeasurePartitionManager,
+                           now: datetime) -> List[str]:
+        cls._set_lock_timeout(cursor)
+        return partition_manager.create_partitions(cursor, now, partition_manager.get_partitions_end(now))
+
+    def _drop_expired_partitions(self, expiration: datetime, report: MeasureCompactionReport) -> int:
+        partition_manager = MeasurePartitionManager()
+        deleted_measures = 0
+        for partition_name in self._in_transaction(lambda x: partition_manager.get_expired_partitions(x, expiration)):
+            try:
+                deleted_measures += self._in_transaction(lambda x: self._drop_partition(x, partition_name))
+            except errors.LockNotAvailable as e:
+                if self._on_error is not None:
+                    self._on_error(e)
+                report.skipped_partitions.append(partition_name)
+                continue
+            report.dropped_partitions.append(partition_name)
+        return deleted_measures
+
+    @classmethod
+    def _drop_partition(cls, cursor: extensions.cursor, partition_name: str) -> int:
+        cls._set_lock_timeout(cursor)
+        cursor.execute(cls._COUNT_PARTITION_MEASURES.format(partition_name=partition_name))
+        measures_count = cursor.fetchone()[0]
+        MeasurePartitionManager().drop_partition(cursor, partition_name)
+        return measures_count
+
+    @staticmethod
+    def _set_lock_timeout(cursor: extensions.cursor) -> None:
+        # Attaching and detaching partitions lock the whole table, so they fail instead of queueing other queries
+        cursor.execute(f"SET LOCAL lock_timeout = '{config.MEASURES_COMPACTION_LOCK_TIMEOUT}s'")
+
+    def _delete_in_chunks(self, statement: PreparedStatement, expiration: datetime) -> int:
+        deleted = 0
+        while True:
+            chunk_deleted = self._in_transaction(lambda x: self._delete_chunk(x, statement, expiration))
+            deleted += chunk_deleted
+            if chunk_deleted < self._chunk_size:
+                return deleted
+
+    def _delete_chunk(self, cursor: extensions.cursor, statement: PreparedStatement, expiration: datetime) -> int:
+        statement.execute(cursor, (expiration, self._chunk_size))
+        return cursor.rowcount
+
+    @classmethod
+    def _in_transaction(cls, run: Callable[[extensions.cursor], T]) -> T:
+        with ConnectionPool.get_instance().connection() as conn:
+            cursor = conn.cursor()
+            try:
+                result = run(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return result
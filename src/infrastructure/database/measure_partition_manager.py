@@ -0,0 +1,119 @@
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from psycopg2 import extensions
+
+from src import config
+from src.common import dates
+from src.infrastructure.database.connection_pool import ConnectionPool
+
+
+class MeasurePartitionManager:
+    """
+    Keeps the time range partitions of the Measures table. Measures without a partition of their own are stored in
+    the default one until their partition is created, when they are moved to it
+    """
+    TABLE_NAME = 'measures'
+    DEFAULT_PARTITION_NAME = 'measures_default'
+    _PARTITIONS_EPOCH = datetime(1970, 1, 5)  # A monday, so weekly partitions start on mondays
+    _BOUNDS_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+    def __init__(self, partition_days: Optional[int] = None, partitions_ahead: Optional[int] = None,
+                 retention_days: Optional[int] = None) -> None:
+        self._partition_size = timedelta(days=partition_days or config.MEASURES_PARTITION_DAYS)
+        self._partitions_ahead = partitions_ahead if partitions_ahead is not None else config.MEASURES_PARTITIONS_AHEAD
+        self._retention_days = retention_days if retention_days is not None else config.MEASURES_RETENTION_DAYS
+
+    def run_maintenance(self) -> Tuple[List[str], List[str]]:
+        """
+        Creates the partitions for the current period and the following ones and drops the expired ones.
+        Returns the names of the created and the dropped partitions
+        """
+        now = dates.to_naive_utc(dates.now())
+        with ConnectionPool.get_instance().connection() as conn:
+            cursor = conn.cursor()
+            try:
+                created = self.create_partitions(cursor, now, self.get_partitions_end(now))
+                dropped = self.drop_expired_partitions(cursor, now)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise Exception(e)
+            finally:
+                cursor.close()
+        return created, dropped
+
+    def create_partitions(self, cursor: extensions.cursor, start: datetime, end: datetime) -> List[str]:
+        """
+        Creates the missing partitions needed to store the measures between start and end
+        """
+        existing_partitions = self.get_partitions(cursor)
+        created = []
+        partition_start = self.get_partition_start(start)
+        while partition_start < end:
+            partition_end = partition_start + self._partition_size
+            overlaps = [x for x in existing_partitions if x[1] < partition_end and partition_start < x[2]]
+            if not overlaps:
+                partition_name = self.get_partition_name(partition_start)
+                self._create_partition(cursor, partition_name, partition_start, partition_end)
+                created.append(partition_name)
+            partition_start = partition_end
+        return created
+
+    def drop_expired_partitions(self, cursor: extensions.cursor, now: datetime) -> List[str]:
+        """
+        Detaches and drops the partitions whose measures are all older than the retention period
+        """
+        if not self._retention_days:
+            return []
+        dropped = self.get_expired_partitions(cursor, now - timedelta(days=self._retention_days))
+        for partition_name in dropped:
+            self.drop_partition(cursor, partition_name)
+        return dropped
+
+    def get_expired_partitions(self, cursor: extensions.cursor, expiration: datetime) -> List[str]:
+        return [x[0] for x in self.get_partitions(cursor) if x[2] <= expiration]
+
+    def drop_partition(self, cursor: extensions.cursor, partition_name: str) -> None:
+        cursor.execute(f'ALTER TABLE {self.TABLE_NAME} DETACH PARTITION {partition_name}')
+        cursor.execute(f'DROP TABLE {partition_name}')
+
+    def get_partitions(self, cursor: extensions.cursor) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Returns the name, start and end of every partition but the default one, sorted by start
+        """
+        cursor.execute(
+            'SELECT C.relname, pg_get_expr(C.relpartbound, C.oid) FROM pg_inherits I '
+            'JOIN pg_class C ON C.oid = I.inhrelid WHERE I.inhparent = %s::regclass', (self.TABLE_NAME,))
+        partitions = []
+        for partition_name, bounds in cursor.fetchall():
+            match = self._BOUNDS_PATTERN.search(bounds)
+            if match:
+                partitions.append((partition_name, datetime.fromisoformat(match.group(1)),
+                                   datetime.fromisoformat(match.group(2))))
+        return sorted(partitions, key=lambda x: x[1])
+
+    def get_partitions_end(self, now: datetime) -> datetime:
+        """
+        Returns until when partitions must exist, so measures are not stored in the default partition
+        """
+        return now + self._partition_size * (self._partitions_ahead + 1)
+
+    def get_partition_start(self, timestamp: datetime) -> datetime:
+        timestamp = dates.to_naive_utc(timestamp)
+        return timestamp - (timestamp - self._PARTITIONS_EPOCH) % self._partition_size
+
+    def get_partition_name(self, partition_start: datetime) -> str:
+        return f'{self.TABLE_NAME}_p{partition_start.strftime("%Y%m%d")}'
+
+    def _create_partition(self, cursor: extensions.cursor, partition_name: str, start: datetime,
+                          end: datetime) -> None:
+        # The partition is filled with its measures from the default partition before being attached, as a default
+        # partition can not keep measures that belong to another partition
+        cursor.execute(f'CREATE TABLE {partition_name} (LIKE {self.TABLE_NAME} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH M AS (DELETE FROM {self.DEFAULT_PARTITION_NAME} WHERE timestamp >= %s AND timestamp < %s '
+            f'RETURNING *) INSERT INTO {partition_name} SELECT * FROM M', (start, end))
+        cursor.execute(f'ALTER TABLE {self.TABLE_NAME} ATTACH PARTITION {partition_name} FOR VALUES FROM (%s) TO (%s)',
+                       (start, end))
@@ -0,0 +1,22 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration005(BaseMigration):
+    MIGRATION_NUMBER = 5
+
+    def apply_migration(self, cursor):
+        queries = [
+            # Measures are always filtered by device and time window
+            "CREATE INDEX measures_device_id_timestamp_idx ON Measures (device_id, \"timestamp\")",
+            # Measures are inserted in time order, so a BRIN index is enough for time only filters
+            "CREATE INDEX measures_timestamp_brin_idx ON Measures USING BRIN (\"timestamp\")",
+
+            "CREATE INDEX devices_user_id_idx ON Devices (user_id)",
+
+            # Scheduling tasks are updated for every row of the device, so duplicated rows are equal and one is kept
+            "DELETE FROM DeviceTasks T USING DeviceTasks O WHERE T.device_id = O.device_id AND T.ctid < O.ctid",
+            "CREATE UNIQUE INDEX devicetasks_device_id_idx ON DeviceTasks (device_id)",
+
+            "CREATE INDEX instantactions_device_id_timestamp_idx ON InstantActions (device_id, \"timestamp\")",
+        ]
+        self._execute_sql(queries, cursor)
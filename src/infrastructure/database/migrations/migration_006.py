@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration006(BaseMigration):
+    MIGRATION_NUMBER = 6
+    # Frozen copies of the partitioning settings of this version, so the migration does not change with them
+    _PARTITIONS_EPOCH = datetime(1970, 1, 5)  # A monday, so weekly partitions start on mondays
+    _PARTITION_SIZE = timedelta(days=7)
+    _PARTITIONS_AHEAD = 4
+
+    def apply_migration(self, cursor):
+        # Measures is replaced by a table partitioned by timestamp, keeping its ids sequence
+        queries = [
+            "ALTER TABLE Measures RENAME TO UnpartitionedMeasures",
+            "ALTER TABLE UnpartitionedMeasures RENAME CONSTRAINT measures_pkey TO unpartitionedmeasures_pkey",
+            "DROP INDEX measures_device_id_timestamp_idx",
+            "DROP INDEX measures_timestamp_brin_idx",
+            "ALTER SEQUENCE measures_measure_id_seq OWNED BY NONE",
+
+            "CREATE TABLE Measures (measure_id INTEGER NOT NULL DEFAULT nextval('measures_measure_id_seq'), "
+            "device_id VARCHAR NOT NULL, voltage numeric NOT NULL, current numeric NOT NULL, "
+            "\"timestamp\" TIMESTAMP NOT NULL, CONSTRAINT measures_pkey PRIMARY KEY (measure_id, \"timestamp\"), "
+            "CONSTRAINT measures_devices_fk FOREIGN KEY (device_id) REFERENCES devices (device_id) MATCH SIMPLE ON "
+            "UPDATE NO ACTION ON DELETE CASCADE) PARTITION BY RANGE (\"timestamp\")",
+            "CREATE INDEX measures_device_id_timestamp_idx ON Measures (device_id, \"timestamp\")",
+            "CREATE INDEX measures_timestamp_brin_idx ON Measures USING BRIN (\"timestamp\")",
+            "CREATE TABLE measures_default PARTITION OF Measures DEFAULT",
+        ]
+        self._execute_sql(queries, cursor)
+
+        # Partitions from the first measure until the ones created in advance, before the measures are copied
+        now = datetime.utcnow()
+        cursor.execute("SELECT MIN(\"timestamp\") FROM UnpartitionedMeasures")
+        first_measure_timestamp = cursor.fetchone()[0]
+        start = min(first_measure_timestamp or now, now)
+        partition_start = start - (start - self._PARTITIONS_EPOCH) % self._PARTITION_SIZE
+        partitions_end = now + self._PARTITION_SIZE * (self._PARTITIONS_AHEAD + 1)
+        while partition_start < partitions_end:
+            partition_end = partition_start + self._PARTITION_SIZE
+            cursor.execute(f'CREATE TABLE measures_p{partition_start.strftime("%Y%m%d")} PARTITION OF Measures '
+                           f'FOR VALUES FROM (%s) TO (%s)', (partition_start, partition_end))
+            partition_start = partition_end
+
+        queries = [
+            "INSERT INTO Measures (measure_id, device_id, voltage, current, \"timestamp\") "
+            "SELECT measure_id, device_id, voltage, current, \"timestamp\" FROM UnpartitionedMeasures",
+            "DROP TABLE UnpartitionedMeasures",
+            "ALTER SEQUENCE measures_measure_id_seq OWNED BY Measures.measure_id",
+        ]
+        self._execute_sql(queries, cursor)
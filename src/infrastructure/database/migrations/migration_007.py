@@ -0,0 +1,26 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration007(BaseMigration):
+    MIGRATION_NUMBER = 7
+    # Frozen copy of the rollup resolutions (minutes) of this version, so the migration does not change with them
+    _ROLLUP_RESOLUTIONS = [1, 15, 60]
+
+    def apply_migration(self, cursor):
+        resolutions = ', '.join(str(x) for x in self._ROLLUP_RESOLUTIONS)
+        queries = [
+            "CREATE TABLE MeasureRollups (resolution INTEGER NOT NULL, device_id VARCHAR NOT NULL, "
+            "bucket_start TIMESTAMP NOT NULL, voltage_sum numeric NOT NULL, current_sum numeric NOT NULL, "
+            "samples INTEGER NOT NULL, "
+            "CONSTRAINT measurerollups_pkey PRIMARY KEY (resolution, device_id, bucket_start), "
+            "CONSTRAINT measurerollups_devices_fk FOREIGN KEY (device_id) REFERENCES devices (device_id) MATCH SIMPLE "
+            "ON UPDATE NO ACTION ON DELETE CASCADE)",
+
+            # Rollups of the already stored measures
+            "INSERT INTO MeasureRollups (resolution, device_id, bucket_start, voltage_sum, current_sum, samples) "
+            "SELECT R.resolution, M.device_id, "
+            "date_bin(R.resolution * INTERVAL '1 min', M.\"timestamp\", TIMESTAMP '2000-01-03'), "
+            "SUM(M.voltage), SUM(M.current), COUNT(*) "
+            f"FROM Measures M, UNNEST(ARRAY[{resolutions}]) AS R(resolution) GROUP BY 1, 2, 3",
+        ]
+        self._execute_sql(queries, cursor)
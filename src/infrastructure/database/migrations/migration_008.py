@@ -0,0 +1,15 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration008(BaseMigration):
+    MIGRATION_NUMBER = 8
+
+    def apply_migration(self, cursor):
+        queries = [
+            # Every token of a device generated before revoked_before is refused
+            "CREATE TABLE DeviceTokenRevocations (device_id VARCHAR NOT NULL PRIMARY KEY, "
+            "revoked_before TIMESTAMP NOT NULL, "
+            "CONSTRAINT devicetokenrevocations_devices_fk FOREIGN KEY (device_id) REFERENCES devices (device_id) "
+            "MATCH SIMPLE ON UPDATE NO ACTION ON DELETE CASCADE)",
+        ]
+        self._execute_sql(queries, cursor)
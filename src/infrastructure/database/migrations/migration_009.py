@@ -0,0 +1,15 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration009(BaseMigration):
+    MIGRATION_NUMBER = 9
+
+    def apply_migration(self, cursor):
+        queries = [
+            # Instant actions become a mailbox with the last action pushed to every device, so it is kept
+            "DELETE FROM InstantActions T USING InstantActions O WHERE T.device_id = O.device_id AND "
+            "(T.\"timestamp\" < O.\"timestamp\" OR (T.\"timestamp\" = O.\"timestamp\" AND T.ctid < O.ctid))",
+            "DROP INDEX instantactions_device_id_timestamp_idx",
+            "ALTER TABLE InstantActions ADD CONSTRAINT instantactions_pkey PRIMARY KEY (device_id)",
+        ]
+        self._execute_sql(queries, cursor)
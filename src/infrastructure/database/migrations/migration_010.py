@@ -0,0 +1,18 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration010(BaseMigration):
+    MIGRATION_NUMBER = 10
+
+    def apply_migration(self, cursor):
+        queries = [
+            # Next action of the device, computed when its tasks are set and advanced after it passes
+            "ALTER TABLE DeviceTasks ADD COLUMN next_action VARCHAR, ADD COLUMN next_action_at TIMESTAMP",
+            "CREATE INDEX devicetasks_next_action_at_idx ON DeviceTasks (next_action_at)",
+            # Existing devices with tasks get a next action that already passed, instead of computing it with the
+            # scheduling code (which may change after this migration). It is found from their tasks until the next
+            # advance pass replaces it, and it is too old to be pushed as an instant action
+            "UPDATE DeviceTasks SET next_action = tasks -> 0 ->> 'action', "
+            "next_action_at = TIMESTAMP '1970-01-01' WHERE jsonb_array_length(tasks) > 0",
+        ]
+        self._execute_sql(queries, cursor)
@@ -0,0 +1,12 @@
+from src.infrastructure.database.migrations.base_migration import BaseMigration
+
+
+class Migration011(BaseMigration):
+    MIGRATION_NUMBER = 11
+
+    def apply_migration(self, cursor):
+        queries = [
+            # Workers only load the recent revocations when device tokens are trusted
+            "CREATE INDEX devicetokenrevocations_revoked_before_idx ON DeviceTokenRevocations (revoked_before)",
+        ]
+        self._execute_sql(queries, cursor)
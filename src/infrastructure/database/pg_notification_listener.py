@@ -0,0 +1,99 @@
+import re
+import select
+import threading
+from typing import Callable, Dict, Optional
+
+from psycopg2 import extensions
+
+from src.infrastructure.database.connection_pool import create_connection
+
+
+class PGNotificationListener:
+    """
+    Listens to PostgreSQL channels from a daemon thread and hands the payload of every notification to the handler
+    of its channel. It uses its own connection, as a listening session can never be given back to the pool.
+    After a failure it connects again and calls on_connect, because the notifications sent meanwhile are lost
+    """
+    _CHANNEL_PATTERN = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+    def __init__(self, handlers: Dict[str, Callable[[str], None]],
+                 on_connect: Optional[Callable[[], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 connection_factory: Callable[[], extensions.connection] = create_connection,
+                 poll_interval: float = 1, reconnect_delay: float = 5) -> None:
+        for channel in handlers:
+            if not self._CHANNEL_PATTERN.match(channel):
+                raise ValueError(f'Invalid channel name {channel}')
+        self._handlers = dict(handlers)
+        self._on_connect = on_connect
+        self._on_error = on_error
+        self._connection_factory = connection_factory
+        self._poll_interval = poll_interval
+        self._reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._listening = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def is_listening(self) -> bool:
+        return self._listening.is_set()
+
+    def start(self) -> None:
+        """
+        Starts listening, unless it is already doing it
+        """
+        with self._lock:
+            if self.is_running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='pg-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopped.set()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+    def wait_until_listening(self, timeout: Optional[float] = None) -> bool:
+        return self._listening.wait(timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                self._listening.clear()
+                if self._on_error is not None:
+                    self._on_error(e)
+                self._stopped.wait(self._reconnect_delay)
+
+    def _listen(self) -> None:
+        conn = self._connection_factory()
+        try:
+            conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor = conn.cursor()
+            try:
+                for channel in self._handlers:
+                    cursor.execute(f'LISTEN {channel}')
+            finally:
+                cursor.close()
+            self._listening.set()
+            if self._on_connect is not None:
+                self._on_connect()
+            while not self._stopped.is_set():
+                if select.select([conn], [], [], self._poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notification = conn.notifies.pop(0)
+                    self._handlers[notification.channel](notification.payload)
+        finally:
+            self._listening.clear()
+            conn.close()
@@ -0,0 +1,77 @@
+import re
+import threading
+from typing import Dict
+
+from psycopg2 import extensions
+
+
+class PreparedStatement:
+    """
+    A query declared once by a repository and prepared server side the first time it is used on each connection.
+    The query uses PostgreSQL positional parameters ($1, $2, ...) that are bound on each execution
+    """
+    _PARAMETER_PATTERN = re.compile(r'\$(\d+)')
+    _registry: Dict[str, str] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, query: str) -> None:
+        self._name = name.lower()
+        self._query = query
+        self._params_count = max([int(x) for x in self._PARAMETER_PATTERN.findall(query)], default=0)
+        self._register()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    @property
+    def params_count(self) -> int:
+        return self._params_count
+
+    def execute(self, cursor: extensions.cursor, params: tuple = ()) -> None:
+        if len(params) != self._params_count:
+            raise ValueError(f'Statement {self._name} expects {self._params_count} params but got {len(params)}')
+        prepared_statements = getattr(cursor.connection, 'prepared_statements', None)
+        if prepared_statements is None:
+            # Connections that can not keep track of their prepared statements run the query as a one shot one.
+            # A different cursor is used to deallocate it because results are already buffered client side
+            helper_cursor = cursor.connection.cursor()
+            try:
+                helper_cursor.execute(f'PREPARE {self._name} AS {self._query}')
+                self._execute_prepared(cursor, params)
+                helper_cursor.execute(f'DEALLOCATE {self._name}')
+            finally:
+                helper_cursor.close()
+            return
+        if self._name not in prepared_statements:
+            cursor.execute(f'PREPARE {self._name} AS {self._query}')
+            prepared_statements.add(self._name)
+        self._execute_prepared(cursor, params)
+
+    def _execute_prepared(self, cursor: extensions.cursor, params: tuple) -> None:
+        if not params:
+            cursor.execute(f'EXECUTE {self._name}')
+            return
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f'EXECUTE {self._name} ({placeholders})', params)
+
+    def _register(self) -> None:
+        with self._registry_lock:
+            registered_query = self._registry.get(self._name)
+            if registered_query is not None and registered_query != self._query:
+                raise ValueError(f'There is another prepared statement named {self._name}')
+            self._registry[self._name] = self._query
+
+
+class PreparedStatementsConnection(extensions.connection):
+    """
+    psycopg2 connection that keeps track of the statements already prepared on its database session
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
@@ -0,0 +1,83 @@
+import os
+import threading
+from datetime import datetime
+from typing import Collection, List, Optional
+
+from src import config
+from src.common.ttl_lru_cache import TTLLRUCache
+from src.domain.models.device import Device
+from src.domain.models.scheduling.tasks.task import Task
+from src.domain.repositories.device_repository import DeviceRepository
+
+
+class CachedDeviceRepository(DeviceRepository):
+    """
+    DeviceRepository decorator that caches device ownership checks. The cache is shared by every instance of the
+    process, so it lasts between requests, and forked workers get their own one
+    """
+    _cache: Optional[TTLLRUCache] = None
+    _cache_pid: Optional[int] = None
+    _cache_lock = threading.Lock()
+
+    def __init__(self, repository: DeviceRepository) -> None:
+        self._repository = repository
+
+    @classmethod
+    def get_cache(cls) -> TTLLRUCache:
+        with cls._cache_lock:
+            if cls._cache is None or cls._cache_pid != os.getpid():
+                cls._cache = TTLLRUCache(config.DEVICE_OWNERSHIP_CACHE_SIZE)
+                cls._cache_pid = os.getpid()
+            return cls._cache
+
+    @classmethod
+    def stats(cls) -> dict:
+        return cls.get_cache().stats()
+
+    def create(self, device: Device, user_id: str) -> None:
+        self._repository.create(device, user_id)
+        # A previous check may have cached that the device did not exist
+        self.get_cache().delete((device.device_id, user_id))
+
+    def exists_for_user(self, device_id: str, user_id: str) -> bool:
+        cache = self.get_cache()
+        found, exists = cache.get((device_id, user_id))
+        if found:
+            return exists
+        exists = self._repository.exists_for_user(device_id, user_id)
+        ttl = config.DEVICE_OWNERSHIP_CACHE_TTL if exists else config.DEVICE_OWNERSHIP_CACHE_NEGATIVE_TTL
+        cache.set((device_id, user_id), exists, ttl)
+        return exists
+
+    def all_exist_for_user(self, device_ids: Collection[str], user_id: str) -> bool:
+        cache = self.get_cache()
+        unchecked_ids = []
+        for device_id in set(device_ids):
+            found, exists = cache.get((device_id, user_id))
+            if found and not exists:
+                return False
+            if not found:
+                unchecked_ids.append(device_id)
+        if not unchecked_ids:
+            return True
+        # When some device does not exist, the grouped check does not tell which one, so only the existent are cached
+        exists = self._repository.all_exist_for_user(unchecked_ids, user_id)
+        if exists:
+            for device_id in unchecked_ids:
+                cache.set((device_id, user_id), True, config.DEVICE_OWNERSHIP_CACHE_TTL)
+        return exists
+
+    def get_user_devices(self, user_id: str) -> List[Device]:
+        return self._repository.get_user_devices(user_id)
+
+    def set_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> None:
+        self._repository.set_scheduling_tasks(device_id, tasks)
+
+    def get_scheduling_tasks(self, device_id: str) -> List[Task]:
+        return self._repository.get_scheduling_tasks(device_id)
+
+    def update_state(self, device_id: str, user_id: str, turned_on: bool, last_status_update: datetime) -> None:
+        self._repository.update_state(device_id, user_id, turned_on, last_status_update)
+
+    def get_state(self, device_id: str, user_id: str) -> bool:
+        return self._repository.get_state(device_id, user_id)
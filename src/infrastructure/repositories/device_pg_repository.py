@@ -1,67 +1,79 @@
-import json
 from datetime import datetime
-from typing import List
+from typing import Collection, List
 
-from src.common import dates
+from src import config
 from src.domain.mappers.device_mapper import DeviceMapper
-from src.domain.mappers.scheduling.tasks.task_mapper import TaskMapper
 from src.domain.models.device import Device
 from src.domain.models.scheduling.tasks.task import Task
 from src.domain.repositories.device_repository import DeviceRepository
-from src.domain.serializers.scheduling.tasks.task_serializer import TaskSerializer
+from src.infrastructure.database.prepared_statement import PreparedStatement
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
 from src.infrastructure.repositories.postgres_repository import PostgresRepository
 
 
 class DevicePGRepository(PostgresRepository, DeviceRepository):
+    _CREATE = PreparedStatement(
+        'devices_create',
+        'INSERT INTO Devices (device_id, user_id, name, turned_on) VALUES ($1, $2, $3, $4)'
+    )
+    _EXISTS_FOR_USER = PreparedStatement(
+        'devices_exists_for_user',
+        'SELECT EXISTS (SELECT 1 FROM Devices WHERE device_id = $1 AND user_id = $2) AS exists'
+    )
+    _COUNT_FOR_USER = PreparedStatement(
+        'devices_count_for_user',
+        'SELECT COUNT(*) AS count FROM Devices WHERE device_id = ANY($1::VARCHAR[]) AND user_id = $2'
+    )
+    _GET_USER_DEVICES = PreparedStatement(
+        'devices_get_user_devices',
+        'SELECT device_id, name, turned_on, last_status_update FROM Devices WHERE user_id = $1'
+    )
+    _UPDATE_STATE = PreparedStatement(
+        'devices_update_state',
+        'WITH updated AS ('
+        '    UPDATE Devices SET turned_on = $3, last_status_update = $4 WHERE device_id = $1 AND user_id = $2'
+        '    RETURNING device_id'
+        ') '
+        'SELECT pg_notify($5, device_id) FROM updated'
+    )
+    _GET_STATE = PreparedStatement(
+        'devices_get_state',
+        'SELECT turned_on FROM Devices WHERE device_id = $1 AND user_id = $2'
+    )
+
+    def __init__(self) -> None:
+        # Scheduling tasks are stored by the scheduler repository, along with their next action
+        self._device_scheduler_repository = DeviceSchedulerPGRepository()
 
     def create(self, device: Device, user_id: str) -> None:
-        self._execute_query(f"INSERT INTO Devices (device_id, user_id, name, turned_on) VALUES "
-                            f"('{device.device_id}', '{user_id}', '{device.name}', {device.turned_on})")
+        self._execute_statement(self._CREATE, (device.device_id, user_id, device.name, device.turned_on))
 
     def exists_for_user(self, device_id: str, user_id: str) -> bool:
-        res = self._execute_query(f"SELECT COUNT(device_id) FROM Devices WHERE device_id = '{device_id}' AND "
-                                  f"user_id = '{user_id}'")
-        return res.first()['count'] > 0
+        res = self._execute_statement(self._EXISTS_FOR_USER, (device_id, user_id))
+        return res.first()['exists']
+
+    def all_exist_for_user(self, device_ids: Collection[str], user_id: str) -> bool:
+        device_ids = list(set(device_ids))
+        res = self._execute_statement(self._COUNT_FOR_USER, (device_ids, user_id))
+        return res.first()['count'] == len(device_ids)
 
     def get_user_devices(self, user_id: str) -> List[Device]:
-        res = self._execute_query(f"SELECT * FROM Devices WHERE user_id = '{user_id}'")
+        res = self._execute_statement(self._GET_USER_DEVICES, (user_id,))
         return DeviceMapper.map_all(res.records, set_id=True)
 
-    def _has_scheduling_tasks(self, device_id: str) -> bool:
-        res = self._execute_query(f"SELECT COUNT(device_id) FROM DeviceTasks WHERE device_id = '{device_id}'")
-        return res.first()['count'] > 0
-
-    def _create_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> bool:
-        serialized_tasks = json.dumps(TaskSerializer.serialize_all(tasks))
-        self._execute_query(f"INSERT INTO DeviceTasks (device_id, tasks) VALUES ('{device_id}', '{serialized_tasks}')")
-
-    def _update_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> bool:
-        serialized_tasks = json.dumps(TaskSerializer.serialize_all(tasks))
-        self._execute_query(f"UPDATE DeviceTasks SET tasks='{serialized_tasks}' WHERE device_id='{device_id}'")
-
     def set_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> None:
-        if not self._has_scheduling_tasks(device_id):
-            self._create_scheduling_tasks(device_id, tasks)
-        else:
-            self._update_scheduling_tasks(device_id, tasks)
+        self._device_scheduler_repository.set_scheduling_tasks(device_id, tasks)
 
     def get_scheduling_tasks(self, device_id: str) -> List[Task]:
-        res = self._execute_query(f"SELECT tasks FROM DeviceTasks WHERE device_id = '{device_id}'")
-        if not res.records:
-            return []
-        return TaskMapper.map_all(res.first()['tasks'])
+        return self._device_scheduler_repository.get_scheduling_tasks(device_id)
 
     def update_state(self, device_id: str, user_id: str, turned_on: bool, last_status_update: datetime) -> None:
-        self._execute_query(
-            f"UPDATE Devices SET turned_on={str(turned_on).lower()},"
-            f" last_status_update='{dates.to_utc_isostring(last_status_update)}'"
-            f" WHERE device_id='{device_id}' AND user_id = '{user_id}'"
-        )
+        # The workers streaming the device events are notified in the same round trip
+        self._execute_statement(self._UPDATE_STATE, (device_id, user_id, turned_on, last_status_update,
+                                                     config.DEVICE_STATE_CHANNEL))
 
     def get_state(self, device_id: str, user_id: str) -> bool:
-        res = self._execute_query(
-            f"SELECT turned_on FROM Devices WHERE device_id = '{device_id}' AND user_id = '{user_id}'"
-        )
+        res = self._execute_statement(self._GET_STATE, (device_id, user_id))
         if not res.records:
             return False
         return res.first()['turned_on']
@@ -1,35 +1,133 @@
 import json
-from typing import List
+from datetime import datetime, timezone
+from typing import Collection, Dict, List, Optional, Tuple
 
+from src import config
+from src.common import dates
 from src.domain.mappers.scheduling.tasks.task_mapper import TaskMapper
+from src.domain.models.scheduling.compiled_schedule import CompiledSchedule
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
 from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
 from src.domain.repositories.device_scheduler_repository import DeviceSchedulerRepository
 from src.domain.serializers.scheduling.tasks.task_serializer import TaskSerializer
+from src.infrastructure.database.prepared_statement import PreparedStatement
 from src.infrastructure.repositories.postgres_repository import PostgresRepository
 
 
 class DeviceSchedulerPGRepository(PostgresRepository, DeviceSchedulerRepository):
-
-    def _has_scheduling_tasks(self, device_id: str) -> bool:
-        res = self._execute_query(f"SELECT COUNT(device_id) FROM DeviceTasks WHERE device_id = '{device_id}'")
-        return res.first()['count'] > 0
-
-    def _create_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> bool:
-        serialized_tasks = json.dumps(TaskSerializer.serialize_all(tasks))
-        self._execute_query(f"INSERT INTO DeviceTasks (device_id, tasks) VALUES ('{device_id}', '{serialized_tasks}')")
-
-    def _update_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> bool:
-        serialized_tasks = json.dumps(TaskSerializer.serialize_all(tasks))
-        self._execute_query(f"UPDATE DeviceTasks SET tasks='{serialized_tasks}' WHERE device_id='{device_id}'")
+    """
+    Besides the tasks, every device row keeps its next action, computed when the tasks are set and advanced after it
+    passes, so devices polling it read one row without mapping their tasks
+    """
+    _SET_SCHEDULING_TASKS = PreparedStatement(
+        'device_tasks_set',
+        'WITH saved AS ('
+        '    INSERT INTO DeviceTasks (device_id, tasks, next_action, next_action_at) VALUES ($1, $2, $3, $4)'
+        '    ON CONFLICT (device_id) DO UPDATE SET tasks = EXCLUDED.tasks, next_action = EXCLUDED.next_action,'
+        '    next_action_at = EXCLUDED.next_action_at RETURNING device_id'
+        ') '
+        'SELECT pg_notify($5, device_id) FROM saved'
+    )
+    _GET_SCHEDULING_TASKS = PreparedStatement(
+        'device_tasks_get',
+        'SELECT tasks FROM DeviceTasks WHERE device_id = $1'
+    )
+    _GET_NEXT_SCHEDULING_ACTION = PreparedStatement(
+        'device_tasks_get_next_action',
+        'SELECT next_action, next_action_at FROM DeviceTasks WHERE device_id = $1'
+    )
+    _GET_NEXT_SCHEDULING_ACTIONS = PreparedStatement(
+        'device_tasks_get_next_actions',
+        'SELECT device_id, next_action, next_action_at FROM DeviceTasks WHERE device_id = ANY($1::VARCHAR[])'
+    )
+    # Rows locked by another pass are skipped, so several passes can run at the same time
+    _GET_PASSED_NEXT_ACTIONS = PreparedStatement(
+        'device_tasks_get_passed_next_actions',
+        'SELECT device_id, tasks, next_action, next_action_at FROM DeviceTasks WHERE next_action_at < $1 '
+        'ORDER BY next_action_at LIMIT $2 FOR UPDATE SKIP LOCKED'
+    )
+    _GET_FIRST_NEXT_ACTION_MOMENT = PreparedStatement(
+        'device_tasks_get_first_next_action_moment',
+        'SELECT MIN(next_action_at) AS moment FROM DeviceTasks'
+    )
+    _UPDATE_NEXT_ACTIONS = PreparedStatement(
+        'device_tasks_update_next_actions',
+        'UPDATE DeviceTasks T SET next_action = U.next_action, next_action_at = U.next_action_at '
+        'FROM UNNEST($1::VARCHAR[], $2::VARCHAR[], $3::TIMESTAMP[]) AS U(device_id, next_action, next_action_at) '
+        'WHERE T.device_id = U.device_id'
+    )
 
     def set_scheduling_tasks(self, device_id: str, tasks: List[Task]) -> None:
-        if not self._has_scheduling_tasks(device_id):
-            self._create_scheduling_tasks(device_id, tasks)
-        else:
-            self._update_scheduling_tasks(device_id, tasks)
+        # The workers streaming the device events are notified in the same round trip
+        serialized_tasks = json.dumps(TaskSerializer.serialize_all(tasks))
+        next_action, next_action_at = self._get_next_action_columns(tasks, dates.now())
+        self._execute_statement(self._SET_SCHEDULING_TASKS, (device_id, serialized_tasks, next_action, next_action_at,
+                                                             config.DEVICE_SCHEDULER_CHANNEL))
 
     def get_scheduling_tasks(self, device_id: str) -> List[Task]:
-        res = self._execute_query(f"SELECT tasks FROM DeviceTasks WHERE device_id = '{device_id}'")
+        res = self._execute_statement(self._GET_SCHEDULING_TASKS, (device_id,))
         if not res.records:
             return []
         return TaskMapper.map_all(res.first()['tasks'])
+
+    def get_next_scheduling_action(self, device_id: str, after: datetime) -> Tuple[bool, Optional[SchedulerAction]]:
+        """
+        Returns if the stored next action is still valid at the given moment, which it is not when it passed and
+        was not advanced yet, and the action
+        """
+        res = self._execute_statement(self._GET_NEXT_SCHEDULING_ACTION, (device_id,))
+        if not res.records:
+            return True, None
+        return self._map_next_action(res.first(), after)
+
+    def get_next_scheduling_actions(self, device_ids: Collection[str],
+                                    after: datetime) -> Dict[str, Tuple[bool, Optional[SchedulerAction]]]:
+        """
+        Same as get_next_scheduling_action, for many devices at once
+        """
+        device_ids = list(set(device_ids))
+        res = self._execute_statement(self._GET_NEXT_SCHEDULING_ACTIONS, (device_ids,))
+        next_actions = {x: (True, None) for x in device_ids}
+        for record in res.records:
+            next_actions[record['device_id']] = self._map_next_action(record, after)
+        return next_actions
+
+    def advance_next_scheduling_actions(self, after: datetime, limit: int) -> List[Tuple[str, SchedulerAction]]:
+        """
+        Replaces up to limit stored next actions that passed before the given moment. Returns the replaced ones,
+        along with their device ids
+        """
+        with self._transaction() as transaction:
+            res = self._execute_statement(self._GET_PASSED_NEXT_ACTIONS, (dates.to_naive_utc(after), limit),
+                                          transaction)
+            if not res.records:
+                return []
+            next_actions = [self._get_next_action_columns(TaskMapper.map_all(x['tasks']), after) for x in res.records]
+            self._execute_statement(self._UPDATE_NEXT_ACTIONS, (
+                [x['device_id'] for x in res.records], [x[0] for x in next_actions], [x[1] for x in next_actions]
+            ), transaction)
+        return [(x['device_id'], SchedulerAction(action=TaskAction(x['next_action']),
+                                                 moment=x['next_action_at'].replace(tzinfo=timezone.utc)))
+                for x in res.records]
+
+    def get_first_next_action_moment(self) -> Optional[datetime]:
+        res = self._execute_statement(self._GET_FIRST_NEXT_ACTION_MOMENT)
+        moment = res.first()['moment']
+        return moment.replace(tzinfo=timezone.utc) if moment is not None else None
+
+    @staticmethod
+    def _map_next_action(record: dict, after: datetime) -> Tuple[bool, Optional[SchedulerAction]]:
+        if record['next_action_at'] is None:
+            return True, None
+        moment = record['next_action_at'].replace(tzinfo=timezone.utc)
+        if moment < after:
+            return False, None
+        return True, SchedulerAction(action=TaskAction(record['next_action']), moment=moment)
+
+    @staticmethod
+    def _get_next_action_columns(tasks: List[Task], after: datetime) -> Tuple[Optional[str], Optional[datetime]]:
+        next_action = CompiledSchedule(tasks).get_next_action(after)
+        if next_action is None:
+            return None, None
+        return next_action.action.value, dates.to_naive_utc(next_action.moment)
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from src.common import dates
+from src.domain.repositories.device_token_revocation_repository import DeviceTokenRevocationRepository
+from src.infrastructure.database.prepared_statement import PreparedStatement
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
+
+
+class DeviceTokenRevocationPGRepository(PostgresRepository, DeviceTokenRevocationRepository):
+    _REVOKE = PreparedStatement(
+        'device_token_revocations_revoke',
+        'INSERT INTO DeviceTokenRevocations (device_id, revoked_before) VALUES ($1, $2) '
+        'ON CONFLICT (device_id) DO UPDATE SET revoked_before = EXCLUDED.revoked_before'
+    )
+    _GET = PreparedStatement(
+        'device_token_revocations_get',
+        'SELECT revoked_before FROM DeviceTokenRevocations WHERE device_id = $1'
+    )
+    _GET_ALL = PreparedStatement(
+        'device_token_revocations_get_all',
+        'SELECT device_id, revoked_before FROM DeviceTokenRevocations'
+    )
+    _GET_ALL_REVOKED_AFTER = PreparedStatement(
+        'device_token_revocations_get_all_revoked_after',
+        'SELECT device_id, revoked_before FROM DeviceTokenRevocations WHERE revoked_before > $1'
+    )
+
+    def revoke(self, device_id: str, revoked_before: datetime) -> None:
+        self._execute_statement(self._REVOKE, (device_id, dates.to_naive_utc(revoked_before)))
+
+    def get(self, device_id: str) -> Optional[datetime]:
+        result = self._execute_statement(self._GET, (device_id,))
+        if not result.records:
+            return None
+        return result.records[0]['revoked_before'].replace(tzinfo=timezone.utc)
+
+    def get_all(self, revoked_after: Optional[datetime] = None) -> Dict[str, datetime]:
+        if revoked_after is None:
+            result = self._execute_statement(self._GET_ALL)
+        else:
+            result = self._execute_statement(self._GET_ALL_REVOKED_AFTER, (dates.to_naive_utc(revoked_after),))
+        return {row['device_id']: row['revoked_before'].replace(tzinfo=timezone.utc) for row in result.records}
@@ -1,23 +1,53 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from src.common import dates
+from src import config
 from src.domain.models.scheduling.tasks.task_action import TaskAction
 from src.domain.repositories.instant_action_repository import InstantActionRepository
+from src.infrastructure.database.prepared_statement import PreparedStatement
 from src.infrastructure.repositories.postgres_repository import PostgresRepository
 
 
 class InstantActionPGRepository(PostgresRepository, InstantActionRepository):
-    def clean_for(self, device_id: str) -> None:
-        self._execute_query(f"DELETE FROM InstantActions WHERE device_id='{device_id}'")
+    # Every device has one mailbox row, replaced by every push. Listeners of every worker are notified on commit,
+    # so the action can already be pulled when they wake up
+    _PUSH = PreparedStatement(
+        'instant_actions_push',
+        'WITH pushed AS (INSERT INTO InstantActions (device_id, action, timestamp) '
+        'VALUES ($1, $2, CURRENT_TIMESTAMP) ON CONFLICT (device_id) DO UPDATE '
+        'SET action = EXCLUDED.action, timestamp = EXCLUDED.timestamp RETURNING device_id) '
+        'SELECT pg_notify($3, device_id) FROM pushed'
+    )
+    _PUSH_ALL = PreparedStatement(
+        'instant_actions_push_all',
+        'WITH pushed AS (INSERT INTO InstantActions (device_id, action, timestamp) '
+        'SELECT device_id, action, CURRENT_TIMESTAMP '
+        'FROM UNNEST($1::VARCHAR[], $2::VARCHAR[]) AS A(device_id, action) '
+        'ON CONFLICT (device_id) DO UPDATE '
+        'SET action = EXCLUDED.action, timestamp = EXCLUDED.timestamp RETURNING device_id) '
+        'SELECT pg_notify($3, device_id) FROM pushed'
+    )
+    # Expired actions are deleted too, but not returned
+    _PULL = PreparedStatement(
+        'instant_actions_pull',
+        'WITH pulled AS (DELETE FROM InstantActions WHERE device_id = $1 RETURNING action, timestamp) '
+        'SELECT action FROM pulled WHERE timestamp >= $2'
+    )
 
     def push(self, device_id: str, action: TaskAction) -> None:
-        self._execute_query(f"INSERT INTO InstantActions (device_id, action, timestamp) VALUES "
-                            f"('{device_id}', '{action.value}', CURRENT_TIMESTAMP)")
+        self._execute_statement(self._PUSH, (device_id, action.value, config.INSTANT_ACTIONS_CHANNEL))
+
+    def push_all(self, actions: List[Tuple[str, TaskAction]]) -> None:
+        """
+        Pushes the actions of many devices in a single round trip. A device can only be given once
+        """
+        if not actions:
+            return
+        self._execute_statement(self._PUSH_ALL, ([x[0] for x in actions], [x[1].value for x in actions],
+                                                 config.INSTANT_ACTIONS_CHANNEL))
 
     def pull(self, device_id: str, pull_until: datetime) -> Optional[TaskAction]:
-        result = self._execute_query(f"SELECT * FROM InstantActions WHERE device_id = '{device_id}'"
-                                     f"AND timestamp::TIMESTAMP >= '{dates.to_utc_isostring(pull_until)}'::TIMESTAMP")
+        result = self._execute_statement(self._PULL, (device_id, pull_until))
         if len(result.rows) == 0:
             return None
         action = result.first()['action']
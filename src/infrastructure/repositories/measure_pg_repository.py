@@ -1,32 +1,174 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
+from src import config
+from src.common import dates
 from src.domain.mappers.measure_mapper import MeasureMapper
 from src.domain.models.measure import Measure
 from src.domain.repositories.measure_repository import MeasureRepository
+from src.infrastructure.database.csv_copy_stream import CsvCopyStream
+from src.infrastructure.database.prepared_statement import PreparedStatement
 from src.infrastructure.repositories.postgres_repository import PostgresRepository
 
 
 class MeasurePGRepository(PostgresRepository, MeasureRepository):
+    # Every insertion also adds its measures to the rollups of each resolution in the same statement. Rollups keep
+    # sums instead of means, so they can be incremented with the new measures and merged into coarser slices
+    _ROLLUPS_TEMPLATE = (
+        'WITH M AS ({insert} RETURNING voltage, current, timestamp) '
+        'INSERT INTO MeasureRollups (resolution, device_id, bucket_start, voltage_sum, current_sum, samples) '
+        'SELECT R.resolution, $1, date_bin(R.resolution * INTERVAL \'1 min\', M.timestamp, TIMESTAMP \'2000-01-03\'), '
+        'SUM(M.voltage), SUM(M.current), COUNT(*) FROM M, UNNEST(ARRAY[{resolutions}]) AS R(resolution) '
+        'GROUP BY 1, 3 ON CONFLICT (resolution, device_id, bucket_start) DO UPDATE SET '
+        'voltage_sum = MeasureRollups.voltage_sum + EXCLUDED.voltage_sum, '
+        'current_sum = MeasureRollups.current_sum + EXCLUDED.current_sum, '
+        'samples = MeasureRollups.samples + EXCLUDED.samples'
+    )
+    _ROLLUP_RESOLUTIONS = ', '.join(str(x) for x in config.MEASURES_ROLLUP_RESOLUTIONS)
+    _CREATE = PreparedStatement(
+        'measures_create',
+        _ROLLUPS_TEMPLATE.format(
+            insert='INSERT INTO Measures (device_id, voltage, current, timestamp) VALUES ($1, $2, $3, $4)',
+            resolutions=_ROLLUP_RESOLUTIONS)
+    )
+    # Measures are sent as arrays so the same prepared statement is used no matter how many of them are inserted
+    _CREATE_MULTIPLE = PreparedStatement(
+        'measures_create_multiple',
+        _ROLLUPS_TEMPLATE.format(
+            insert='INSERT INTO Measures (device_id, voltage, current, timestamp) '
+                   'SELECT $1, M.voltage, M.current, M.timestamp '
+                   'FROM UNNEST($2::NUMERIC[], $3::NUMERIC[], $4::TIMESTAMP[]) AS M(voltage, current, timestamp)',
+            resolutions=_ROLLUP_RESOLUTIONS)
+    )
+    # Copied measures are staged in a temporary table of the session, so they can be inserted like the other ones
+    _CREATE_STAGED_MEASURES = 'CREATE TEMPORARY TABLE IF NOT EXISTS StagedMeasures ' \
+                              '(voltage NUMERIC, current NUMERIC, timestamp TIMESTAMP) ON COMMIT DELETE ROWS'
+    _COPY_MEASURES = 'COPY StagedMeasures (voltage, current, timestamp) FROM STDIN WITH (FORMAT csv)'
+    _CREATE_FROM_STAGED = PreparedStatement(
+        'measures_create_from_staged',
+        _ROLLUPS_TEMPLATE.format(
+            insert='INSERT INTO Measures (device_id, voltage, current, timestamp) '
+                   'SELECT $1, voltage, current, timestamp FROM StagedMeasures',
+            resolutions=_ROLLUP_RESOLUTIONS)
+    )
+    _GET_FROM_LAST_MINUTES = PreparedStatement(
+        'measures_get_from_last_minutes',
+        'SELECT voltage, current, timestamp FROM Measures WHERE device_id = $1 '
+        'AND timestamp >= (now()::TIMESTAMP - $2::FLOAT * INTERVAL \'1 min\')'
+    )
+    _GET_ALL_FOR_USER_FROM_LAST_MINUTES = PreparedStatement(
+        'measures_get_all_for_user_from_last_minutes',
+        'SELECT M.voltage, M.current, M.timestamp FROM Measures M, Devices D WHERE M.device_id = D.device_id '
+        'AND D.user_id = $1 AND M.timestamp >= (now()::TIMESTAMP - $2::FLOAT * INTERVAL \'1 min\')'
+    )
+    # Measures are grouped into $3 slices of ($2 / $3) minutes starting at the oldest one. Each measure belongs to the
+    # first slice that is not before it, so the slice index is the ceiling of its distance to the oldest measure
+    _SUMMARIZE_TEMPLATE = (
+        'WITH M AS ({measures}), '
+        'S AS (SELECT M.*, B.base, '
+        'CEIL(EXTRACT(EPOCH FROM (M.timestamp - B.base)) / ($2::FLOAT / $3::INT * 60))::INT AS slice '
+        'FROM M, (SELECT MIN(timestamp) AS base FROM M) B) '
+        'SELECT MIN(base) + slice * ($2::FLOAT / $3::INT * INTERVAL \'1 min\') AS timestamp, {aggregates} '
+        'FROM S WHERE slice < $3::INT GROUP BY slice ORDER BY slice'
+    )
+    _MEASURES_AGGREGATES = 'AVG(voltage) AS voltage, AVG(current) AS current'
+    _GET_SUMMARIZED_FROM_LAST_MINUTES = PreparedStatement(
+        'measures_get_summarized_from_last_minutes',
+        _SUMMARIZE_TEMPLATE.format(measures=_GET_FROM_LAST_MINUTES.query, aggregates=_MEASURES_AGGREGATES)
+    )
+    _GET_ALL_FOR_USER_SUMMARIZED_FROM_LAST_MINUTES = PreparedStatement(
+        'measures_get_all_for_user_summarized_from_last_minutes',
+        _SUMMARIZE_TEMPLATE.format(measures=_GET_ALL_FOR_USER_FROM_LAST_MINUTES.query,
+                                   aggregates=_MEASURES_AGGREGATES)
+    )
+    # Rollups of the $4 minutes resolution are summarized like measures, using the start of their bucket as timestamp.
+    # Buckets that started before the interval but overlap it are included
+    _ROLLUPS_AGGREGATES = 'SUM(voltage_sum) / SUM(samples) AS voltage, SUM(current_sum) / SUM(samples) AS current'
+    _GET_SUMMARIZED_FROM_ROLLUPS = PreparedStatement(
+        'measures_get_summarized_from_rollups',
+        _SUMMARIZE_TEMPLATE.format(
+            measures='SELECT voltage_sum, current_sum, samples, bucket_start AS timestamp FROM MeasureRollups '
+                     'WHERE resolution = $4::INT AND device_id = $1 AND bucket_start > '
+                     '(now()::TIMESTAMP - ($2::FLOAT + $4::INT) * INTERVAL \'1 min\')',
+            aggregates=_ROLLUPS_AGGREGATES)
+    )
+    _GET_ALL_FOR_USER_SUMMARIZED_FROM_ROLLUPS = PreparedStatement(
+        'measures_get_all_for_user_summarized_from_rollups',
+        _SUMMARIZE_TEMPLATE.format(
+            measures='SELECT R.voltage_sum, R.current_sum, R.samples, R.bucket_start AS timestamp '
+                     'FROM MeasureRollups R, Devices D WHERE R.device_id = D.device_id AND D.user_id = $1 '
+                     'AND R.resolution = $4::INT AND R.bucket_start > '
+                     '(now()::TIMESTAMP - ($2::FLOAT + $4::INT) * INTERVAL \'1 min\')',
+            aggregates=_ROLLUPS_AGGREGATES)
+    )
+
+    def __init__(self, copy_threshold: Optional[int] = None) -> None:
+        self._copy_threshold = copy_threshold if copy_threshold is not None else config.MEASURES_COPY_THRESHOLD
 
     def create(self, measure: Measure, device_id: str) -> None:
-        self._execute_query(f"INSERT INTO Measures (device_id, voltage, current, timestamp) VALUES ("
-                            f"'{device_id}', {measure.voltage}, {measure.current}, '{measure.timestamp}')")
+        self._execute_statement(self._CREATE, (device_id, measure.voltage, measure.current, measure.timestamp))
 
     def create_multiple(self, measures: List[Measure], device_id: str) -> None:
         if not measures:
             return
-        values = ', '.join([
-            f"('{device_id}', {measure.voltage}, {measure.current}, '{measure.timestamp}')" for measure in measures
-        ])
-        self._execute_query(f"INSERT INTO Measures (device_id, voltage, current, timestamp) VALUES {values}")
+        if len(measures) >= self._copy_threshold:
+            self._copy_multiple(measures, device_id)
+            return
+        self._execute_statement(self._CREATE_MULTIPLE, (
+            device_id,
+            [measure.voltage for measure in measures],
+            [measure.current for measure in measures],
+            [measure.timestamp for measure in measures]
+        ))
+
+    def _copy_multiple(self, measures: List[Measure], device_id: str) -> None:
+        rows = (
+            (measure.voltage, measure.current, self._to_copy_timestamp(measure.timestamp))
+            for measure in measures
+        )
+        with self._transaction() as transaction:
+            self._execute_query(self._CREATE_STAGED_MEASURES, transaction)
+            self._copy_from(self._COPY_MEASURES, CsvCopyStream(rows), transaction)
+            self._execute_statement(self._CREATE_FROM_STAGED, (device_id,), transaction)
+
+    @classmethod
+    def _to_copy_timestamp(cls, timestamp: datetime) -> str:
+        # TIMESTAMP columns ignore the offset of the received text, so it must be already converted to UTC
+        iso_timestamp = timestamp.isoformat()
+        if timestamp.tzinfo is None:
+            return iso_timestamp
+        if iso_timestamp.endswith('+00:00'):
+            return iso_timestamp[:-len('+00:00')]
+        return dates.to_naive_utc(timestamp).isoformat()
 
     def get_from_last_minutes(self, device_id: str, time_interval: int) -> List[Measure]:
-        result = self._execute_query(f"SELECT * FROM Measures WHERE device_id = '{device_id}'"
-                                     f"AND timestamp::TIMESTAMP >= (now()::TIMESTAMP - INTERVAL '{time_interval} min')")
+        result = self._execute_statement(self._GET_FROM_LAST_MINUTES, (device_id, time_interval))
         return result.map_all(MeasureMapper)
 
     def get_all_for_user_from_last_minutes(self, user_id: str, time_interval: int) -> List[Measure]:
-        result = self._execute_query("SELECT M.* FROM Measures M, Devices D WHERE M.device_id = D.device_id AND "
-                                     f"D.user_id = '{user_id}' AND "
-                                     f"M.timestamp::TIMESTAMP >= (now()::TIMESTAMP - INTERVAL '{time_interval} min')")
+        result = self._execute_statement(self._GET_ALL_FOR_USER_FROM_LAST_MINUTES, (user_id, time_interval))
+        return result.map_all(MeasureMapper)
+
+    def get_summarized_from_last_minutes(self, device_id: str, time_interval: int,
+                                         slices_count: int) -> List[Measure]:
+        result = self._execute_statement(self._GET_SUMMARIZED_FROM_LAST_MINUTES,
+                                         (device_id, time_interval, slices_count))
+        return result.map_all(MeasureMapper)
+
+    def get_all_for_user_summarized_from_last_minutes(self, user_id: str, time_interval: int,
+                                                      slices_count: int) -> List[Measure]:
+        result = self._execute_statement(self._GET_ALL_FOR_USER_SUMMARIZED_FROM_LAST_MINUTES,
+                                         (user_id, time_interval, slices_count))
+        return result.map_all(MeasureMapper)
+
+    def get_summarized_from_rollups(self, device_id: str, time_interval: int, slices_count: int,
+                                    resolution: int) -> List[Measure]:
+        result = self._execute_statement(self._GET_SUMMARIZED_FROM_ROLLUPS,
+                                         (device_id, time_interval, slices_count, resolution))
+        return result.map_all(MeasureMapper)
+
+    def get_all_for_user_summarized_from_rollups(self, user_id: str, time_interval: int, slices_count: int,
+                                                 resolution: int) -> List[Measure]:
+        result = self._execute_statement(self._GET_ALL_FOR_USER_SUMMARIZED_FROM_ROLLUPS,
+                                         (user_id, time_interval, slices_count, resolution))
         return result.map_all(MeasureMapper)
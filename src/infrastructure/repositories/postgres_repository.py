@@ -1,32 +1,81 @@
-import src.config as config
-import psycopg2
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, IO, Iterator, Optional
+
+from psycopg2 import extensions
+
 from src.app.utils.database.query_result import QueryResult
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.prepared_statement import PreparedStatement
 
 
 class PostgresRepository:
+    _shared_transaction: ContextVar[Optional[extensions.connection]] = ContextVar('shared_transaction', default=None)
+
+    @classmethod
+    @contextmanager
+    def shared_transaction(cls) -> Iterator[None]:
+        """
+        Runs the statements of every repository called in the block (from the same thread) on one pooled connection,
+        committed together when the block ends. Nested blocks join the outer one. Errors raised in the block roll
+        it back and are raised as they are, as they may come from the domain
+        """
+        if cls._shared_transaction.get() is not None:
+            yield
+            return
+        with ConnectionPool.get_instance().connection() as conn:
+            token = cls._shared_transaction.set(conn)
+            try:
+                yield
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cls._shared_transaction.reset(token)
+
+    def _execute_statement(self, statement: PreparedStatement, params: tuple = (), transaction=None) -> QueryResult:
+        return self._execute(lambda cursor: statement.execute(cursor, params), transaction)
 
     def _execute_query(self, query: str, transaction=None) -> QueryResult:
-        conn = transaction
-        if not conn:
-            conn = self._create_transaction()
+        return self._execute(lambda cursor: cursor.execute(query), transaction)
+
+    def _copy_from(self, query: str, stream: IO, transaction=None) -> QueryResult:
+        return self._execute(lambda cursor: cursor.copy_expert(query, stream), transaction)
+
+    @classmethod
+    @contextmanager
+    def _transaction(cls) -> Iterator[extensions.connection]:
+        """
+        Yields a pooled connection whose statements are committed together when the block ends. Inside a shared
+        transaction, its connection is yielded instead, and it is committed by the shared one
+        """
+        shared_conn = cls._shared_transaction.get()
+        if shared_conn is not None:
+            yield shared_conn
+            return
+        with ConnectionPool.get_instance().connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise Exception(e)
+
+    @classmethod
+    def _execute(cls, run: Callable[[extensions.cursor], None], transaction=None) -> QueryResult:
+        if transaction:
+            return cls._run(run, transaction)
+        with cls._transaction() as conn:
+            return cls._run(run, conn)
+
+    @classmethod
+    def _run(cls, run: Callable[[extensions.cursor], None], conn) -> QueryResult:
         cursor = conn.cursor()
         result = QueryResult()
         try:
-            cursor.execute(f"SET TIMEZONE = 'utc'; {query}")
+            run(cursor)
             result.from_cursor(cursor)
-            cursor.close()
-            if not transaction:
-                conn.commit()
-        except Exception as e:
-            if not transaction:
-                conn.rollback()
-            raise Exception(e)
         finally:
-            if not transaction:
-                conn.close()
+            cursor.close()
         return result
-
-    def _create_transaction(self):
-        conn_string = f"user='{config.DB_USERNAME}' password='{config.DB_PASSWORD}' host='{config.DB_URL}' " \
-                      f"port='{config.DB_PORT}' dbname='{config.DB_NAME}'"
-        return psycopg2.connect(conn_string)
@@ -1,19 +1,31 @@
 from .postgres_repository import PostgresRepository
+from ..database.prepared_statement import PreparedStatement
 from ...domain.mappers.user_mapper import UserMapper
 from ...domain.models.user import User
 from ...domain.repositories.user_repository import UserRepository
 
 
 class UserPGRepository(PostgresRepository, UserRepository):
+    _EXISTS = PreparedStatement(
+        'users_exists',
+        'SELECT COUNT(user_id) AS count FROM Users WHERE user_id = $1'
+    )
+    _GET = PreparedStatement(
+        'users_get',
+        'SELECT user_id, username, email, hashed_password FROM Users WHERE user_id = $1'
+    )
+    _CREATE = PreparedStatement(
+        'users_create',
+        'INSERT INTO Users (user_id, username, email, hashed_password) VALUES ($1, $2, $3, $4)'
+    )
 
     def exists(self, user_id: str) -> bool:
-        result = self._execute_query(f"SELECT COUNT(user_id) AS count FROM Users WHERE user_id = '{user_id}'")
+        result = self._execute_statement(self._EXISTS, (user_id,))
         return result.first()['count'] > 0
 
     def get(self, user_id: str) -> User:
-        result = self._execute_query(f"SELECT * FROM Users WHERE user_id = '{user_id}'")
+        result = self._execute_statement(self._GET, (user_id,))
         return result.map_first(UserMapper)
 
     def create(self, user: User) -> None:
-        self._execute_query(f"INSERT INTO Users (user_id, username, email, hashed_password) VALUES "
-                            f"('{user.user_id}', '{user.username}', '{user.email}', '{user.hashed_password}')")
+        self._execute_statement(self._CREATE, (user.user_id, user.username, user.email, user.hashed_password))
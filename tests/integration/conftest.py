@@ -1,6 +1,7 @@
 import pytest
 
 from src import config
+from src.app.container import Container
 from src.infrastructure.database.db_migrator import DBMigrator
 
 # Import steps for autoload
@@ -10,6 +11,10 @@ from tests.integration.steps.device_steps import *  # noqa: F401, F403
 from tests.integration.steps.user_data_steps import *  # noqa: F401, F403
 from tests.integration.steps.device_scheduler_steps import *  # noqa: F401, F403
 from tests.integration.steps.device_token_steps import *  # noqa: F401, F403
+from tests.integration.steps.query_plan_steps import *  # noqa: F401, F403
+from tests.integration.steps.measure_compaction_steps import *  # noqa: F401, F403
+from tests.integration.steps.instant_action_steps import *  # noqa: F401, F403
+from tests.integration.steps.device_events_steps import *  # noqa: F401, F403
 
 migrator = None
 DROP_DB = True
@@ -32,6 +37,8 @@ def clean_database():
     global migrator
     print('Cleaning testing database')
     if DROP_DB:
+        # Stops the notifications listener, whose connection keeps the database in use
+        Container.reset()
         migrator.drop_db()
 
 
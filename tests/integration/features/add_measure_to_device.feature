@@ -17,6 +17,14 @@ Feature: Add measure to device
     And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
     When user tries to add measures for device with id '33523ad3-650f-4904-b325-22e24637be5a'
     Then measures are added successfully
+    And the rollups of device with id '33523ad3-650f-4904-b325-22e24637be5a' include all its measures
+
+  Scenario: Add a backlog of measures to device
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    When user tries to add 2500 measures for device with id '33523ad3-650f-4904-b325-22e24637be5a'
+    Then measures are added successfully
+    And the rollups of device with id '33523ad3-650f-4904-b325-22e24637be5a' include all its measures
 
   Scenario: Try add invalid measure to device
     Given user is logged in
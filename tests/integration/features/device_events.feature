@@ -0,0 +1,15 @@
+Feature: Device events
+
+  Scenario: Stream a state update made by another worker
+    Given user is logged in
+    And device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a01' exists for logged user
+    And device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a01' is connected to its events stream
+    When another worker updates the state of device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a01' as turned_on
+    Then connected device receives a state event
+
+  Scenario: Stream the next action of tasks set by another worker
+    Given user is logged in
+    And device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a02' exists for logged user
+    And device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a02' is connected to its events stream
+    When another worker sets a daily task for device with id '3e9d7c51-2b8a-4f06-a1c4-6d5b0e8f9a02'
+    Then connected device receives a next_action event
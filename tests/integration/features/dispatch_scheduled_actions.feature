@@ -0,0 +1,20 @@
+Feature: Dispatch scheduled actions
+
+  Scenario: Due scheduled action is pushed as instant action
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' has a task turning it on in a second
+    When due scheduled actions are dispatched in two seconds
+    Then device with id '33523ad3-650f-4904-b325-22e24637be5a' has a pending instant action turning it on
+
+  Scenario: Due scheduled action is not advanced when it fails to be pushed
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' has a task turning it on in a second
+    When due scheduled actions fail to be pushed in two seconds
+    Then stored next scheduling action of device with id '33523ad3-650f-4904-b325-22e24637be5a' is still due
+
+  Scenario: Next actions are not advanced without pushing them while a dispatcher runs
+    When a scheduled actions dispatcher is running
+    Then next actions can not be advanced without pushing them
+    And next actions can be advanced without pushing them once the dispatcher stops
@@ -9,3 +9,13 @@ Feature: Get all devices measures for a user
     And device with id '33523ad3-650f-4904-b325-22e24637be6c' has recent measures
     When user tries to get measures for all devices
     Then summarized measures are returned successfully
+
+  Scenario: Get measures summarized by the database from last 5 minutes for all user's device
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be7a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be7b' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be7a' has recent measures
+    And device with id '33523ad3-650f-4904-b325-22e24637be7b' has recent measures
+    When user tries to get measures summarized by the database for all devices
+    Then summarized measures are returned successfully
+    And summarized measures are sorted by timestamp without exceeding the maximum to show
@@ -6,3 +6,33 @@ Feature: Set device scheduling tasks
     And device with id '33523ad3-650f-4904-b325-22e24637be5a' has scheduling tasks
     When user tries to get next scheduling tasks for device with id '33523ad3-650f-4904-b325-22e24637be5a'
     Then next device scheduling task is returned successfully
+
+  Scenario: Get device next scheduling task when its stored one passed
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' has scheduling tasks
+    And stored next scheduling action of device with id '33523ad3-650f-4904-b325-22e24637be5a' passed
+    When user tries to get next scheduling tasks for device with id '33523ad3-650f-4904-b325-22e24637be5a'
+    Then next device scheduling task is returned successfully
+
+  Scenario: Advance passed next scheduling actions
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' has scheduling tasks
+    And stored next scheduling action of device with id '33523ad3-650f-4904-b325-22e24637be5a' passed
+    When passed next scheduling actions are advanced
+    Then stored next scheduling action of device with id '33523ad3-650f-4904-b325-22e24637be5a' is the next one
+
+  Scenario: Get next scheduling tasks of many devices at once
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    And device with id '6f1f3c41-0d5e-4f6b-9d0e-3a4b2c1d5e6f' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' has scheduling tasks
+    When user tries to get next scheduling tasks for devices with ids '33523ad3-650f-4904-b325-22e24637be5a' and '6f1f3c41-0d5e-4f6b-9d0e-3a4b2c1d5e6f'
+    Then next scheduling tasks of devices with ids '33523ad3-650f-4904-b325-22e24637be5a' and '6f1f3c41-0d5e-4f6b-9d0e-3a4b2c1d5e6f' are returned successfully
+
+  Scenario: Get next scheduling tasks of many devices when one of them is not of the user
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5a' exists for logged user
+    When user tries to get next scheduling tasks for devices with ids '33523ad3-650f-4904-b325-22e24637be5a' and '9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d'
+    Then next scheduling tasks of many devices are not returned
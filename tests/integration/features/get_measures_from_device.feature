@@ -5,3 +5,19 @@ Feature: Get measures from device
     And device with id '33523ad3-650f-4904-b325-22e24637be5a' has recent measures
     When user tries to get measures for device with id '33523ad3-650f-4904-b325-22e24637be5a'
     Then summarized measures are returned successfully
+
+  Scenario: Get measures summarized by the database from last 5 minutes
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5b' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5b' has recent measures
+    When user tries to get measures summarized by the database for device with id '33523ad3-650f-4904-b325-22e24637be5b'
+    Then summarized measures are returned successfully
+    And summarized measures are sorted by timestamp without exceeding the maximum to show
+
+  Scenario: Get measures summarized from rollups for a long interval
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be5c' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be5c' has recent measures
+    When user tries to get measures from last 1440 minutes for device with id '33523ad3-650f-4904-b325-22e24637be5c'
+    Then summarized measures are returned successfully
+    And summarized measures are sorted by timestamp without exceeding the maximum to show
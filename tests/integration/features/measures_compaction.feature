@@ -0,0 +1,24 @@
+Feature: Measures compaction
+
+  Scenario: Expired measures and rollups are deleted in chunks
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be8a' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be8a' has measures from the last 60 days
+    When the measures compaction runs keeping measures for 40 days and rollups for 50 days in chunks of 25 rows
+    Then device with id '33523ad3-650f-4904-b325-22e24637be8a' has no measures older than 40 days
+    And device with id '33523ad3-650f-4904-b325-22e24637be8a' has rollups older than 40 days but not older than 50 days
+    And the measures compaction reports the removed rows
+
+  Scenario: Expired partitions are dropped
+    Given user is logged in
+    And device with id '33523ad3-650f-4904-b325-22e24637be8b' exists for logged user
+    And device with id '33523ad3-650f-4904-b325-22e24637be8b' has measures from the last 60 days
+    And measures partitions cover the last 60 days
+    When the measures compaction runs keeping measures for 40 days and rollups for 50 days in chunks of 25 rows
+    Then device with id '33523ad3-650f-4904-b325-22e24637be8b' has no measures older than 40 days
+    And the measures compaction reports dropped partitions
+
+  Scenario: Upcoming partitions are created
+    Given the upcoming measures partitions do not exist
+    When the measures compaction runs keeping measures for 40 days and rollups for 50 days in chunks of 25 rows
+    Then the measures partitions exist until the ones created in advance
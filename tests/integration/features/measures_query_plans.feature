@@ -0,0 +1,33 @@
+Feature: Measures query plans
+
+  Scenario: Measures from last minutes of a device are looked up by index
+    Given user is logged in
+    And 20 devices with 6000 measures each exist for logged user
+    When the query plan to get measures from last 10 minutes of device '00000000-0000-4000-8000-000000000003' is explained
+    Then the query plan uses the index 'measures_device_id_timestamp_idx'
+
+  Scenario: Recent measures of all user devices are looked up by index
+    Given user is logged in
+    And 20 devices with 6000 measures each exist for logged user
+    When the query plan to get measures from last 10 minutes of all logged user devices is explained
+    Then the query plan does not sequentially scan the current partition of measures
+
+  Scenario: Index usability check of the recent measures of all user devices
+    Given user is logged in
+    And 20 devices with 6000 measures each exist for logged user
+    When the query plan to get measures from last 10 minutes of all logged user devices is explained for the index usability check without sequential scans
+    Then the query plan does not sequentially scan the current partition of measures
+
+  Scenario: Index usability check of the BRIN index
+    Given user is logged in
+    And 20 devices with 6000 measures each exist for logged user
+    When the query plan to get measures between 11 and 10 days ago is explained for the index usability check with bitmap scans only
+    Then the query plan uses the index 'measures_timestamp_brin_idx'
+
+  Scenario: Measures from last minutes of a device are only looked up in recent partitions
+    Given user is logged in
+    And 20 devices with 6000 measures each exist for logged user
+    And measures partitions cover the last 30 days
+    When the query plan to get measures from last 10 minutes of device '00000000-0000-4000-8000-000000000003' is explained
+    Then the query plan does not scan the partition of measures from 20 days ago
+    And the query plan uses the index 'measures_device_id_timestamp_idx'
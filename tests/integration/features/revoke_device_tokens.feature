@@ -0,0 +1,33 @@
+Feature: Revoke device tokens
+
+  Scenario: Revoke tokens
+    Given user is logged in
+    And device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a01' exists for logged user
+    And user generated a token for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a01'
+    When user tries to revoke the tokens of device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a01'
+    Then device tokens are revoked successfully
+    When device tries to update its state as turned_on for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a01'
+    Then device request is unauthorized
+
+  Scenario: Tokens generated after the revocation are accepted
+    Given user is logged in
+    And device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a02' exists for logged user
+    And user revoked the tokens of device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a02'
+    And user generated a token for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a02'
+    When device tries to update its state as turned_on for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a02'
+    Then device state is updated successfully
+
+  Scenario: Revoke tokens of a device of another user
+    Given user is logged in
+    When user tries to revoke the tokens of device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a03'
+    Then device tokens are not revoked
+
+  Scenario: Revoke tokens older than the trust lifetime when device tokens are trusted
+    Given device tokens are trusted
+    And user is logged in
+    And device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a04' exists for logged user
+    And user generated a token older than the trust lifetime for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a04'
+    When user tries to revoke the tokens of device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a04'
+    Then device tokens are revoked successfully
+    When device tries to update its state as turned_on for device with id '6f1d1c1e-7a0b-4c55-9a55-3e2b1d8c4a04'
+    Then device request is unauthorized
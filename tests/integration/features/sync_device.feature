@@ -0,0 +1,15 @@
+Feature: Sync device
+
+  Scenario: Sync the state and the measures of a device and get its actions
+    Given user is logged in
+    And device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13' exists for logged user
+    And device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13' has scheduling tasks
+    When user pushes the instant action TURN_DEVICE_OFF for device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13'
+    And device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13' syncs its state as turned_on and 3 measures
+    Then device sync returns the instant action TURN_DEVICE_OFF and the next scheduling action of device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13'
+    And device with id '7d2c9e41-3b5a-4f6e-8a1d-2c4b6e8f0a13' is turned on and has 3 measures
+
+  Scenario: Sync a device that is not of the user
+    Given user is logged in
+    When device with id 'c1e5a7b9-2d4f-4a6c-9e8b-0f1a3c5e7d92' syncs its state as turned_on and 3 measures
+    Then device sync fails
@@ -0,0 +1,21 @@
+Feature: Wait for instant actions
+
+  Scenario: Wake up a waiting device when an instant action is pushed
+    Given user is logged in
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f01' exists for logged user
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f01' is waiting up to 20 seconds for an instant action
+    When user pushes the instant action TURN_DEVICE_ON for device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f01'
+    Then waiting device receives the instant action TURN_DEVICE_ON before 5 seconds
+
+  Scenario: Wake up a waiting device when another worker stores an instant action
+    Given user is logged in
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f02' exists for logged user
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f02' is waiting up to 20 seconds for an instant action
+    When another worker stores the instant action TURN_DEVICE_OFF for device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f02'
+    Then waiting device receives the instant action TURN_DEVICE_OFF before 5 seconds
+
+  Scenario: Return no action when nothing is pushed before the timeout
+    Given user is logged in
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f03' exists for logged user
+    And device with id '0b6a4f3e-1c7d-4e2a-8f5b-9d3c2a1e7f03' is waiting up to 1 seconds for an instant action
+    Then waiting device receives no instant action
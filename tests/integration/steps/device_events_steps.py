@@ -0,0 +1,85 @@
+import asyncio
+import queue
+import threading
+
+from pytest_bdd import given, then, when, parsers
+
+from src.app.container import Container
+from src.app.controllers.device_events_controller import DeviceEventsController
+from src.app.utils.http.request import Request
+from src.common import dates
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from tests.integration.utils import shared_variables
+from tests.model_stubs.scheduling.tasks.daily_task_stub import DailyTaskStub
+
+
+class ConnectedDevice:
+    def __init__(self, device_id: str) -> None:
+        self.device_id = device_id
+        self.events = queue.Queue()
+        self._closed = None
+        self._loop = None
+        self._controller = DeviceEventsController(request=Request(None, None, {}, {}), token=shared_variables.token)
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._stream()), daemon=True)
+
+    def connect(self) -> None:
+        # Listening before connecting, as every stream is woken up (and sends its events again) when it starts
+        listener = Container.get_instance().notifications_listener
+        listener.start()
+        assert listener.wait_until_listening(5)
+        self._thread.start()
+        # The events sent when connecting are skipped, so only the later ones are checked
+        assert [self.next_event()[0], self.next_event()[0]] == ['state', 'next_action']
+
+    def next_event(self, timeout: float = 5) -> tuple:
+        return self.events.get(timeout=timeout)
+
+    def disconnect(self) -> None:
+        self._loop.call_soon_threadsafe(self._closed.set)
+        self._thread.join(5)
+
+    async def _stream(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._closed = asyncio.Event()
+        response = await self._controller.stream_events(self.device_id)
+        receiving = asyncio.ensure_future(self._receive(response.events))
+        await self._closed.wait()
+        receiving.cancel()
+        await asyncio.gather(receiving, return_exceptions=True)
+        await response.events.aclose()
+
+    async def _receive(self, events) -> None:
+        async for event in events:
+            if event.name is not None:
+                self.events.put((event.name, event.data))
+
+
+@given(parsers.cfparse('device with id \'{device_id}\' is connected to its events stream'))
+def device_connected_to_events_stream(device_id: str):
+    shared_variables.connected_device = ConnectedDevice(device_id)
+    shared_variables.connected_device.connect()
+
+
+@when(parsers.cfparse('another worker updates the state of device with id \'{device_id}\' as turned_on'))
+def update_device_state_from_another_worker(device_id: str):
+    DevicePGRepository().update_state(device_id, shared_variables.user_id, True, dates.now())
+
+
+@when(parsers.cfparse('another worker sets a daily task for device with id \'{device_id}\''))
+def set_daily_task_from_another_worker(device_id: str):
+    DeviceSchedulerPGRepository().set_scheduling_tasks(device_id, [DailyTaskStub()])
+
+
+@then(parsers.cfparse('connected device receives a {event_name} event'))
+def connected_device_receives_event(event_name: str):
+    connected_device = shared_variables.connected_device
+    try:
+        name, data = connected_device.next_event()
+    finally:
+        connected_device.disconnect()
+    assert name == event_name
+    if event_name == 'state':
+        assert data == {'turned_on': True}
+    else:
+        assert data['action'] in ('TURN_DEVICE_ON', 'TURN_DEVICE_OFF')
@@ -1,20 +1,30 @@
 import random
+from datetime import timedelta
 from typing import List
 
+import pytest
 from pytest_bdd import given, then, when, parsers
 
+from src import config
 from src.app.controllers.scheduler_controller import SchedulerController
 from src.app.utils.http.request import Request
+from src.common import dates
 from src.domain.models.scheduling.scheduling_stack import SchedulingStack
 from src.domain.models.scheduling.tasks.task import Task
+from src.domain.models.scheduling.tasks.task_action import TaskAction
 from src.domain.serializers.scheduling.scheduler_action_serializer import SchedulerActionSerializer
 from src.domain.serializers.scheduling.tasks.task_serializer import TaskSerializer
+from src.domain.services.device_scheduler.scheduled_actions_dispatcher import ScheduledActionsDispatcher
+from src.infrastructure.database.advisory_lock import AdvisoryLock
 from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
+from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
 from tests.integration.utils import shared_variables
 from tests.model_stubs.scheduling.tasks.daily_task_stub import DailyTaskStub
 from tests.model_stubs.scheduling.tasks.task_stub import TaskStub
 
 last_device_scheduling_tasks: List[Task] = []
+dispatcher_lock = AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY, shared=True)
 
 
 @given(parsers.cfparse('device with id \'{device_id}\' has scheduling tasks'))
@@ -29,6 +39,53 @@ def device_has_scheduling_tasks(device_id: str):
     last_device_scheduling_tasks = tasks
 
 
+@given(parsers.cfparse('stored next scheduling action of device with id \'{device_id}\' passed'))
+def stored_next_scheduling_action_passed(device_id: str):
+    DeviceSchedulerPGRepository()._execute_query(
+        f"UPDATE DeviceTasks SET next_action_at = next_action_at - INTERVAL '30 days' WHERE device_id = '{device_id}'")
+
+
+@given(parsers.cfparse('device with id \'{device_id}\' has a task turning it on in a second'))
+def device_has_task_turning_it_on_in_a_second(device_id: str):
+    DeviceSchedulerPGRepository().set_scheduling_tasks(device_id, [
+        TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.now() + timedelta(seconds=1))])
+
+
+@when('due scheduled actions are dispatched in two seconds')
+def dispatch_due_scheduled_actions_in_two_seconds():
+    dispatcher = ScheduledActionsDispatcher(DeviceSchedulerPGRepository(), InstantActionPGRepository(),
+                                            transaction=PostgresRepository.shared_transaction)
+    assert dispatcher.dispatch_due_actions(dates.now() + timedelta(seconds=2)) == 1
+
+
+@when('due scheduled actions fail to be pushed in two seconds')
+def dispatch_due_scheduled_actions_failing_to_push_them():
+    instant_action_repository = InstantActionPGRepository()
+
+    def push_all(actions):
+        raise ConnectionError('Connection lost')
+
+    instant_action_repository.push_all = push_all
+    dispatcher = ScheduledActionsDispatcher(DeviceSchedulerPGRepository(), instant_action_repository,
+                                            transaction=PostgresRepository.shared_transaction)
+    with pytest.raises(ConnectionError):
+        dispatcher.dispatch_due_actions(dates.now() + timedelta(seconds=2))
+
+
+@when('passed next scheduling actions are advanced')
+def advance_passed_next_scheduling_actions():
+    assert len(DeviceSchedulerPGRepository().advance_next_scheduling_actions(dates.now(), 1000)) == 1
+
+
+@when('a scheduled actions dispatcher is running')
+def scheduled_actions_dispatcher_is_running():
+    assert dispatcher_lock.acquire(wait=False)
+    # Several dispatchers can run at once
+    other_dispatcher_lock = AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY, shared=True)
+    assert other_dispatcher_lock.acquire(wait=False)
+    other_dispatcher_lock.release()
+
+
 @when(parsers.cfparse('user tries to set some valid scheduling task to the device with id \'{device_id}\''))
 def try_set_valid_scheduling_tasks(device_id: str):
     tasks = []
@@ -53,6 +110,14 @@ def try_get_nex_scheduling_tasks(device_id: str):
     shared_variables.last_response = controller.get_next_scheduling_action(device_id)
 
 
+@when(parsers.cfparse('user tries to get next scheduling tasks for devices with ids \'{device_id}\' and '
+                      '\'{other_device_id}\''))
+def try_get_next_scheduling_tasks_of_many_devices(device_id: str, other_device_id: str):
+    controller = SchedulerController(request=Request.from_body([device_id, other_device_id]),
+                                     token=shared_variables.token)
+    shared_variables.last_response = controller.get_next_scheduling_actions()
+
+
 @then('device has those scheduling tasks configured successfully')
 def scheduling_tasks_set_successfully():
     assert shared_variables.last_response.status_code == 200
@@ -69,3 +134,59 @@ def next_scheduling_task_returned_successfully():
     expected = SchedulerActionSerializer.serialize(SchedulingStack(last_device_scheduling_tasks).get_next_action())
     assert shared_variables.last_response.status_code == 200
     assert shared_variables.last_response.body == expected
+
+
+@then(parsers.cfparse('next scheduling tasks of devices with ids \'{device_id}\' and \'{other_device_id}\' are '
+                      'returned successfully'))
+def next_scheduling_tasks_of_many_devices_returned_successfully(device_id: str, other_device_id: str):
+    expected = SchedulerActionSerializer.serialize(SchedulingStack(last_device_scheduling_tasks).get_next_action())
+    assert shared_variables.last_response.status_code == 200
+    # The other device has no tasks
+    assert shared_variables.last_response.body == {device_id: expected, other_device_id: {}}
+
+
+@then('next scheduling tasks of many devices are not returned')
+def next_scheduling_tasks_of_many_devices_not_returned():
+    assert shared_variables.last_response.status_code == 400
+
+
+@then(parsers.cfparse('stored next scheduling action of device with id \'{device_id}\' is the next one'))
+def stored_next_scheduling_action_is_the_next_one(device_id: str):
+    expected = SchedulingStack(last_device_scheduling_tasks).get_next_action()
+    is_valid, actual = DeviceSchedulerPGRepository().get_next_scheduling_action(device_id, dates.now())
+    assert is_valid
+    assert SchedulerActionSerializer.serialize(actual) == SchedulerActionSerializer.serialize(expected)
+
+
+@then(parsers.cfparse('device with id \'{device_id}\' has a pending instant action turning it on'))
+def device_has_pending_instant_action_turning_it_on(device_id: str):
+    pull_until = dates.now() - timedelta(seconds=config.INSTANT_ACTIONS_LIFETIME)
+    assert InstantActionPGRepository().pull(device_id, pull_until) == TaskAction.TURN_DEVICE_ON
+    # Its only task passed
+    assert DeviceSchedulerPGRepository().get_next_scheduling_action(device_id, dates.now()) == (True, None)
+
+
+@then(parsers.cfparse('stored next scheduling action of device with id \'{device_id}\' is still due'))
+def stored_next_scheduling_action_is_still_due(device_id: str):
+    # It was not advanced, so it is not valid once it passes
+    assert DeviceSchedulerPGRepository().get_next_scheduling_action(device_id, dates.now() + timedelta(seconds=2)) \
+        == (False, None)
+    pull_until = dates.now() - timedelta(seconds=config.INSTANT_ACTIONS_LIFETIME)
+    assert InstantActionPGRepository().pull(device_id, pull_until) is None
+
+
+@then('next actions can not be advanced without pushing them')
+def next_actions_can_not_be_advanced_without_pushing_them():
+    try:
+        assert not AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY).acquire(wait=False)
+    except Exception:
+        dispatcher_lock.release()
+        raise
+
+
+@then('next actions can be advanced without pushing them once the dispatcher stops')
+def next_actions_can_be_advanced_without_pushing_them_once_dispatcher_stops():
+    dispatcher_lock.release()
+    advance_lock = AdvisoryLock(config.SCHEDULED_ACTIONS_DISPATCH_LOCK_KEY)
+    assert advance_lock.acquire(wait=False)
+    advance_lock.release()
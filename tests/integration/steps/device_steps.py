@@ -3,12 +3,15 @@ from datetime import timedelta
 
 from pytest_bdd import given, then, when, parsers
 
+from src import config
 from src.app.controllers.devices_controller import DevicesController
 from src.app.utils.http.request import Request
 from src.common import dates
 from src.domain.models.device import Device
 from src.domain.serializers.measure_serializer import MeasureSerializer
+from src.domain.serializers.scheduling.scheduler_action_serializer import SchedulerActionSerializer
 from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.device_scheduler_pg_repository import DeviceSchedulerPGRepository
 from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
 from tests.integration.utils import shared_variables
 from tests.model_stubs.measure_stub import MeasureStub
@@ -92,6 +95,22 @@ def try_get_measures_for_all_devices():
     shared_variables.last_response = controller.get_measures_for_all_devices(minutes_interval)
 
 
+@when(parsers.cfparse('user tries to get measures summarized by the database for device with id \'{device_id}\''))
+def try_get_measures_summarized_by_the_database_for_device(device_id: str):
+    controller = DevicesController(request=Request(None, None, {}, {'summarize_in_db': 'true'}),
+                                   token=shared_variables.token)
+    minutes_interval = 10
+    shared_variables.last_response = controller.get_measures(device_id, minutes_interval)
+
+
+@when(parsers.cfparse('user tries to get measures summarized by the database for all devices'))
+def try_get_measures_summarized_by_the_database_for_all_devices():
+    controller = DevicesController(request=Request(None, None, {}, {'summarize_in_db': 'true'}),
+                                   token=shared_variables.token)
+    minutes_interval = 10
+    shared_variables.last_response = controller.get_measures_for_all_devices(minutes_interval)
+
+
 @when(parsers.cfparse('user tries to add measures for device with id \'{device_id}\''))
 def try_add_valid_measures(device_id: str):
     controller = DevicesController(
@@ -101,6 +120,14 @@ def try_add_valid_measures(device_id: str):
     shared_variables.last_response = controller.add_measures(device_id)
 
 
+@when(parsers.cfparse('user tries to add {measures_count:d} measures for device with id \'{device_id}\''))
+def try_add_measures_backlog(measures_count: int, device_id: str):
+    controller = DevicesController(
+        request=Request.from_body(MeasureSerializer.serialize_all([MeasureStub() for x in range(measures_count)])),
+        token=shared_variables.token)
+    shared_variables.last_response = controller.add_measures(device_id)
+
+
 @when(parsers.cfparse('user tries to update the device state as turned_on for device with id \'{device_id}\''))
 def try_update_device_state_to_turned_on(device_id: str):
     controller = DevicesController(
@@ -116,6 +143,18 @@ def try_get_device_state(device_id: str):
     shared_variables.last_response = controller.get_state(device_id)
 
 
+@when(parsers.cfparse('device with id \'{device_id}\' syncs its state as turned_on and {measures_count:d} measures'))
+def sync_device(device_id: str, measures_count: int):
+    controller = DevicesController(
+        request=Request.from_body({
+            'turned_on': True,
+            'measures': MeasureSerializer.serialize_all([MeasureStub() for x in range(measures_count)])
+        }),
+        token=shared_variables.token
+    )
+    shared_variables.last_response = controller.sync(device_id)
+
+
 @then('device is created successfully')
 def device_created_successfully():
     assert shared_variables.last_response.status_code == 201
@@ -131,6 +170,26 @@ def measures_added_successfully():
     assert shared_variables.last_response.status_code == 201
 
 
+@then(parsers.cfparse('the rollups of device with id \'{device_id}\' include all its measures'))
+def rollups_include_all_device_measures(device_id: str):
+    measure_repository = MeasurePGRepository()
+    measures_count = measure_repository._execute_query(
+        f"SELECT COUNT(*) AS samples FROM Measures WHERE device_id = '{device_id}'").first()['samples']
+    result = measure_repository._execute_query(
+        f"SELECT resolution, SUM(samples) AS samples FROM MeasureRollups WHERE device_id = '{device_id}' "
+        f"GROUP BY resolution")
+    assert {x['resolution']: x['samples'] for x in result.records} == {
+        x: measures_count for x in config.MEASURES_ROLLUP_RESOLUTIONS
+    }
+
+
+@when(parsers.cfparse('user tries to get measures from last {minutes_interval:d} minutes for device with id '
+                      '\'{device_id}\''))
+def try_get_measures_from_last_minutes_for_device(minutes_interval: int, device_id: str):
+    controller = DevicesController(request=None, token=shared_variables.token)
+    shared_variables.last_response = controller.get_measures(device_id, minutes_interval)
+
+
 @then('measure addition fails')
 def measure_addition_fails():
     assert shared_variables.last_response.status_code == 400
@@ -147,6 +206,13 @@ def summarized_measures_returned_successfully():
         assert 'timestamp' in measure
 
 
+@then('summarized measures are sorted by timestamp without exceeding the maximum to show')
+def summarized_measures_are_sorted_without_exceeding_the_maximum():
+    timestamps = [measure['timestamp'] for measure in shared_variables.last_response.body]
+    assert len(timestamps) <= config.MAX_SUMMARIZED_MEASURES_TO_SHOW
+    assert timestamps == sorted(timestamps)
+
+
 @then('device state is updated successfully')
 def device_state_updated_successfully():
     assert shared_variables.last_response.status_code == 200
@@ -156,3 +222,25 @@ def device_state_updated_successfully():
 def device_state_is_turned_on():
     assert shared_variables.last_response.status_code == 200
     assert shared_variables.last_response.body == {'turned_on': True}
+
+
+@then(parsers.cfparse('device sync returns the instant action {action} and the next scheduling action of device '
+                      'with id \'{device_id}\''))
+def device_sync_returns_the_actions(action: str, device_id: str):
+    _, next_action = DeviceSchedulerPGRepository().get_next_scheduling_action(device_id, dates.now())
+    assert shared_variables.last_response.status_code == 200
+    assert shared_variables.last_response.body == {
+        'instant_action': action,
+        'next_action': SchedulerActionSerializer.serialize(next_action)
+    }
+
+
+@then(parsers.cfparse('device with id \'{device_id}\' is turned on and has {measures_count:d} measures'))
+def device_is_turned_on_and_has_measures(device_id: str, measures_count: int):
+    assert DevicePGRepository().get_state(device_id, shared_variables.user_id)
+    assert len(MeasurePGRepository().get_from_last_minutes(device_id, 10)) == measures_count
+
+
+@then('device sync fails')
+def device_sync_fails():
+    assert shared_variables.last_response.status_code == 400
@@ -1,8 +1,14 @@
-from pytest_bdd import then, when, parsers
+from datetime import timedelta
 
+from pytest_bdd import given, then, when, parsers
+
+from src import config
 from src.app.controllers.auth_controller import AuthController
+from src.app.controllers.devices_controller import DevicesController
 from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.http.request import Request
+from src.common import dates
+from src.domain.services.auth.device_token_revocation_list import DeviceTokenRevocationList
 from tests.integration.utils import shared_variables
 
 
@@ -12,9 +18,61 @@ def try_generate_device_token(device_id: str):
     shared_variables.last_response = controller.generate_device_token(device_id)
 
 
+@given(parsers.cfparse('user generated a token for device with id \'{device_id}\''))
+def generate_device_token(device_id: str):
+    try_generate_device_token(device_id)
+    shared_variables.device_token = DeviceToken.from_encoded(shared_variables.last_response.body['token'])
+
+
+@given('device tokens are trusted')
+def device_tokens_are_trusted(monkeypatch):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    # Reloaded with only the revocations of the trusted tokens
+    DeviceTokenRevocationList.clear()
+
+
+@given(parsers.cfparse('user generated a token older than the trust lifetime for device with id \'{device_id}\''))
+def generate_device_token_older_than_trust_lifetime(device_id: str):
+    generate_device_token(device_id)
+    token = shared_variables.device_token
+    shared_variables.device_token = DeviceToken(
+        device_id=token.device_id, user_id=token.user_id,
+        timestamp=dates.now() - timedelta(seconds=config.DEVICE_TOKENS_TRUST_LIFETIME + 1))
+
+
+@given(parsers.cfparse('user revoked the tokens of device with id \'{device_id}\''))
+@when(parsers.cfparse('user tries to revoke the tokens of device with id \'{device_id}\''))
+def try_revoke_device_tokens(device_id: str):
+    controller = AuthController(request=Request(None, None, {}, {}), token=shared_variables.token)
+    shared_variables.last_response = controller.revoke_device_tokens(device_id)
+
+
+@when(parsers.cfparse('device tries to update its state as turned_on for device with id \'{device_id}\''))
+def try_update_device_state_with_device_token(device_id: str):
+    controller = DevicesController(request=Request.from_body({'turned_on': True}),
+                                   token=shared_variables.device_token)
+    shared_variables.last_response = controller.update_state(device_id)
+
+
 @then('device token is returned successfully')
 def device_token_returned_successfully():
     token = shared_variables.last_response.body['token']
     assert shared_variables.last_response.status_code == 200
     assert len(token) > 0
     assert DeviceToken.is_encoded_form(token)
+
+
+@then('device tokens are revoked successfully')
+def device_tokens_revoked_successfully():
+    assert shared_variables.last_response.status_code == 200
+
+
+@then('device tokens are not revoked')
+def device_tokens_not_revoked():
+    assert shared_variables.last_response.status_code == 400
+    assert shared_variables.last_response.body['message'] == 'Invalid device'
+
+
+@then('device request is unauthorized')
+def device_request_unauthorized():
+    assert shared_variables.last_response.status_code == 401
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from pytest_bdd import given, then, when, parsers
+
+from src.app.container import Container
+from src.app.controllers.instant_actions_controller import InstantActionsController
+from src.app.utils.http.request import Request
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.infrastructure.repositories.instant_action_pg_repository import InstantActionPGRepository
+from tests.integration.utils import shared_variables
+
+
+class WaitingDevice:
+    def __init__(self, device_id: str, timeout: int) -> None:
+        self.device_id = device_id
+        self.response = None
+        self.elapsed = None
+        self._controller = InstantActionsController(request=Request(None, None, {}, {'timeout': str(timeout)}),
+                                                    token=shared_variables.token)
+        self._thread = threading.Thread(target=self._wait, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        # Actions are pushed once the device is waiting for them, so they are not obtained by the first pull
+        container = Container.get_instance()
+        assert container.notifications_listener.wait_until_listening(5)
+        while container.instant_actions_notifier.subscriptions_count(self.device_id) == 0:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+    def join(self, timeout: float) -> None:
+        self._thread.join(timeout)
+
+    def _wait(self) -> None:
+        started_at = time.monotonic()
+        self.response = asyncio.run(self._controller.wait_instant_action(self.device_id))
+        self.elapsed = time.monotonic() - started_at
+
+
+@given(parsers.cfparse('device with id \'{device_id}\' is waiting up to {timeout:d} seconds for an instant action'))
+def device_waiting_for_instant_action(device_id: str, timeout: int):
+    shared_variables.waiting_device = WaitingDevice(device_id, timeout)
+    shared_variables.waiting_device.start()
+
+
+@when(parsers.cfparse('user pushes the instant action {action} for device with id \'{device_id}\''))
+def push_instant_action(action: str, device_id: str):
+    controller = InstantActionsController(request=Request.from_body({'action': action}),
+                                          token=shared_variables.token)
+    shared_variables.last_response = controller.push_instant_action(device_id)
+
+
+@when(parsers.cfparse('another worker stores the instant action {action} for device with id \'{device_id}\''))
+def store_instant_action_from_another_worker(action: str, device_id: str):
+    # Only the database notification can wake the device up, as the notifier of this process is not used
+    InstantActionPGRepository().push(device_id, TaskAction(action))
+
+
+@then(parsers.cfparse('waiting device receives the instant action {action} before {seconds:d} seconds'))
+def waiting_device_receives_instant_action(action: str, seconds: int):
+    waiting_device = shared_variables.waiting_device
+    waiting_device.join(seconds)
+    assert waiting_device.response is not None
+    assert waiting_device.response.status_code == 200
+    assert waiting_device.response.body == {'action': action}
+    assert waiting_device.elapsed < seconds
+
+
+@then('waiting device receives no instant action')
+def waiting_device_receives_no_instant_action():
+    waiting_device = shared_variables.waiting_device
+    waiting_device.join(10)
+    assert waiting_device.response.status_code == 200
+    assert waiting_device.response.body == {'action': None}
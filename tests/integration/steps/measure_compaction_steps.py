@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from pytest_bdd import given, then, when, parsers
+
+from src import config
+from src.common import dates
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.measure_compactor import MeasureCompactor
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
+from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
+from tests.integration.utils import shared_variables
+from tests.model_stubs.measure_stub import MeasureStub
+
+MEASURES_PER_DAY = 4
+
+
+@given(parsers.cfparse('device with id \'{device_id}\' has measures from the last {days:d} days'))
+def device_has_measures_from_last_days(device_id: str, days: int):
+    now = dates.now()
+    step = timedelta(days=1) / MEASURES_PER_DAY
+    MeasurePGRepository().create_multiple(
+        [MeasureStub(timestamp=now - step * x) for x in range(days * MEASURES_PER_DAY)], device_id)
+
+
+@given('the upcoming measures partitions do not exist')
+def upcoming_measures_partitions_do_not_exist():
+    partition_manager = MeasurePartitionManager()
+    now = dates.to_naive_utc(dates.now())
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            for partition_name, start, _ in partition_manager.get_partitions(cursor):
+                if start > now:
+                    partition_manager.drop_partition(cursor, partition_name)
+            conn.commit()
+        finally:
+            cursor.close()
+
+
+@when(parsers.cfparse('the measures compaction runs keeping measures for {retention_days:d} days and rollups for '
+                      '{rollups_retention_days:d} days in chunks of {chunk_size:d} rows'))
+def run_measures_compaction(retention_days: int, rollups_retention_days: int, chunk_size: int):
+    compactor = MeasureCompactor(retention_days=retention_days, rollups_retention_days=rollups_retention_days,
+                                 chunk_size=chunk_size)
+    shared_variables.last_compaction_report = compactor.run()
+
+
+@then(parsers.cfparse('device with id \'{device_id}\' has no measures older than {days:d} days'))
+def device_has_no_measures_older_than(device_id: str, days: int):
+    result = MeasurePGRepository()._execute_query(
+        f"SELECT COUNT(*) AS expired FROM Measures WHERE device_id = '{device_id}' "
+        f"AND timestamp < now()::TIMESTAMP - INTERVAL '{days} days'")
+    assert result.first()['expired'] == 0
+
+
+@then(parsers.cfparse('device with id \'{device_id}\' has rollups older than {days:d} days but not older than '
+                      '{rollups_days:d} days'))
+def device_has_rollups_between(device_id: str, days: int, rollups_days: int):
+    result = MeasurePGRepository()._execute_query(
+        f"SELECT COUNT(*) FILTER (WHERE bucket_start < now()::TIMESTAMP - INTERVAL '{days} days') AS kept, "
+        f"COUNT(*) FILTER (WHERE bucket_start < now()::TIMESTAMP - INTERVAL '{rollups_days} days') AS expired "
+        f"FROM MeasureRollups WHERE device_id = '{device_id}'")
+    assert result.first()['kept'] > 0
+    assert result.first()['expired'] == 0
+
+
+@then('the measures compaction reports the removed rows')
+def measures_compaction_reports_removed_rows():
+    report = shared_variables.last_compaction_report
+    assert report.deleted_measures > 0
+    assert report.deleted_rollups > 0
+    assert report.elapsed_seconds > 0
+
+
+@then('the measures compaction reports dropped partitions')
+def measures_compaction_reports_dropped_partitions():
+    assert shared_variables.last_compaction_report.dropped_partitions
+
+
+@then('the measures partitions exist until the ones created in advance')
+def measures_partitions_exist_until_created_in_advance():
+    partition_manager = MeasurePartitionManager()
+    now = dates.to_naive_utc(dates.now())
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            partitions = partition_manager.get_partitions(cursor)
+            conn.commit()
+        finally:
+            cursor.close()
+    partition_start = partition_manager.get_partition_start(now)
+    while partition_start < partition_manager.get_partitions_end(now):
+        assert any(x[1] <= partition_start < x[2] for x in partitions)
+        partition_start += timedelta(days=config.MEASURES_PARTITION_DAYS)
+    assert shared_variables.last_compaction_report.created_partitions
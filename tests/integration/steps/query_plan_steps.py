@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from pytest_bdd import given, then, when, parsers
+
+from src.common import dates
+from src.domain.models.device import Device
+from src.infrastructure.database.connection_pool import ConnectionPool
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
+from src.infrastructure.database.prepared_statement import PreparedStatement
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+from src.infrastructure.repositories.measure_pg_repository import MeasurePGRepository
+from tests.integration.utils import shared_variables
+from tests.model_stubs.measure_stub import MeasureStub
+
+QUERY_PLAN_DEVICE_ID_PREFIX = '00000000-0000-4000-8000-'
+SEEDED_DAYS = 30
+
+_GET_MEASURES_BETWEEN_DAYS = PreparedStatement(
+    'query_plan_measures_between_days',
+    'SELECT COUNT(*) FROM Measures WHERE timestamp >= (now()::TIMESTAMP - $1::INT * INTERVAL \'1 day\') '
+    'AND timestamp < (now()::TIMESTAMP - $2::INT * INTERVAL \'1 day\')'
+)
+
+
+def explain(statement: PreparedStatement, params: tuple, enable_seqscan: bool = True,
+            enable_index_scans: bool = True) -> dict:
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Only the index usability checks change the planner settings, the other plans are the ones really used
+            if not enable_seqscan:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            if not enable_index_scans:
+                # Leaves bitmap scans, the only ones BRIN indexes support
+                cursor.execute('SET LOCAL enable_indexscan = off')
+                cursor.execute('SET LOCAL enable_indexonlyscan = off')
+            cursor.execute(f'PREPARE query_plan AS {statement.query}')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) EXECUTE query_plan ({", ".join(["%s"] * len(params))})', params)
+            plan = cursor.fetchone()[0][0]['Plan']
+            cursor.execute('DEALLOCATE query_plan')
+        finally:
+            conn.rollback()
+            cursor.close()
+    return plan
+
+
+def with_partitions(relation_name: str) -> set:
+    # Partitions of a table, and the indexes of the partitions of a partitioned index, are its children
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT C.relname FROM pg_inherits I JOIN pg_class C ON C.oid = I.inhrelid '
+                           'WHERE I.inhparent = %s::regclass', (relation_name.lower(),))
+            children = {x[0] for x in cursor.fetchall()}
+        finally:
+            conn.rollback()
+            cursor.close()
+    return {relation_name.lower()} | children
+
+
+def plan_nodes(plan: dict) -> list:
+    nodes = [plan]
+    for sub_plan in plan.get('Plans', []):
+        nodes.extend(plan_nodes(sub_plan))
+    return nodes
+
+
+@given(parsers.cfparse('{devices_count:d} devices with {measures_count:d} measures each exist for logged user'))
+def devices_with_measures_exist_for_logged_user(devices_count: int, measures_count: int):
+    device_repository = DevicePGRepository()
+    measure_repository = MeasurePGRepository()
+    device_ids = [f'{QUERY_PLAN_DEVICE_ID_PREFIX}{x:012d}' for x in range(devices_count)]
+    if device_repository.exists_for_user(device_ids[0], shared_variables.user_id):
+        # Other scenarios add measures too, so the statistics are refreshed before every plan
+        analyze_measures()
+        return
+    for device_id in device_ids:
+        device_repository.create(Device(name=device_id, device_id=device_id), shared_variables.user_id)
+    # Measures are inserted day by day for all the devices, as they would arrive, so the table is sorted by time
+    measures_per_day = measures_count // SEEDED_DAYS
+    step = timedelta(days=1) / measures_per_day
+    now = dates.now()
+    for day in range(SEEDED_DAYS, 0, -1):
+        day_start = now - timedelta(days=day)
+        for device_id in device_ids:
+            measure_repository.create_multiple(
+                [MeasureStub(timestamp=day_start + step * x) for x in range(measures_per_day)], device_id)
+    analyze_measures()
+
+
+def analyze_measures():
+    measure_repository = MeasurePGRepository()
+    measure_repository._execute_query('ANALYZE Measures')
+    measure_repository._execute_query('ANALYZE Devices')
+
+
+@given(parsers.cfparse('measures partitions cover the last {days:d} days'))
+def measures_partitions_cover_last_days(days: int):
+    now = dates.to_naive_utc(dates.now())
+    with ConnectionPool.get_instance().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            MeasurePartitionManager().create_partitions(cursor, now - timedelta(days=days), now)
+            conn.commit()
+        finally:
+            cursor.close()
+
+
+@when(parsers.cfparse('the query plan to get measures from last {minutes:d} minutes of device \'{device_id}\' '
+                      'is explained'))
+def explain_get_measures_from_last_minutes(minutes: int, device_id: str):
+    shared_variables.last_query_plan = explain(MeasurePGRepository._GET_FROM_LAST_MINUTES, (device_id, minutes))
+
+
+@when(parsers.cfparse('the query plan to get measures from last {minutes:d} minutes of all logged user devices '
+                      'is explained'))
+def explain_get_all_for_user_from_last_minutes(minutes: int):
+    shared_variables.last_query_plan = explain(MeasurePGRepository._GET_ALL_FOR_USER_FROM_LAST_MINUTES,
+                                               (shared_variables.user_id, minutes))
+
+
+@when(parsers.cfparse('the query plan to get measures from last {minutes:d} minutes of all logged user devices '
+                      'is explained for the index usability check without sequential scans'))
+def explain_get_all_for_user_from_last_minutes_without_seqscans(minutes: int):
+    shared_variables.last_query_plan = explain(MeasurePGRepository._GET_ALL_FOR_USER_FROM_LAST_MINUTES,
+                                               (shared_variables.user_id, minutes), enable_seqscan=False)
+
+
+@when(parsers.cfparse('the query plan to get measures between {from_days:d} and {to_days:d} days ago is explained '
+                      'for the index usability check with bitmap scans only'))
+def explain_get_measures_between_days_with_bitmap_scans_only(from_days: int, to_days: int):
+    # With the default costs, the primary key may be as cheap as the BRIN index, depending on the data and statistics
+    shared_variables.last_query_plan = explain(_GET_MEASURES_BETWEEN_DAYS, (from_days, to_days),
+                                               enable_seqscan=False, enable_index_scans=False)
+
+
+@then(parsers.cfparse('the query plan uses the index \'{index_name}\''))
+def query_plan_uses_index(index_name: str):
+    indexes = with_partitions(index_name)
+    assert [node for node in plan_nodes(shared_variables.last_query_plan) if node.get('Index Name') in indexes]
+
+
+@then('the query plan does not sequentially scan the current partition of measures')
+def query_plan_does_not_sequentially_scan_current_measures_partition():
+    # Partitions created ahead are empty, so scanning them sequentially costs nothing
+    partition_manager = MeasurePartitionManager()
+    partition_name = partition_manager.get_partition_name(partition_manager.get_partition_start(dates.now()))
+    assert not [
+        node for node in plan_nodes(shared_variables.last_query_plan)
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == partition_name
+    ]
+
+
+@then(parsers.cfparse('the query plan does not scan the partition of measures from {days:d} days ago'))
+def query_plan_does_not_scan_measures_partition(days: int):
+    partition_manager = MeasurePartitionManager()
+    partition_name = partition_manager.get_partition_name(
+        partition_manager.get_partition_start(dates.now() - timedelta(days=days)))
+    assert partition_name not in [node.get('Relation Name') for node in plan_nodes(shared_variables.last_query_plan)]
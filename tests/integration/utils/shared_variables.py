@@ -6,3 +6,8 @@ from src.app.utils.http.response import Response
 last_response: Optional[Response] = None
 token: Optional[UserToken] = None
 user_id: Optional[str] = None
+last_query_plan: Optional[dict] = None
+last_compaction_report: Optional[object] = None
+device_token: Optional[object] = None
+waiting_device: Optional[object] = None
+connected_device: Optional[object] = None
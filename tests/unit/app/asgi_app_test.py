@@ -0,0 +1,271 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from flask import Flask
+from flask_cors import CORS
+from werkzeug.datastructures import Headers
+
+from src.app.asgi_app import AsgiApp
+from src.app.controllers.base_controller import BaseController
+from src.app.routing.router import Router
+from src.app.utils.auth.permission_level import PermissionLevel
+from src.app.utils.http.asgi_request import AsgiRequest
+from src.app.utils.http.event_stream_response import EventStreamResponse, ServerSentEvent
+from src.app.utils.http.response import Response
+
+release_blocking_endpoint = threading.Event()
+closed_streams = []
+
+
+class AsgiMockedController(BaseController):
+
+    def __init__(self, request=None, token=None):
+        super().__init__(request, token)
+        self.request = request
+
+    def echo(self, param):
+        return Response.success({'param': param, 'body': self.request.body, 'query': self.request.query_params})
+
+    async def async_endpoint(self):
+        await asyncio.sleep(0)
+        return Response.success({'thread': threading.current_thread().name})
+
+    def blocking_endpoint(self):
+        release_blocking_endpoint.wait(5)
+        return Response.success({'thread': threading.current_thread().name})
+
+    async def async_blocking_endpoint(self):
+        return await self._run_blocking(self.blocking_endpoint)
+
+    async def events(self, count):
+        async def generate_events():
+            try:
+                index = 0
+                while count == 'endless' or index < int(count):
+                    yield ServerSentEvent('index', {'index': index})
+                    index += 1
+                    await asyncio.sleep(0.001)
+            finally:
+                closed_streams.append(count)
+
+        return EventStreamResponse(generate_events(), retry_delay=1)
+
+
+class AsgiMockedRouter(Router):
+
+    def _discover_controllers(self):
+        for method_name in ['echo', 'async_endpoint', 'blocking_endpoint', 'async_blocking_endpoint',
+                            'events']:
+            Router.register_http_method({
+                'type': 'POST' if method_name == 'echo' else 'GET', 'alias': None,
+                'class_name': 'AsgiMockedController', 'method_name': method_name,
+                'min_permission_level': PermissionLevel.PUBLIC
+            })
+        return [AsgiMockedController]
+
+
+@pytest.fixture
+def asgi_app():
+    release_blocking_endpoint.clear()
+    return AsgiApp(AsgiMockedRouter(), Flask(__name__), thread_pool_size=1, max_pending_calls=0)
+
+
+async def request(app: AsgiApp, method: str, path: str, body: bytes = b'', headers: list = (),
+                  query_string: bytes = b'') -> tuple:
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({'type': 'http', 'method': method, 'path': path, 'headers': list(headers),
+               'query_string': query_string}, receive, send)
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+def test_call_routes_the_request_to_the_blocking_controller_method(asgi_app):
+    status, body = asyncio.run(request(
+        asgi_app, 'POST', '/api/asgimocked/echo/value', body=b'{"a": 1}',
+        headers=[(b'content-type', b'application/json')], query_string=b'use_epochs=true&use_epochs=false'
+    ))
+    assert status == 200
+    assert body == {'param': 'value', 'body': {'a': 1}, 'query': {'use_epochs': 'true'}}
+
+
+def test_call_runs_async_controller_methods_on_the_event_loop(asgi_app):
+    async def run():
+        return await request(asgi_app, 'GET', '/api/asgimocked/async_endpoint'), threading.current_thread().name
+
+    (status, body), loop_thread = asyncio.run(run())
+    assert status == 200
+    assert body == {'thread': loop_thread}
+
+
+def test_call_runs_blocking_controller_methods_on_the_thread_pool(asgi_app):
+    release_blocking_endpoint.set()
+    status, body = asyncio.run(request(asgi_app, 'GET', '/api/asgimocked/blocking_endpoint'))
+    assert status == 200
+    assert body['thread'].startswith('asgi')
+
+
+def test_call_runs_the_blocking_calls_of_async_controller_methods_on_the_thread_pool(asgi_app):
+    release_blocking_endpoint.set()
+    status, body = asyncio.run(request(asgi_app, 'GET', '/api/asgimocked/async_blocking_endpoint'))
+    assert status == 200
+    assert body['thread'].startswith('asgi')
+
+
+def test_call_adds_the_cors_headers_of_the_flask_app_to_the_responses():
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    asgi_app = AsgiApp(AsgiMockedRouter(), flask_app, thread_pool_size=1, max_pending_calls=0)
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app({'type': 'http', 'method': 'GET', 'path': '/api/asgimocked/async_endpoint',
+                          'headers': [(b'origin', b'http://client.example.com')], 'query_string': b''},
+                         receive, send))
+
+    assert sent[0]['status'] == 200
+    assert (b'access-control-allow-origin', b'http://client.example.com') in sent[0]['headers']
+
+
+def test_call_returns_not_found_response_when_path_is_not_an_api_one(asgi_app):
+    status, body = asyncio.run(request(asgi_app, 'GET', '/index.html'))
+    assert status == 404
+
+
+def test_call_returns_busy_response_when_no_more_blocking_calls_can_wait(asgi_app):
+    async def run():
+        blocked_request = asyncio.ensure_future(request(asgi_app, 'GET', '/api/asgimocked/blocking_endpoint'))
+        while asgi_app.blocking_calls == 0:
+            await asyncio.sleep(0.001)
+        busy_response = await request(asgi_app, 'GET', '/api/asgimocked/blocking_endpoint')
+        release_blocking_endpoint.set()
+        return busy_response, await blocked_request
+
+    (busy_status, busy_body), (status, _) = asyncio.run(run())
+    assert busy_status == 503
+    assert busy_body == {'message': 'Server busy'}
+    assert status == 200
+
+
+def test_call_returns_busy_response_when_no_more_blocking_calls_of_async_methods_can_wait(asgi_app):
+    async def run():
+        blocked_request = asyncio.ensure_future(request(asgi_app, 'GET', '/api/asgimocked/blocking_endpoint'))
+        while asgi_app.blocking_calls == 0:
+            await asyncio.sleep(0.001)
+        busy_response = await request(asgi_app, 'GET', '/api/asgimocked/async_blocking_endpoint')
+        release_blocking_endpoint.set()
+        return busy_response, await blocked_request
+
+    (busy_status, busy_body), (status, _) = asyncio.run(run())
+    assert busy_status == 503
+    assert busy_body == {'message': 'Server busy'}
+    assert status == 200
+
+
+def test_call_runs_on_startup_when_the_lifespan_starts():
+    started = []
+    app = AsgiApp(AsgiMockedRouter(), Flask(__name__), on_startup=lambda: started.append(True))
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(app({'type': 'lifespan'}, receive, send))
+    assert started == [True]
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_router_route_runs_async_controller_methods_when_called_without_event_loop():
+    request = AsgiRequest('GET', '/api/asgimocked/async_endpoint', Headers(), b'', b'')
+    actual = AsgiMockedRouter().route(request, 'asgimocked/async_endpoint')
+    assert actual.status_code == 200
+
+
+async def stream(app: AsgiApp, path: str, disconnect_after: int = None) -> list:
+    sent = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if not sent:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+        if disconnect_after is not None and len(sent) >= disconnect_after:
+            disconnected.set()
+
+    await app({'type': 'http', 'method': 'GET', 'path': path, 'headers': [], 'query_string': b''}, receive, send)
+    return sent
+
+
+def test_call_sends_event_streams_until_they_end(asgi_app):
+    closed_streams.clear()
+    sent = asyncio.run(stream(asgi_app, '/api/asgimocked/events/2'))
+    assert sent[0]['status'] == 200
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in sent[0]['headers']
+    assert [message['body'] for message in sent[1:]] == [
+        b'retry: 1000\n\n',
+        b'event: index\ndata: {"index":0}\n\n',
+        b'event: index\ndata: {"index":1}\n\n',
+        b''
+    ]
+    assert closed_streams == ['2']
+    assert asgi_app.streams == 0
+
+
+def test_call_closes_event_streams_when_the_client_disconnects(asgi_app):
+    closed_streams.clear()
+    sent = asyncio.run(asyncio.wait_for(stream(asgi_app, '/api/asgimocked/events/endless', disconnect_after=5), 1))
+    assert len(sent) >= 5
+    assert closed_streams == ['endless']
+    assert asgi_app.streams == 0
+
+
+def test_call_closes_event_streams_when_the_client_does_not_receive_the_events():
+    closed_streams.clear()
+    app = AsgiApp(AsgiMockedRouter(), Flask(__name__), stream_send_timeout=0.01)
+    sent = []
+
+    async def receive():
+        if not sent:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.sleep(10)
+
+    async def send(message):
+        sent.append(message)
+        if len(sent) > 2:
+            await asyncio.sleep(10)
+
+    asyncio.run(asyncio.wait_for(
+        app({'type': 'http', 'method': 'GET', 'path': '/api/asgimocked/events/endless', 'headers': [],
+             'query_string': b''}, receive, send), 1))
+    assert len(sent) == 3
+    assert closed_streams == ['endless']
+
+
+def test_call_returns_busy_response_when_no_more_event_streams_can_be_opened():
+    closed_streams.clear()
+    app = AsgiApp(AsgiMockedRouter(), Flask(__name__), max_streams=0)
+    status, body = asyncio.run(request(app, 'GET', '/api/asgimocked/events/2'))
+    assert status == 503
+    assert body == {'message': 'Server busy'}
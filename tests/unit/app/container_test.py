@@ -0,0 +1,49 @@
+from src.app.container import Container
+from src.app.controllers.devices_controller import DevicesController
+
+
+def test_get_instance_returns_the_same_container_when_called_twice():
+    assert Container.get_instance() is Container.get_instance()
+
+
+def test_get_instance_returns_a_new_container_in_a_forked_process():
+    container = Container.get_instance()
+    Container._instance_pid = -1
+    assert Container.get_instance() is not container
+
+
+def test_reset_makes_get_instance_return_a_new_container():
+    container = Container.get_instance()
+    Container.reset()
+    assert Container.get_instance() is not container
+
+
+def test_repositories_and_services_are_created_once():
+    container = Container.get_instance()
+    assert container.device_repository is container.device_repository
+    assert container.device_measure_aggregator is container.device_measure_aggregator
+
+
+def test_services_use_the_repositories_of_the_container():
+    container = Container.get_instance()
+    assert container.device_measure_summarizer._device_repository is container.device_repository
+    assert container.device_measure_summarizer._measure_repository is container.measure_repository
+
+
+def test_controllers_of_different_requests_share_the_repositories():
+    first_controller = DevicesController(None)
+    second_controller = DevicesController(None)
+    assert first_controller is not second_controller
+    assert first_controller.device_repository is second_controller.device_repository
+    assert first_controller.measure_repository is second_controller.measure_repository
+
+
+def test_notifications_listener_is_only_built_when_created(monkeypatch):
+    container = Container.get_instance()
+    listener = container.notifications_listener
+
+    def get_notifier(self):
+        raise AssertionError('The notifiers are only needed to create the listener')
+
+    monkeypatch.setattr(Container, 'instant_actions_notifier', property(get_notifier))
+    assert container.notifications_listener is listener
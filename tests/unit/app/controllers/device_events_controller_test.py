@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+
+from src import config
+from src.app.controllers.device_events_controller import DeviceEventsController
+from src.app.utils.http.event_stream_response import EventStreamResponse
+from src.app.utils.http.request import Request
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.infrastructure.database.pg_notification_listener import PGNotificationListener
+
+DEVICE_ID = '5c7b5ffc-90e7-1b85-f041-0595c912c905'
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(PGNotificationListener, 'start', lambda self: None)
+    controller = DeviceEventsController(Request(None, None, {}, {}))
+    container = controller._container
+    actions = []
+    states = [False]
+    container.device_repository.exists_for_user = lambda device_id, user_id: device_id == DEVICE_ID
+    container.device_repository.get_state = lambda device_id, user_id: states[-1]
+    container.device_repository.update_state = lambda device_id, user_id, turned_on, moment: states.append(turned_on)
+    container.device_scheduler_repository.get_next_scheduling_action = lambda device_id, after: (True, None)
+    container.instant_action_repository.pull = lambda device_id, pull_until: actions.pop() if actions else None
+    container.instant_action_repository.push = lambda device_id, action: actions.append(action)
+    return controller
+
+
+async def next_event(events):
+    event = await asyncio.wait_for(events.__anext__(), 1)
+    return event.name, event.data
+
+
+def test_stream_events_sends_state_and_next_action_when_connecting(controller):
+    async def run():
+        response = await controller.stream_events(DEVICE_ID)
+        try:
+            return [await next_event(response.events), await next_event(response.events)]
+        finally:
+            await response.events.aclose()
+
+    assert asyncio.run(run()) == [('state', {'turned_on': False}), ('next_action', {})]
+
+
+def test_stream_events_sends_instant_actions_pushed_while_connected(controller):
+    async def run():
+        response = await controller.stream_events(DEVICE_ID)
+        try:
+            await next_event(response.events)
+            await next_event(response.events)
+            pusher = controller._container.instant_action_pusher
+            await controller._run_blocking(lambda: pusher.push(DEVICE_ID, 'user_id', TaskAction.TURN_DEVICE_ON))
+            return await next_event(response.events)
+        finally:
+            await response.events.aclose()
+
+    assert asyncio.run(run()) == ('instant_action', {'action': TaskAction.TURN_DEVICE_ON.value})
+
+
+def test_stream_events_sends_state_updates(controller):
+    async def run():
+        response = await controller.stream_events(DEVICE_ID)
+        try:
+            await next_event(response.events)
+            await next_event(response.events)
+            modifier = controller._container.device_state_modifier
+            await controller._run_blocking(lambda: modifier.update(DEVICE_ID, 'user_id', True))
+            return await next_event(response.events)
+        finally:
+            await response.events.aclose()
+
+    assert asyncio.run(run()) == ('state', {'turned_on': True})
+
+
+def test_stream_events_sends_heartbeats_when_nothing_changes(controller, monkeypatch):
+    monkeypatch.setattr(config, 'DEVICE_EVENTS_HEARTBEAT_INTERVAL', 0.01)
+
+    async def run():
+        response = await controller.stream_events(DEVICE_ID)
+        try:
+            await next_event(response.events)
+            await next_event(response.events)
+            return await next_event(response.events)
+        finally:
+            await response.events.aclose()
+
+    assert asyncio.run(run()) == (None, None)
+
+
+def test_stream_events_unsubscribes_when_the_stream_is_closed(controller):
+    async def run():
+        response = await controller.stream_events(DEVICE_ID)
+        await next_event(response.events)
+        await response.events.aclose()
+
+    asyncio.run(run())
+    assert controller._container.instant_actions_notifier.subscriptions_count(DEVICE_ID) == 0
+    assert controller._container.device_state_notifier.subscriptions_count(DEVICE_ID) == 0
+
+
+def test_stream_events_returns_error_response_when_user_does_not_have_provided_device(controller):
+    actual = asyncio.run(controller.stream_events('a9b3f8c2-0f7e-4d1a-9c55-2b6e8d4f1a07'))
+
+    assert not isinstance(actual, EventStreamResponse)
+    assert actual.status_code == 400
+    assert actual.body['message'] == 'Provided device_id does not match any of the user devices'
+
+
+def test_stream_events_validates_permission_outside_of_the_event_loop(controller):
+    validation_threads = []
+
+    def validate_device_permission(device_id):
+        validation_threads.append(threading.current_thread())
+        raise PermissionError()
+
+    controller._validate_device_permission = validate_device_permission
+
+    actual = asyncio.run(controller.stream_events(DEVICE_ID))
+
+    assert actual.status_code == 401
+    assert validation_threads and validation_threads[0] is not threading.current_thread()
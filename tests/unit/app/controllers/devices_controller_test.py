@@ -1,10 +1,18 @@
 import random
+from datetime import timedelta
 
+import pytest
+
+from src import config
 from src.app.controllers.devices_controller import DevicesController
+from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.http.request import Request
 from src.domain.models.device import Device
 from src.domain.models.measure import Measure
+from src.common import dates
 from src.domain.serializers.measure_serializer import MeasureSerializer
+from src.domain.services.auth.device_token_revocation_list import DeviceTokenRevocationList
+from src.infrastructure.repositories.device_token_revocation_pg_repository import DeviceTokenRevocationPGRepository
 from tests.model_stubs.measure_stub import MeasureStub
 
 
@@ -205,6 +213,49 @@ def test_get_measures_returns_ok_response_when_could_summarize_measures():
     assert actual.body == expected
 
 
+def test_get_measures_returns_measures_summarized_by_the_database_when_requested():
+    controller = DevicesController(Request(None, None, {}, {'summarize_in_db': 'true'}))
+    controller.device_repository.exists_for_user = lambda device_id, user_id: True
+    controller.measure_repository.get_summarized_from_last_minutes = lambda device_id, time_interval, slices_count: [
+        Measure(timestamp=1626551296, voltage=220.571, current=5.432),
+    ]
+    actual = controller.get_measures('5c7b5ffc-90e7-1b85-f041-0595c912c905', 5)
+    assert actual.status_code == 200
+    assert actual.body == [{
+        'current': 5.43,
+        'power': 1197.7,
+        'timestamp': '2021-07-17T19:48:16+00:00',
+        'voltage': 220.57
+    }]
+
+
+def test_get_measures_returns_measures_summarized_from_rollups_for_long_intervals():
+    controller = DevicesController(None)
+    controller.device_repository.exists_for_user = lambda device_id, user_id: True
+    used_resolutions = []
+
+    def get_summarized_from_rollups(device_id, time_interval, slices_count, resolution):
+        used_resolutions.append(resolution)
+        return [Measure(timestamp=1626551296, voltage=220.571, current=5.432)]
+
+    controller.measure_repository.get_summarized_from_rollups = get_summarized_from_rollups
+    actual = controller.get_measures('5c7b5ffc-90e7-1b85-f041-0595c912c905', 1440)
+    assert actual.status_code == 200
+    assert len(actual.body) == 1
+    assert used_resolutions == [15]
+
+
+def test_get_measures_summarizes_raw_measures_for_long_intervals_when_rollups_are_disabled():
+    controller = DevicesController(Request(None, None, {}, {'use_rollups': 'false'}))
+    controller.device_repository.exists_for_user = lambda device_id, user_id: True
+    controller.measure_repository.get_from_last_minutes = lambda device_id, time_interval: [
+        Measure(timestamp=1626551296, voltage=220.571, current=5.432),
+    ]
+    actual = controller.get_measures('5c7b5ffc-90e7-1b85-f041-0595c912c905', 1440)
+    assert actual.status_code == 200
+    assert len(actual.body) == 1
+
+
 def test_get_all_for_user_returns_ok_response_with_user_devices():
     controller = DevicesController(None)
     controller.device_repository.get_user_devices = lambda user_id: [
@@ -323,6 +374,15 @@ def test_get_measures_for_all_devices_returns_summarized_measures_for_all_device
     assert actual.body == expected
 
 
+def test_get_measures_for_all_devices_returns_measures_summarized_by_the_database_when_requested():
+    controller = DevicesController(Request(None, None, {}, {'summarize_in_db': 'true'}))
+    controller.measure_repository.get_all_for_user_summarized_from_last_minutes = \
+        lambda user_id, time_interval, slices_count: [Measure(timestamp=1626551296, voltage=220.571, current=5.432)]
+    actual = controller.get_measures_for_all_devices(5)
+    assert actual.status_code == 200
+    assert len(actual.body) == 1
+
+
 def test_update_state_returns_ok_response_when_device_state_is_valid():
     controller = DevicesController(Request.from_body({'turned_on': True}))
     controller.device_repository.exists_for_user = lambda device_id, user_id: True
@@ -363,3 +423,89 @@ def test_get_state_returns_error_response_when_device_is_not_valid_for_provided_
     actual = controller.get_state('test_device_id')
     assert actual.status_code == 400
     assert actual.body == {'message': 'Device identifier is not valid for logged user'}
+
+
+@pytest.fixture
+def revoked_device_tokens(monkeypatch):
+    revocations = {}
+    monkeypatch.setattr(DeviceTokenRevocationPGRepository, 'get_all', lambda self, revoked_after=None: revocations)
+    monkeypatch.setattr(DeviceTokenRevocationPGRepository, 'get', lambda self, device_id: revocations.get(device_id))
+    DeviceTokenRevocationList.clear()
+    yield revocations
+    DeviceTokenRevocationList.clear()
+
+
+def _device_token(device_id: str, age: int = 0) -> DeviceToken:
+    return DeviceToken(device_id=device_id, user_id='test_user_id', timestamp=dates.now() - timedelta(seconds=age))
+
+
+def _raise_when_called(*args):
+    raise AssertionError('Device ownership must not be checked')
+
+
+def test_update_state_skips_ownership_check_when_device_tokens_are_trusted(monkeypatch, revoked_device_tokens):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    controller = DevicesController(Request.from_body({'turned_on': True}), _device_token('test_device_id'))
+    controller.device_repository.exists_for_user = _raise_when_called
+    controller.device_repository.update_state = lambda device_id, user_id, turned_on, last_status_update: None
+    actual = controller.update_state('test_device_id')
+    assert actual.status_code == 200
+
+
+def test_update_state_checks_ownership_when_device_tokens_are_not_trusted(monkeypatch, revoked_device_tokens):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', False)
+    controller = DevicesController(Request.from_body({'turned_on': True}), _device_token('test_device_id'))
+    controller.device_repository.exists_for_user = lambda device_id, user_id: False
+    actual = controller.update_state('test_device_id')
+    assert actual.status_code == 400
+    assert actual.body == {'message': 'Device identifier is not valid for logged user'}
+
+
+def test_get_state_checks_ownership_when_trusted_device_token_has_expired(monkeypatch, revoked_device_tokens):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    token = _device_token('test_device_id', age=config.DEVICE_TOKENS_TRUST_LIFETIME + 1)
+    controller = DevicesController(Request.from_body({}), token)
+    controller.device_repository.exists_for_user = lambda device_id, user_id: False
+    actual = controller.get_state('test_device_id')
+    assert actual.status_code == 400
+    assert actual.body == {'message': 'Device identifier is not valid for logged user'}
+
+
+def test_add_measure_skips_ownership_check_when_device_tokens_are_trusted(monkeypatch, revoked_device_tokens):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    controller = DevicesController(Request.from_body(MeasureSerializer.serialize(MeasureStub())),
+                                   _device_token('test_device_id'))
+    controller.device_repository.exists_for_user = _raise_when_called
+    controller.measure_repository.create = lambda measure, device_id: None
+    actual = controller.add_measure('test_device_id')
+    assert actual.status_code == 201
+
+
+def test_add_measures_returns_unauthorized_response_when_token_was_revoked(monkeypatch, revoked_device_tokens):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    token = _device_token('test_device_id', age=10)
+    revoked_device_tokens['test_device_id'] = dates.now()
+    controller = DevicesController(Request.from_body(MeasureSerializer.serialize_all([MeasureStub()])), token)
+    controller.device_repository.exists_for_user = _raise_when_called
+    actual = controller.add_measures('test_device_id')
+    assert actual.status_code == 401
+
+
+def test_sync_returns_error_response_when_turned_on_is_not_a_boolean():
+    controller = DevicesController(Request.from_body({'turned_on': 'yes'}))
+    actual = controller.sync('5c7b5ffc-90e7-1b85-f041-0595c912c905')
+    assert actual.status_code == 400
+    assert actual.body['message'] == 'turned_on must be a valid boolean'
+
+
+def test_sync_returns_error_response_when_a_measure_is_not_valid():
+    controller = DevicesController(Request.from_body({'measures': [{'voltage': 220.5}]}))
+    actual = controller.sync('5c7b5ffc-90e7-1b85-f041-0595c912c905')
+    assert actual.status_code == 400
+
+
+def test_sync_returns_unauthorized_response_when_device_token_is_for_another_device():
+    token = DeviceToken(device_id='another_device_id', user_id='user_id', timestamp=dates.now())
+    controller = DevicesController(Request.from_body({'turned_on': True}), token)
+    actual = controller.sync('5c7b5ffc-90e7-1b85-f041-0595c912c905')
+    assert actual.status_code == 401
@@ -1,12 +1,32 @@
+import asyncio
+import threading
+
+import pytest
+
 from src.app.controllers.instant_actions_controller import InstantActionsController
 from src.app.utils.http.request import Request
 from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.infrastructure.database.pg_notification_listener import PGNotificationListener
+
+
+@pytest.fixture
+def pending_actions(monkeypatch):
+    monkeypatch.setattr(PGNotificationListener, 'start', lambda self: None)
+    actions = []
+
+    def create_controller(query_params: dict) -> InstantActionsController:
+        controller = InstantActionsController(Request(None, None, {}, query_params))
+        controller.device_repository.exists_for_user = lambda ble_id, user_id: True
+        controller.instant_action_repository.pull = lambda device_id, pull_until: actions.pop() if actions else None
+        controller.instant_action_repository.push = lambda device_id, action: actions.append(action)
+        return controller
+
+    return actions, create_controller
 
 
 def test_push_instant_action_returns_ok_when_instant_actions_is_pushed_successfully():
     controller = InstantActionsController(Request.from_body({'action': TaskAction.TURN_DEVICE_ON.value}))
     controller.device_repository.exists_for_user = lambda ble_id, user_id: True
-    controller.instant_action_repository.clean_for = lambda device_id: None
     controller.instant_action_repository.push = lambda device_id, action: None
 
     actual = controller.push_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905')
@@ -27,7 +47,6 @@ def test_push_instant_action_returns_error_response_when_user_does_not_have_prov
 def test_pull_instant_action_returns_obtained_instant_action_when_available():
     controller = InstantActionsController(Request.from_body({}))
     controller.device_repository.exists_for_user = lambda ble_id, user_id: True
-    controller.instant_action_repository.clean_for = lambda device_id: None
     controller.instant_action_repository.pull = lambda device_id, pull_until: TaskAction.TURN_DEVICE_ON
 
     expected = {'action': TaskAction.TURN_DEVICE_ON.value}
@@ -41,7 +60,6 @@ def test_pull_instant_action_returns_obtained_instant_action_when_available():
 def test_pull_instant_action_returns_null_when_there_is_no_pending_instant_action():
     controller = InstantActionsController(Request.from_body({}))
     controller.device_repository.exists_for_user = lambda ble_id, user_id: True
-    controller.instant_action_repository.clean_for = lambda device_id: None
     controller.instant_action_repository.pull = lambda device_id, pull_until: None
 
     expected = {'action': None}
@@ -60,3 +78,70 @@ def test_pull_instant_action_returns_error_response_when_user_does_not_have_prov
 
     assert actual.status_code == 400
     assert actual.body['message'] == 'Provided device_id does not match any of the user devices'
+
+
+def test_wait_instant_action_returns_pending_instant_action_without_waiting(pending_actions):
+    actions, create_controller = pending_actions
+    actions.append(TaskAction.TURN_DEVICE_ON)
+    controller = create_controller({'timeout': '10'})
+
+    actual = asyncio.run(asyncio.wait_for(controller.wait_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905'), 1))
+
+    assert actual.status_code == 200
+    assert actual.body == {'action': TaskAction.TURN_DEVICE_ON.value}
+
+
+def test_wait_instant_action_returns_instant_action_pushed_while_waiting(pending_actions):
+    _, create_controller = pending_actions
+    controller = create_controller({'timeout': '10'})
+
+    async def run():
+        waiting = asyncio.ensure_future(controller.wait_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905'))
+        await asyncio.sleep(0.05)
+        pusher = controller._container.instant_action_pusher
+        pusher.push('5c7b5ffc-90e7-1b85-f041-0595c912c905', 'user_id', TaskAction.TURN_DEVICE_OFF)
+        return await asyncio.wait_for(waiting, 1)
+
+    actual = asyncio.run(run())
+
+    assert actual.status_code == 200
+    assert actual.body == {'action': TaskAction.TURN_DEVICE_OFF.value}
+
+
+def test_wait_instant_action_returns_null_when_nothing_is_pushed_before_the_timeout(pending_actions):
+    _, create_controller = pending_actions
+    controller = create_controller({'timeout': '0.05'})
+
+    actual = asyncio.run(controller.wait_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905'))
+
+    assert actual.status_code == 200
+    assert actual.body == {'action': None}
+    assert controller._container.instant_actions_notifier.subscriptions_count(
+        '5c7b5ffc-90e7-1b85-f041-0595c912c905') == 0
+
+
+def test_wait_instant_action_returns_error_response_when_timeout_is_not_valid(pending_actions):
+    _, create_controller = pending_actions
+    controller = create_controller({'timeout': 'soon'})
+
+    actual = asyncio.run(controller.wait_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905'))
+
+    assert actual.status_code == 400
+    assert actual.body['message'] == 'Provided timeout is not valid'
+
+
+def test_wait_instant_action_validates_permission_outside_of_the_event_loop(pending_actions):
+    _, create_controller = pending_actions
+    controller = create_controller({'timeout': '10'})
+    validation_threads = []
+
+    def validate_device_permission(device_id):
+        validation_threads.append(threading.current_thread())
+        raise PermissionError()
+
+    controller._validate_device_permission = validate_device_permission
+
+    actual = asyncio.run(controller.wait_instant_action('5c7b5ffc-90e7-1b85-f041-0595c912c905'))
+
+    assert actual.status_code == 401
+    assert validation_threads and validation_threads[0] is not threading.current_thread()
@@ -1,9 +1,13 @@
 from unittest.mock import patch
 
+import pytest
+
 from src.app.controllers.scheduler_controller import SchedulerController
 from src.app.utils.http.request import Request
 from src.common import dates
 from src.domain.mappers.scheduling.tasks.task_mapper import TaskMapper
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.task_action import TaskAction
 
 
 def test_set_scheduling_tasks_returns_ok_tasks_when_scheduling_tasks_are_updated_successfully():
@@ -19,8 +23,7 @@ def test_set_scheduling_tasks_returns_ok_tasks_when_scheduling_tasks_are_updated
         }
     ]))
     controller.device_repository.exists_for_user = lambda ble_id, user_id: True
-    controller.device_scheduler_repository._has_scheduling_tasks = lambda device_id: False
-    controller.device_scheduler_repository._create_scheduling_tasks = lambda device, tasks: None
+    controller.device_scheduler_repository._execute_statement = lambda statement, params, transaction=None: None
     actual = controller.set_scheduling_tasks('5c7b5ffc-90e7-1b85-f041-0595c912c905')
     assert actual.status_code == 200
 
@@ -73,6 +76,7 @@ def test_get_scheduling_tasks_returns_a_list_of_scheduled_tasks():
 
 
 @patch('src.common.dates.now', new=lambda: dates.to_datetime('2022-06-22T00:00:00+00:00'))
+@patch('src.infrastructure.database.pg_notification_listener.PGNotificationListener.start')
 def test_get_next_scheduling_action_returns_next_scheduler_action(*args):
     controller = SchedulerController(Request.from_body({}))
     device_tasks = [
@@ -87,6 +91,8 @@ def test_get_next_scheduling_action_returns_next_scheduler_action(*args):
         }
     ]
     controller.device_repository.exists_for_user = lambda ble_id, user_id: True
+    # The stored next action already passed
+    controller.device_scheduler_repository.get_next_scheduling_action = lambda device_id, after: (False, None)
     controller.device_scheduler_repository.get_scheduling_tasks = lambda device_id: TaskMapper.map_all(device_tasks)
 
     expected = {'action': 'TURN_DEVICE_ON', 'moment': '2022-06-22T23:32:19.145344+00:00'}
@@ -95,3 +101,38 @@ def test_get_next_scheduling_action_returns_next_scheduler_action(*args):
 
     assert actual.status_code == 200
     assert actual.body == expected
+
+
+@patch('src.common.dates.now', new=lambda: dates.to_datetime('2022-06-22T00:00:00+00:00'))
+@patch('src.infrastructure.database.pg_notification_listener.PGNotificationListener.start')
+def test_get_next_scheduling_actions_returns_the_next_scheduler_action_of_every_device(*args):
+    device_id, other_device_id = '5c7b5ffc-90e7-1b85-f041-0595c912c905', '1f2e3d4c-5b6a-4798-8a7b-6c5d4e3f2a1b'
+    controller = SchedulerController(Request.from_body([device_id, other_device_id]))
+    controller.device_repository.all_exist_for_user = lambda device_ids, user_id: True
+    controller.device_scheduler_repository.get_next_scheduling_actions = lambda device_ids, after: {
+        device_id: (True, SchedulerAction(action=TaskAction.TURN_DEVICE_ON, moment=after)),
+        other_device_id: (True, None)
+    }
+
+    actual = controller.get_next_scheduling_actions()
+
+    assert actual.status_code == 200
+    assert actual.body == {
+        device_id: {'action': 'TURN_DEVICE_ON', 'moment': '2022-06-22T00:00:00+00:00'},
+        other_device_id: {}
+    }
+
+
+def test_get_next_scheduling_actions_returns_error_response_when_user_does_not_have_some_device():
+    controller = SchedulerController(Request.from_body(['5c7b5ffc-90e7-1b85-f041-0595c912c905']))
+    controller.device_repository.all_exist_for_user = lambda device_ids, user_id: False
+    actual = controller.get_next_scheduling_actions()
+    assert actual.status_code == 400
+    assert actual.body['message'] == 'Some of the provided device ids do not match any of the user devices'
+
+
+@pytest.mark.parametrize('body', [{}, [1], ['5c7b5ffc-90e7-1b85-f041-0595c912c905'] * 501])
+def test_get_next_scheduling_actions_returns_error_response_when_the_device_ids_are_not_valid(body):
+    controller = SchedulerController(Request.from_body(body))
+    actual = controller.get_next_scheduling_actions()
+    assert actual.status_code == 400
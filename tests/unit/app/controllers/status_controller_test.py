@@ -0,0 +1,15 @@
+from src.app.controllers.status_controller import StatusController
+
+
+def test_get_db_pool_stats_returns_pool_usage():
+    controller = StatusController(None)
+    actual = controller.get_db_pool_stats()
+    assert actual.status_code == 200
+    assert {'size', 'in_use', 'idle', 'waits'}.issubset(actual.body.keys())
+
+
+def test_get_device_ownership_cache_stats_returns_cache_usage():
+    controller = StatusController(None)
+    actual = controller.get_device_ownership_cache_stats()
+    assert actual.status_code == 200
+    assert {'size', 'hits', 'misses'}.issubset(actual.body.keys())
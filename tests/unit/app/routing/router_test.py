@@ -2,7 +2,7 @@ import pytest
 
 from src.app.routing.router import Router
 from src.app.utils import global_variables
-from src.app.routing import router, cors_solver
+from src.app.routing import cors_solver
 from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.auth.permission_level import PermissionLevel
 from src.app.utils.auth.user_token import UserToken
@@ -26,10 +26,6 @@ class MockedResponse:
         self.headers = {}
 
 
-# Patch response jsonify
-Response.jsonify = lambda self: MockedResponse(self.body, self.status_code)
-
-
 class MockedController:
 
     def __init__(self, request=None, token=None):
@@ -91,12 +87,12 @@ def create_device_token(device_id: str, user_id: str) -> str:
     return 'Bearer ' + DeviceToken(device_id=device_id, user_id=user_id).encode()
 
 
-# Mockeamos la funcion make_response importado desde flask
-router.make_response = lambda message, code: MockedResponse(message, code)
-
-
 @pytest.fixture
-def router():
+def router(monkeypatch):
+    # Patch response jsonify
+    monkeypatch.setattr(Response, 'jsonify', lambda self: MockedResponse(self.body, self.status_code))
+    # Mockeamos la funcion make_response importado desde flask
+    monkeypatch.setattr('src.app.routing.router.make_response', lambda message, code: MockedResponse(message, code))
     Router._Router__discover_controllers = discover_controllers_mocked
     return Router()
 
@@ -117,6 +113,16 @@ def test_router_map_rutes_when_instantiated():
     assert router.routes[0].methods[0].min_permission_level == PermissionLevel.PUBLIC
 
 
+def test_get_routed_method_returns_the_method_mapped_to_the_controller_path_and_http_method(router):
+    actual = router._get_routed_method('mocked', '/mocked_http_endpoint_with_params', 'GET')
+    assert actual.method_name == 'mocked_http_endpoint_with_params'
+    assert actual.controller_class == MockedController
+
+
+def test_get_routed_method_returns_none_when_http_method_does_not_match(router):
+    assert router._get_routed_method('mocked', '/mocked_http_endpoint_with_params', 'POST') is None
+
+
 def test_route_returns_error_response_when_controller_is_not_in_path(router):
     request = MockedRequest('POST', {})
     actual = router.route(request, '')
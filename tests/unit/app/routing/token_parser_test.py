@@ -1,5 +1,11 @@
+import pytest
+
+from src import config
 from src.app.routing.token_parser import TokenParser
+from src.app.utils.auth.device_token import DeviceToken
 from src.app.utils.auth.user_token import UserToken
+from src.app.utils.jwt_helper import JWTHelper
+from src.common import dates
 
 
 def create_token(user_email: dict):
@@ -13,6 +19,13 @@ class MockedRequest:
         }
 
 
+@pytest.fixture(autouse=True)
+def clear_tokens_cache():
+    TokenParser.clear_cache()
+    yield
+    TokenParser.clear_cache()
+
+
 def test_init_parses_tokens_when_called():
     parser = TokenParser(MockedRequest(create_token('test@test.com')))
     assert parser.token.user_email == 'test@test.com'
@@ -48,3 +61,48 @@ def test_valid_token_returns_true_when_token_is_valid():
 def test_valid_token_returns_false_when_token_is_not_valid():
     parser = TokenParser(MockedRequest('invalid auth_info'))
     assert not parser.valid_token()
+
+
+def test_init_parses_device_tokens_when_called():
+    token = DeviceToken(device_id='test_device_id', user_id='test_user_id')
+    parser = TokenParser(MockedRequest('Bearer ' + token.encode()))
+    assert isinstance(parser.token, DeviceToken)
+    assert parser.token.device_id == 'test_device_id'
+
+
+def test_init_cant_parse_token_if_its_prefix_does_not_match_any_token_type():
+    token = UserToken(user_email='test@test.com').encode()
+    parser = TokenParser(MockedRequest('Bearer x' + token[1:]))
+    assert parser.token is None
+
+
+def test_init_returns_the_cached_token_when_the_same_token_was_already_parsed():
+    token = create_token('test@test.com')
+    first_parser = TokenParser(MockedRequest(token))
+    second_parser = TokenParser(MockedRequest(token))
+    assert second_parser.token is first_parser.token
+    assert TokenParser.get_cache().stats()['hits'] == 1
+
+
+def test_init_does_not_cache_invalid_tokens():
+    TokenParser(MockedRequest('Bearer uinvalid_encoded_token'))
+    assert TokenParser.get_cache().stats()['size'] == 0
+
+
+def test_init_keeps_tokens_in_cache_until_they_expire(monkeypatch):
+    expiration = dates.timestamp_now() + 60
+    token = 'Bearer u' + JWTHelper.encode_token({
+        'email': 'test@test.com', 'timestamp': dates.to_utc_isostring(dates.now()), 'exp': expiration
+    })
+    ttls = []
+    cache = TokenParser.get_cache()
+    monkeypatch.setattr(cache, 'set', lambda key, value, ttl: ttls.append(ttl))
+    parser = TokenParser(MockedRequest(token))
+    assert parser.token.user_email == 'test@test.com'
+    assert 0 < ttls[0] <= 60 < config.TOKENS_CACHE_TTL
+
+
+def test_clear_cache_forgets_the_parsed_tokens():
+    TokenParser(MockedRequest(create_token('test@test.com')))
+    TokenParser.clear_cache()
+    assert TokenParser.get_cache().stats()['size'] == 0
@@ -0,0 +1,30 @@
+import asyncio
+
+from src.app.utils.http.event_stream_response import EventStreamResponse, ServerSentEvent
+
+
+def test_encode_returns_the_event_name_and_its_json_data():
+    assert ServerSentEvent('state', {'turned_on': True}).encode() == b'event: state\ndata: {"turned_on":true}\n\n'
+
+
+def test_encode_returns_a_comment_for_heartbeats():
+    assert ServerSentEvent.heartbeat().encode() == b':\n\n'
+
+
+def test_jsonify_returns_a_response_that_can_be_iterated_without_event_loop():
+    closed = []
+
+    async def generate_events():
+        try:
+            while True:
+                await asyncio.sleep(0)
+                yield ServerSentEvent('ping', {})
+        finally:
+            closed.append(True)
+
+    response = EventStreamResponse(generate_events(), retry_delay=5).jsonify()
+    chunks = iter(response.response)
+    assert response.mimetype == 'text/event-stream'
+    assert [next(chunks), next(chunks)] == [b'retry: 5000\n\n', b'event: ping\ndata: {}\n\n']
+    chunks.close()
+    assert closed == [True]
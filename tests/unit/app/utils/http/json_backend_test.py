@@ -0,0 +1,41 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.app.utils.http.json_backend import JSONBackend
+
+
+@pytest.fixture(params=list(JSONBackend.BACKENDS))
+def backend(request):
+    previous_backend = JSONBackend.name()
+    JSONBackend.use(request.param)
+    yield request.param
+    JSONBackend.use(previous_backend)
+
+
+def test_dumps_encodes_the_body_without_whitespaces(backend):
+    actual = JSONBackend.dumps({'message': 'OK', 'values': [1, 2.5, None, True]})
+    assert actual == b'{"message":"OK","values":[1,2.5,null,true]}'
+
+
+def test_dumps_encodes_decimals_as_numbers(backend):
+    assert JSONBackend.dumps({'voltage': Decimal('220.5')}) == b'{"voltage":220.5}'
+
+
+def test_dumps_encodes_dates_and_datetimes_in_iso_format(backend):
+    actual = JSONBackend.dumps({
+        'naive': datetime(2021, 7, 17, 10, 30), 'utc': datetime(2021, 7, 17, 10, 30, 0, 500, tzinfo=timezone.utc),
+        'date': date(2021, 7, 17)
+    })
+    assert actual == b'{"naive":"2021-07-17T10:30:00","utc":"2021-07-17T10:30:00.000500+00:00","date":"2021-07-17"}'
+
+
+def test_dumps_raises_exception_when_the_body_can_not_be_encoded(backend):
+    with pytest.raises(TypeError):
+        JSONBackend.dumps({'value': object()})
+
+
+def test_use_falls_back_to_json_when_backend_is_not_available(backend):
+    JSONBackend.use('not_available')
+    assert JSONBackend.name() == 'json'
@@ -0,0 +1,10 @@
+import json
+
+from src.app.utils.http.response import Response
+
+
+def test_jsonify_returns_a_json_response_with_the_body_and_status_code():
+    actual = Response.bad_request(message='Invalid device').jsonify()
+    assert actual.status_code == 400
+    assert actual.mimetype == 'application/json'
+    assert json.loads(actual.get_data()) == {'message': 'Invalid device'}
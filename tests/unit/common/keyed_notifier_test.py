@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+from src.common.keyed_notifier import KeyedNotifier
+
+
+def test_wait_returns_true_when_the_key_is_notified_from_another_thread():
+    notifier = KeyedNotifier()
+
+    async def run():
+        with notifier.subscribe('key') as subscription:
+            threading.Timer(0.01, lambda: notifier.notify('key')).start()
+            return await subscription.wait(1)
+
+    assert asyncio.run(run()) is True
+
+
+def test_wait_returns_false_when_the_key_is_not_notified_before_the_timeout():
+    notifier = KeyedNotifier()
+
+    async def run():
+        with notifier.subscribe('key') as subscription:
+            notifier.notify('another_key')
+            return await subscription.wait(0.01)
+
+    assert asyncio.run(run()) is False
+
+
+def test_wait_returns_notifications_sent_before_waiting_only_once():
+    notifier = KeyedNotifier()
+
+    async def run():
+        with notifier.subscribe('key') as subscription:
+            notifier.notify('key')
+            notifier.notify('key')
+            await asyncio.sleep(0)
+            return await subscription.wait(0.01), await subscription.wait(0.01)
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_notify_all_notifies_every_subscription():
+    notifier = KeyedNotifier()
+
+    async def run():
+        with notifier.subscribe('first') as first, notifier.subscribe('second') as second:
+            assert notifier.notify_all() == 2
+            return await first.wait(0.01), await second.wait(0.01)
+
+    assert asyncio.run(run()) == (True, True)
+
+
+def test_close_unsubscribes():
+    notifier = KeyedNotifier()
+
+    async def run():
+        with notifier.subscribe('key'):
+            assert notifier.subscriptions_count('key') == 1
+
+    asyncio.run(run())
+    assert notifier.subscriptions_count('key') == 0
+    assert notifier.notify('key') == 0
+
+
+def test_subscriptions_sharing_an_event_tell_which_ones_were_notified():
+    notifier = KeyedNotifier()
+
+    async def run():
+        event = asyncio.Event()
+        with notifier.subscribe('first', event) as first, notifier.subscribe('second', event) as second:
+            threading.Timer(0.01, lambda: notifier.notify('second')).start()
+            await asyncio.wait_for(event.wait(), 1)
+            return first.consume(), second.consume()
+
+    assert asyncio.run(run()) == (False, True)
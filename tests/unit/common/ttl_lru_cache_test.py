@@ -0,0 +1,70 @@
+from src.common.ttl_lru_cache import TTLLRUCache
+
+
+class MockedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_cached_value_before_it_expires():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    cache.set('key', 'value', ttl=10)
+    assert cache.get('key') == (True, 'value')
+
+
+def test_get_does_not_return_expired_values():
+    clock = MockedClock()
+    cache = TTLLRUCache(max_size=2, clock=clock)
+    cache.set('key', 'value', ttl=10)
+    clock.now = 10
+    assert cache.get('key') == (False, None)
+    assert cache.stats()['size'] == 0
+
+
+def test_set_evicts_the_least_recently_used_entry_when_full():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    cache.set('first', 1, ttl=10)
+    cache.set('second', 2, ttl=10)
+    cache.get('first')
+    cache.set('third', 3, ttl=10)
+    assert cache.get('second') == (False, None)
+    assert cache.get('first') == (True, 1)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_set_does_not_store_the_value_when_the_key_was_deleted_after_reading_its_generation():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    generation = cache.get_generation('key')
+    cache.delete('key')
+    assert not cache.set('key', 'stale', ttl=10, generation=generation)
+    assert cache.get('key') == (False, None)
+    assert cache.set('key', 'value', ttl=10, generation=cache.get_generation('key'))
+    assert cache.get('key') == (True, 'value')
+
+
+def test_set_does_not_store_the_value_when_the_cache_was_cleared_after_reading_its_generation():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    generation = cache.get_generation('key')
+    cache.clear()
+    assert not cache.set('key', 'stale', ttl=10, generation=generation)
+
+
+def test_delete_keeps_changing_the_generation_after_dropping_the_oldest_deleted_keys():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    generation = cache.get_generation('first')
+    cache.delete('first')
+    cache.delete('second')
+    cache.delete('third')
+    assert not cache.set('first', 'stale', ttl=10, generation=generation)
+
+
+def test_stats_counts_hits_and_misses():
+    cache = TTLLRUCache(max_size=2, clock=MockedClock())
+    cache.set('key', False, ttl=10)
+    cache.get('key')
+    cache.get('other_key')
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
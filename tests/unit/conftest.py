@@ -0,0 +1,11 @@
+import pytest
+
+from src.app.container import Container
+
+
+@pytest.fixture(autouse=True)
+def reset_container():
+    # Tests patch the repositories of the controllers, which are shared through the container
+    Container.reset()
+    yield
+    Container.reset()
@@ -75,3 +75,8 @@ def test_power_returns_measure_power_when_called():
     measure = MeasureStub(voltage=220.0, current=2.0)
     actual = measure.power
     assert actual == 440.0
+
+
+def test_compute_power_rounds_like_the_power_of_a_measure():
+    measure = MeasureStub(voltage=220.123, current=1.456)
+    assert Measure.compute_power(measure.voltage, measure.current) == measure.power == 321.38
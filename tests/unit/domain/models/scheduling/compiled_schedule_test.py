@@ -0,0 +1,71 @@
+import random
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.common import dates
+from src.common.weekday import Weekday
+from src.domain.models.scheduling.compiled_schedule import CompiledSchedule
+from src.domain.models.scheduling.scheduling_stack import SchedulingStack
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from tests.model_stubs.scheduling.tasks.daily_task_stub import DailyTaskStub
+from tests.model_stubs.scheduling.tasks.task_stub import TaskStub
+
+
+def random_tasks(now, count: int) -> list:
+    tasks = []
+    for _ in range(count):
+        moment = now + timedelta(minutes=random.randint(-7 * 24 * 60, 7 * 24 * 60))
+        tasks.append(DailyTaskStub(moment=moment) if random.random() < 0.5 else TaskStub(moment=moment))
+    return tasks
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_get_next_action_returns_the_same_action_than_the_scheduling_stack(seed):
+    random.seed(seed)
+    now = dates.to_datetime('2022-06-22T10:00:00+00:00') + timedelta(minutes=random.randint(0, 7 * 24 * 60))
+    tasks = random_tasks(now, random.randint(0, 20))
+
+    with patch('src.common.dates.now', new=lambda: now):
+        expected = SchedulingStack(tasks).get_next_action()
+    actual = CompiledSchedule(tasks).get_next_action(now)
+
+    if expected is None:
+        assert actual is None
+    else:
+        assert (actual.action, actual.moment) == (expected.action, expected.moment)
+
+
+def test_get_next_action_returns_the_first_occurrence_of_the_next_week_when_the_current_one_passed():
+    task = DailyTaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-01-01T08:30:00+00:00'),
+                         weekdays=[Weekday.MONDAY, Weekday.WEDNESDAY])
+    # Sunday
+    actual = CompiledSchedule([task]).get_next_action(dates.to_datetime('2022-06-26T09:00:00+00:00'))
+
+    assert actual.moment == dates.to_datetime('2022-06-27T08:30:00+00:00')
+
+
+def test_get_next_action_returns_an_action_scheduled_at_the_given_moment():
+    moment = dates.to_datetime('2022-06-22T08:30:00+00:00')
+    task = TaskStub(action=TaskAction.TURN_DEVICE_OFF, moment=moment)
+
+    actual = CompiledSchedule([task]).get_next_action(moment)
+
+    assert (actual.action, actual.moment) == (TaskAction.TURN_DEVICE_OFF, moment)
+
+
+def test_get_next_action_returns_the_action_of_the_first_task_when_several_are_simultaneous():
+    moment = dates.to_datetime('2022-06-22T08:30:00+00:00')
+    tasks = [DailyTaskStub(action=TaskAction.TURN_DEVICE_ON, moment=moment, weekdays=[Weekday.WEDNESDAY]),
+             TaskStub(action=TaskAction.TURN_DEVICE_OFF, moment=moment)]
+
+    assert CompiledSchedule(tasks).get_next_action(moment).action == TaskAction.TURN_DEVICE_ON
+    assert CompiledSchedule(tasks[::-1]).get_next_action(moment).action == TaskAction.TURN_DEVICE_OFF
+
+
+def test_get_next_action_returns_none_when_every_task_passed():
+    task = TaskStub(moment=dates.to_datetime('2022-06-22T08:30:00+00:00'))
+
+    assert CompiledSchedule([task]).get_next_action(dates.to_datetime('2022-06-23T00:00:00+00:00')) is None
+    assert CompiledSchedule([]).get_next_action(dates.now()) is None
@@ -0,0 +1,20 @@
+from unittest.mock import patch
+
+from src.common import dates
+from src.common.weekday import Weekday
+from tests.model_stubs.scheduling.tasks.daily_task_stub import DailyTaskStub
+
+
+# Wednesday
+@patch('src.common.dates.now', new=lambda: dates.to_datetime('2022-06-22T10:00:00+00:00'))
+def test_get_next_scheduler_action_skips_the_days_that_are_not_weekdays_of_the_task():
+    task = DailyTaskStub(moment=dates.to_datetime('2022-01-01T12:00:00+00:00'), weekdays=[Weekday.FRIDAY])
+
+    assert task.get_next_scheduler_action().moment == dates.to_datetime('2022-06-24T12:00:00+00:00')
+
+
+@patch('src.common.dates.now', new=lambda: dates.to_datetime('2022-06-22T10:00:00+00:00'))
+def test_get_next_scheduler_action_returns_the_next_week_when_the_time_of_its_only_weekday_passed():
+    task = DailyTaskStub(moment=dates.to_datetime('2022-01-01T08:00:00+00:00'), weekdays=[Weekday.WEDNESDAY])
+
+    assert task.get_next_scheduler_action().moment == dates.to_datetime('2022-06-29T08:00:00+00:00')
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+
+from src.domain.serializers.measure_serializer import MeasureSerializer
+from tests.model_stubs.measure_stub import MeasureStub
+
+
+def test_serialize_all_returns_the_same_than_serializing_each_measure():
+    measures = [MeasureStub() for _ in range(50)]
+    assert MeasureSerializer.serialize_all(measures) == [MeasureSerializer.serialize(x) for x in measures]
+
+
+def test_serialize_all_writes_naive_timestamps_as_utc():
+    measures = [MeasureStub(timestamp=datetime(2022, 5, 2, 12, 30)),
+                MeasureStub(timestamp=datetime(2022, 5, 2, 12, 30, 0, 123456))]
+    actual = MeasureSerializer.serialize_all(measures)
+    assert actual[0]['timestamp'] == '2022-05-02T12:30:00+00:00'
+    assert actual[1]['timestamp'] == '2022-05-02T12:30:00.123456+00:00'
+
+
+def test_serialize_all_writes_timestamps_of_other_timezones_like_serialize():
+    measure = MeasureStub(timestamp=datetime(2022, 5, 2, 12, 30, tzinfo=timezone(timedelta(hours=-3))))
+    assert MeasureSerializer.serialize_all([measure]) == [MeasureSerializer.serialize(measure)]
@@ -0,0 +1,156 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import pytest
+
+from src import config
+from src.common import dates
+from src.domain.repositories.device_token_revocation_repository import DeviceTokenRevocationRepository
+from src.domain.services.auth.device_token_revocation_list import DeviceTokenRevocationList
+
+REVOKED_BEFORE = datetime(2022, 5, 2, 12, tzinfo=timezone.utc)
+
+
+class MockedRevocationRepository(DeviceTokenRevocationRepository):
+
+    def __init__(self) -> None:
+        self.revocations = {}
+        self.loads = 0
+        self.lookups = 0
+
+    def revoke(self, device_id: str, revoked_before: datetime) -> None:
+        self.revocations[device_id] = revoked_before
+
+    def get(self, device_id: str) -> Optional[datetime]:
+        self.lookups += 1
+        return self.revocations.get(device_id)
+
+    def get_all(self, revoked_after: Optional[datetime] = None) -> Dict[str, datetime]:
+        self.loads += 1
+        return {device_id: revoked_before for device_id, revoked_before in self.revocations.items()
+                if revoked_after is None or revoked_before > revoked_after}
+
+
+class BlockingRevocationRepository(MockedRevocationRepository):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loading = threading.Event()
+        self.release = threading.Event()
+
+    def get_all(self, revoked_after: Optional[datetime] = None) -> Dict[str, datetime]:
+        self.loading.set()
+        assert self.release.wait(5)
+        return super().get_all(revoked_after)
+
+
+class MockedClock:
+
+    def __init__(self) -> None:
+        self.now = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clear_revocation_list():
+    DeviceTokenRevocationList.clear()
+    yield
+    DeviceTokenRevocationList.clear()
+
+
+def test_is_revoked_returns_true_for_tokens_generated_before_the_revocation():
+    repository = MockedRevocationRepository()
+    repository.revocations['device'] = REVOKED_BEFORE
+    revocation_list = DeviceTokenRevocationList(repository)
+    assert revocation_list.is_revoked('device', REVOKED_BEFORE - timedelta(seconds=1))
+
+
+def test_is_revoked_returns_false_for_tokens_generated_after_the_revocation():
+    repository = MockedRevocationRepository()
+    repository.revocations['device'] = REVOKED_BEFORE
+    revocation_list = DeviceTokenRevocationList(repository)
+    assert not revocation_list.is_revoked('device', REVOKED_BEFORE + timedelta(seconds=1))
+
+
+def test_is_revoked_returns_false_for_devices_without_revocations():
+    revocation_list = DeviceTokenRevocationList(MockedRevocationRepository())
+    assert not revocation_list.is_revoked('device', REVOKED_BEFORE)
+
+
+def test_is_revoked_reloads_the_revocations_only_after_the_refresh_interval():
+    repository = MockedRevocationRepository()
+    clock = MockedClock()
+    revocation_list = DeviceTokenRevocationList(repository, clock)
+    assert not revocation_list.is_revoked('device', REVOKED_BEFORE - timedelta(seconds=1))
+    repository.revocations['device'] = REVOKED_BEFORE
+    clock.now = config.DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL - 1
+    assert not revocation_list.is_revoked('device', REVOKED_BEFORE - timedelta(seconds=1))
+    clock.now = config.DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL
+    assert revocation_list.is_revoked('device', REVOKED_BEFORE - timedelta(seconds=1))
+    assert repository.loads == 2
+
+
+def test_revoke_is_seen_by_other_instances_without_waiting_for_a_refresh():
+    repository = MockedRevocationRepository()
+    clock = MockedClock()
+    DeviceTokenRevocationList(repository, clock).is_revoked('device', REVOKED_BEFORE)
+    DeviceTokenRevocationList(repository, clock).revoke('device', REVOKED_BEFORE)
+    assert DeviceTokenRevocationList(repository, clock).is_revoked('device', REVOKED_BEFORE - timedelta(seconds=1))
+    assert repository.revocations == {'device': REVOKED_BEFORE}
+    assert repository.loads == 1
+
+
+def test_is_revoked_reads_the_previous_revocations_while_another_thread_reloads_them():
+    repository = BlockingRevocationRepository()
+    repository.revocations['device'] = REVOKED_BEFORE
+    clock = MockedClock()
+    repository.release.set()
+    DeviceTokenRevocationList(repository, clock).is_revoked('device', REVOKED_BEFORE)
+    repository.release.clear()
+    repository.revocations['device'] = REVOKED_BEFORE + timedelta(hours=1)
+    clock.now = config.DEVICE_TOKENS_REVOCATIONS_REFRESH_INTERVAL
+    refresher = threading.Thread(target=DeviceTokenRevocationList(repository, clock).is_revoked,
+                                 args=('device', REVOKED_BEFORE))
+    refresher.start()
+    assert repository.loading.wait(5)
+    assert not DeviceTokenRevocationList(repository, clock).is_revoked('device', REVOKED_BEFORE)
+    repository.release.set()
+    refresher.join(5)
+    assert DeviceTokenRevocationList(repository, clock).is_revoked('device', REVOKED_BEFORE)
+    assert repository.loads == 2
+
+
+def test_revoke_is_kept_when_it_happens_while_the_revocations_are_reloaded():
+    repository = BlockingRevocationRepository()
+    clock = MockedClock()
+    refresher = threading.Thread(target=DeviceTokenRevocationList(repository, clock).is_revoked,
+                                 args=('device', REVOKED_BEFORE))
+    refresher.start()
+    assert repository.loading.wait(5)
+    repository.revocations['device'] = REVOKED_BEFORE
+    DeviceTokenRevocationList(repository, clock).revoke('other_device', REVOKED_BEFORE)
+    repository.revocations.pop('other_device')
+    repository.release.set()
+    refresher.join(5)
+    revocation_list = DeviceTokenRevocationList(repository, clock)
+    assert revocation_list.is_revoked('other_device', REVOKED_BEFORE - timedelta(seconds=1))
+
+
+def test_is_revoked_only_loads_the_revocations_of_trusted_tokens_when_device_tokens_are_trusted(monkeypatch):
+    monkeypatch.setattr(config, 'TRUST_DEVICE_TOKENS', True)
+    repository = MockedRevocationRepository()
+    trust_lifetime = timedelta(seconds=config.DEVICE_TOKENS_TRUST_LIFETIME)
+    old_revocation = dates.now() - trust_lifetime - timedelta(days=1)
+    repository.revocations['old_device'] = old_revocation
+    repository.revocations['device'] = dates.now()
+    revocation_list = DeviceTokenRevocationList(repository)
+    assert revocation_list.is_revoked('device', dates.now() - timedelta(days=1))
+    assert repository.lookups == 0
+    # Older tokens are not trusted, so their revocations are looked up in the repository
+    assert revocation_list.is_revoked('old_device', old_revocation - timedelta(days=1))
+    assert repository.lookups == 1
+    assert not revocation_list.is_revoked('old_device', dates.now() - timedelta(days=1))
+    assert repository.lookups == 1
@@ -0,0 +1,144 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.common import dates
+from src.common.ttl_lru_cache import TTLLRUCache
+from src.domain.exceptions.device_not_found_exception import DeviceNotFoundException
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.services.device_scheduler.device_scheduler_retriever import DeviceSchedulerRetriever
+from src.domain.services.device_scheduler.device_scheduler_updater import DeviceSchedulerUpdater
+from tests.model_stubs.scheduling.tasks.task_stub import TaskStub
+
+DEVICE_ID = '5c7b5ffc-90e7-1b85-f041-0595c912c905'
+USER_ID = 'f510826b-754d-f2b0-9119-87aeba06a548'
+NOW = dates.to_datetime('2022-06-22T10:00:00+00:00')
+
+
+def create_repositories(tasks: list):
+    device_repository = MagicMock()
+    device_repository.exists_for_user.return_value = True
+    device_repository.all_exist_for_user.return_value = True
+    device_scheduler_repository = MagicMock()
+    device_scheduler_repository.get_scheduling_tasks.side_effect = lambda device_id: list(tasks)
+    device_scheduler_repository.set_scheduling_tasks.side_effect = lambda device_id, new_tasks: (
+        tasks.clear(), tasks.extend(new_tasks))
+    # The stored next action already passed, so it is found from the tasks
+    device_scheduler_repository.get_next_scheduling_action.return_value = (False, None)
+    return device_repository, device_scheduler_repository
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_action_returns_the_stored_next_action_when_it_has_not_passed():
+    device_repository, device_scheduler_repository = create_repositories([])
+    next_action = SchedulerAction(action=TaskAction.TURN_DEVICE_OFF, moment=NOW)
+    device_scheduler_repository.get_next_scheduling_action.return_value = (True, next_action)
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, TTLLRUCache(10))
+
+    assert retriever.get_next_scheduling_action(DEVICE_ID, USER_ID) is next_action
+    device_scheduler_repository.get_scheduling_tasks.assert_not_called()
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_action_loads_the_tasks_once_while_the_cache_is_synced():
+    device_repository, device_scheduler_repository = create_repositories(
+        [TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-06-23T10:00:00+00:00'))])
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, TTLLRUCache(10))
+
+    actions = [retriever.get_next_scheduling_action(DEVICE_ID, USER_ID) for _ in range(3)]
+
+    assert [x.action for x in actions] == [TaskAction.TURN_DEVICE_ON] * 3
+    assert device_scheduler_repository.get_scheduling_tasks.call_count == 1
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_action_loads_the_tasks_every_time_while_the_cache_is_not_synced():
+    device_repository, device_scheduler_repository = create_repositories([])
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, TTLLRUCache(10),
+                                         is_cache_synced=lambda: False)
+
+    for _ in range(3):
+        assert retriever.get_next_scheduling_action(DEVICE_ID, USER_ID) is None
+
+    assert device_scheduler_repository.get_scheduling_tasks.call_count == 3
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_action_returns_the_new_action_after_the_tasks_are_set():
+    device_repository, device_scheduler_repository = create_repositories(
+        [TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-06-23T10:00:00+00:00'))])
+    cache = TTLLRUCache(10)
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, cache)
+    updater = DeviceSchedulerUpdater(device_repository, device_scheduler_repository, schedules_cache=cache)
+    retriever.get_next_scheduling_action(DEVICE_ID, USER_ID)
+
+    updater.set_scheduling_tasks(DEVICE_ID, USER_ID, [
+        TaskStub(action=TaskAction.TURN_DEVICE_OFF, moment=dates.to_datetime('2022-06-22T11:00:00+00:00'))])
+
+    assert retriever.get_next_scheduling_action(DEVICE_ID, USER_ID).action == TaskAction.TURN_DEVICE_OFF
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_action_does_not_cache_the_tasks_set_while_they_are_loaded():
+    tasks = [TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-06-23T10:00:00+00:00'))]
+    device_repository, device_scheduler_repository = create_repositories(tasks)
+    cache = TTLLRUCache(10)
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, cache)
+    updater = DeviceSchedulerUpdater(device_repository, device_scheduler_repository, schedules_cache=cache)
+
+    def get_scheduling_tasks_while_they_are_set(device_id):
+        loaded_tasks = list(tasks)
+        updater.set_scheduling_tasks(DEVICE_ID, USER_ID, [
+            TaskStub(action=TaskAction.TURN_DEVICE_OFF, moment=dates.to_datetime('2022-06-22T11:00:00+00:00'))])
+        device_scheduler_repository.get_scheduling_tasks.side_effect = lambda x: list(tasks)
+        return loaded_tasks
+
+    device_scheduler_repository.get_scheduling_tasks.side_effect = get_scheduling_tasks_while_they_are_set
+
+    assert retriever.get_next_scheduling_action(DEVICE_ID, USER_ID).action == TaskAction.TURN_DEVICE_ON
+    assert retriever.get_next_scheduling_action(DEVICE_ID, USER_ID).action == TaskAction.TURN_DEVICE_OFF
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_actions_reads_the_stored_next_actions_of_every_device_at_once():
+    device_repository, device_scheduler_repository = create_repositories(
+        [TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-06-23T10:00:00+00:00'))])
+    other_device_id = '1f2e3d4c-5b6a-4798-8a7b-6c5d4e3f2a1b'
+    next_action = SchedulerAction(action=TaskAction.TURN_DEVICE_OFF, moment=NOW)
+    # The stored next action of the first device already passed, so it is found from its tasks
+    device_scheduler_repository.get_next_scheduling_actions.return_value = {
+        DEVICE_ID: (False, None), other_device_id: (True, next_action)}
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, TTLLRUCache(10))
+
+    actual = retriever.get_next_scheduling_actions([DEVICE_ID, other_device_id, DEVICE_ID], USER_ID)
+
+    assert list(actual) == [DEVICE_ID, other_device_id]
+    assert actual[DEVICE_ID].action == TaskAction.TURN_DEVICE_ON
+    assert actual[other_device_id] is next_action
+    device_repository.all_exist_for_user.assert_called_once_with([DEVICE_ID, other_device_id], USER_ID)
+    device_scheduler_repository.get_next_scheduling_actions.assert_called_once_with(
+        [DEVICE_ID, other_device_id], NOW)
+
+
+@patch('src.common.dates.now', new=lambda: NOW)
+def test_get_next_scheduling_actions_does_not_read_the_cached_schedules():
+    device_repository, device_scheduler_repository = create_repositories(
+        [TaskStub(action=TaskAction.TURN_DEVICE_ON, moment=dates.to_datetime('2022-06-23T10:00:00+00:00'))])
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository, TTLLRUCache(10))
+    retriever.get_next_scheduling_action(DEVICE_ID, USER_ID)
+
+    actual = retriever.get_next_scheduling_actions([DEVICE_ID], USER_ID)
+
+    assert actual[DEVICE_ID].action == TaskAction.TURN_DEVICE_ON
+    device_scheduler_repository.get_next_scheduling_actions.assert_not_called()
+
+
+def test_get_next_scheduling_actions_raises_when_some_device_is_not_of_the_user():
+    device_repository, device_scheduler_repository = create_repositories([])
+    device_repository.all_exist_for_user.return_value = False
+    retriever = DeviceSchedulerRetriever(device_repository, device_scheduler_repository)
+
+    with pytest.raises(DeviceNotFoundException):
+        retriever.get_next_scheduling_actions([DEVICE_ID], USER_ID)
+    device_scheduler_repository.get_next_scheduling_actions.assert_not_called()
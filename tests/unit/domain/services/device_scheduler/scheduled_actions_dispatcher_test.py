@@ -0,0 +1,86 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.common import dates
+from src.domain.models.scheduling.scheduler_action import SchedulerAction
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.services.device_scheduler.scheduled_actions_dispatcher import ScheduledActionsDispatcher
+
+NOW = dates.to_datetime('2022-06-22T10:00:00+00:00')
+
+
+def create_dispatcher(due_actions: list, batch_size: int = 2, **kwargs):
+    device_scheduler_repository = MagicMock()
+    device_scheduler_repository.advance_next_scheduling_actions.side_effect = lambda after, limit: [
+        due_actions.pop(0) for _ in range(min(limit, len(due_actions)))]
+    device_scheduler_repository.get_first_next_action_moment.return_value = None
+    instant_action_repository = MagicMock()
+    dispatcher = ScheduledActionsDispatcher(device_scheduler_repository, instant_action_repository,
+                                            batch_size=batch_size, **kwargs)
+    return dispatcher, device_scheduler_repository, instant_action_repository
+
+
+def test_dispatch_due_actions_pushes_every_due_action_in_batches():
+    due_actions = [(f'device_{x}', SchedulerAction(action=TaskAction.TURN_DEVICE_ON, moment=NOW)) for x in range(5)]
+    dispatcher, device_scheduler_repository, instant_action_repository = create_dispatcher(due_actions)
+
+    assert dispatcher.dispatch_due_actions(NOW) == 5
+
+    pushed = [x for call in instant_action_repository.push_all.call_args_list for x in call.args[0]]
+    assert pushed == [(f'device_{x}', TaskAction.TURN_DEVICE_ON) for x in range(5)]
+    # The actions due at the given moment are included
+    assert device_scheduler_repository.advance_next_scheduling_actions.call_args.args[0] > NOW
+
+
+def test_dispatch_due_actions_skips_the_actions_that_expired_before_being_pushed():
+    due_actions = [('expired', SchedulerAction(action=TaskAction.TURN_DEVICE_ON, moment=NOW - timedelta(hours=1))),
+                   ('due', SchedulerAction(action=TaskAction.TURN_DEVICE_OFF, moment=NOW))]
+    dispatcher, _, instant_action_repository = create_dispatcher(due_actions, batch_size=10)
+
+    assert dispatcher.dispatch_due_actions(NOW) == 1
+
+    instant_action_repository.push_all.assert_called_once_with([('due', TaskAction.TURN_DEVICE_OFF)])
+
+
+def test_run_keeps_dispatching_after_an_error_until_stopped():
+    errors = []
+    dispatcher, device_scheduler_repository, _ = create_dispatcher([], on_error=errors.append, error_delay=0.01)
+    device_scheduler_repository.advance_next_scheduling_actions.side_effect = Exception('Database is down')
+    thread = threading.Thread(target=dispatcher.run)
+    thread.start()
+    while len(errors) < 2:
+        pass
+
+    dispatcher.stop()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert str(errors[0]) == 'Database is down'
+
+
+def test_dispatch_due_actions_advances_and_pushes_each_batch_in_one_transaction():
+    due_actions = [(f'device_{x}', SchedulerAction(action=TaskAction.TURN_DEVICE_ON, moment=NOW)) for x in range(3)]
+    transactions = []
+
+    @contextmanager
+    def transaction():
+        transactions.append('begin')
+        try:
+            yield
+            transactions.append('commit')
+        except Exception:
+            transactions.append('rollback')
+            raise
+
+    dispatcher, _, instant_action_repository = create_dispatcher(due_actions, transaction=transaction)
+    instant_action_repository.push_all.side_effect = [None, ConnectionError('Connection lost')]
+
+    with pytest.raises(ConnectionError):
+        dispatcher.dispatch_due_actions(NOW)
+
+    # The second batch was advanced but not pushed, so its advance is rolled back with it
+    assert transactions == ['begin', 'commit', 'begin', 'rollback']
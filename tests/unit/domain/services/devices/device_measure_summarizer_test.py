@@ -0,0 +1,88 @@
+import random
+from datetime import timedelta
+from typing import List
+
+import numpy as np
+import pytest
+
+from src import config
+from src.common import dates
+from src.domain.models.measure import Measure
+from src.domain.services.devices.device_measure_summarizer import DeviceMeasureSummarizer
+from tests.model_stubs.measure_stub import MeasureStub
+
+
+def legacy_summarize_measures(measures: List[Measure], time_interval: int) -> List[Measure]:
+    # Quadratic implementation used as reference of the expected semantics
+    if not measures:
+        return []
+    summarization_minutes_interval = float(time_interval) / float(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)
+    time_slices = [measures[0].timestamp + timedelta(minutes=summarization_minutes_interval * x) for x in
+                   range(config.MAX_SUMMARIZED_MEASURES_TO_SHOW)]
+    grouped_measures = []
+    ungrouped_measures = [measure for measure in measures]
+    for dt in time_slices:
+        filtered_measures = [measure for measure in ungrouped_measures if measure.timestamp <= dt]
+        if not filtered_measures:
+            continue
+        ungrouped_measures = [measure for measure in ungrouped_measures if measure not in filtered_measures]
+        grouped_measures.append(Measure(
+            timestamp=dt,
+            current=np.mean([measure.current for measure in filtered_measures]),
+            voltage=np.mean([measure.voltage for measure in filtered_measures])
+        ))
+    return grouped_measures
+
+
+def create_measures(count: int, time_interval: int, shuffle: bool) -> List[Measure]:
+    now = dates.now()
+    measures = [
+        MeasureStub(timestamp=now - timedelta(seconds=random.uniform(0, time_interval * 60 * 1.2)))
+        for _ in range(count)
+    ]
+    if not shuffle:
+        measures.sort(key=lambda x: x.timestamp)
+    return measures
+
+
+def as_tuples(measures: List[Measure]) -> list:
+    return [(x.timestamp, x._voltage, x._current) for x in measures]
+
+
+@pytest.mark.parametrize('count,time_interval,shuffle', [
+    (1, 5, False),
+    (30, 5, False),
+    (300, 10, True),
+    (1000, 60, False),
+    (1000, 7, True),
+])
+def test_summarize_measures_matches_the_reference_implementation(count, time_interval, shuffle):
+    random.seed(count + time_interval)
+    measures = create_measures(count, time_interval, shuffle)
+    expected = legacy_summarize_measures(measures, time_interval)
+    actual = DeviceMeasureSummarizer._summarize_measures(measures, time_interval)
+    assert as_tuples(actual) == as_tuples(expected)
+
+
+def test_summarize_measures_groups_measures_with_the_same_timestamp():
+    timestamp = dates.now()
+    measures = [MeasureStub(timestamp=timestamp, voltage=220.0, current=x) for x in [1.0, 2.0, 3.0]]
+    actual = DeviceMeasureSummarizer._summarize_measures(measures, 5)
+    assert as_tuples(actual) == [(timestamp, 220.0, 2.0)]
+
+
+def test_summarize_measures_returns_empty_list_when_there_are_no_measures():
+    assert DeviceMeasureSummarizer._summarize_measures([], 5) == []
+
+
+@pytest.mark.parametrize('time_interval,expected', [
+    (5, None),
+    (24, None),
+    (25, 1),
+    (374, 1),
+    (375, 15),
+    (1500, 60),
+    (10080, 60),
+])
+def test_get_rollup_resolution_returns_the_coarsest_resolution_that_fits_in_a_time_slice(time_interval, expected):
+    assert DeviceMeasureSummarizer._get_rollup_resolution(time_interval) == expected
@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.domain.exceptions.unregistered_device_exception import UnregisteredDeviceException
+from src.domain.models.scheduling.tasks.task_action import TaskAction
+from src.domain.services.devices.device_synchronizer import DeviceSynchronizer
+from tests.model_stubs.measure_stub import MeasureStub
+
+DEVICE_ID = '5c7b5ffc-90e7-1b85-f041-0595c912c905'
+USER_ID = 'f510826b-754d-f2b0-9119-87aeba06a548'
+
+
+def create_synchronizer(exists: bool = True, calls: list = None) -> DeviceSynchronizer:
+    calls = calls if calls is not None else []
+
+    def record(name: str, result=None):
+        def call(*args, **kwargs):
+            calls.append(name)
+            return result
+        return call
+
+    device_repository = MagicMock()
+    device_repository.exists_for_user.side_effect = record('ownership', exists)
+    state_modifier = MagicMock()
+    state_modifier.update.side_effect = record('state')
+    measure_aggregator = MagicMock()
+    measure_aggregator.add_measures_to_device.side_effect = record('measures')
+    puller = MagicMock()
+    puller.pull.side_effect = record('pull', TaskAction.TURN_DEVICE_OFF)
+    retriever = MagicMock()
+    retriever.get_next_scheduling_action.side_effect = record('next_action')
+
+    @contextmanager
+    def transaction():
+        calls.append('begin')
+        yield
+        calls.append('commit')
+
+    return DeviceSynchronizer(device_repository, state_modifier, measure_aggregator, puller, retriever,
+                              transaction=transaction)
+
+
+def test_sync_runs_the_whole_cycle_in_one_transaction_with_a_single_ownership_check():
+    calls = []
+    synchronizer = create_synchronizer(calls=calls)
+
+    instant_action, next_action = synchronizer.sync(DEVICE_ID, USER_ID, True, [MeasureStub()])
+
+    assert instant_action == TaskAction.TURN_DEVICE_OFF
+    assert next_action is None
+    assert calls == ['begin', 'ownership', 'state', 'measures', 'pull', 'next_action', 'commit']
+
+
+def test_sync_skips_the_state_and_the_measures_when_they_are_not_given():
+    calls = []
+    synchronizer = create_synchronizer(calls=calls)
+
+    synchronizer.sync(DEVICE_ID, USER_ID, None, [], verify_ownership=False)
+
+    assert calls == ['begin', 'pull', 'next_action', 'commit']
+
+
+def test_sync_raises_when_the_device_is_not_of_the_user():
+    calls = []
+    synchronizer = create_synchronizer(exists=False, calls=calls)
+
+    with pytest.raises(UnregisteredDeviceException):
+        synchronizer.sync(DEVICE_ID, USER_ID, True, [])
+    assert calls == ['begin', 'ownership']
@@ -0,0 +1,141 @@
+import pytest
+from psycopg2 import extensions
+
+from src.domain.exceptions.connection_pool_exhausted_exception import ConnectionPoolExhaustedException
+from src.infrastructure.database.connection_pool import ConnectionPool
+
+
+class MockedConnectionInfo:
+    def __init__(self) -> None:
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class MockedCursor:
+    def __init__(self, connection) -> None:
+        self.connection = connection
+
+    def execute(self, query: str) -> None:
+        if self.connection.broken:
+            raise Exception('Connection is broken')
+
+    def close(self) -> None:
+        pass
+
+
+class MockedConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+        self.info = MockedConnectionInfo()
+
+    def cursor(self) -> MockedCursor:
+        return MockedCursor(self)
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+def create_pool(min_size: int = 1, max_size: int = 2, checkout_timeout: float = 0.01,
+                health_check_interval: float = 30, max_idle_time: float = 300) -> ConnectionPool:
+    return ConnectionPool(min_size=min_size, max_size=max_size, checkout_timeout=checkout_timeout,
+                          health_check_interval=health_check_interval, max_idle_time=max_idle_time,
+                          connection_factory=MockedConnection)
+
+
+def test_acquire_reuses_released_connections():
+    pool = create_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_acquire_raises_exception_when_pool_is_exhausted_after_checkout_timeout():
+    pool = create_pool(max_size=1)
+    pool.acquire()
+    with pytest.raises(ConnectionPoolExhaustedException):
+        pool.acquire()
+    assert pool.stats()['waits'] == 1
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_acquire_replaces_closed_connections():
+    pool = create_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.closed = 1
+    actual = pool.acquire()
+    assert actual is not conn
+    assert pool.stats()['size'] == 1
+
+
+def test_acquire_replaces_connections_that_fail_the_health_check():
+    pool = create_pool(health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.broken = True
+    actual = pool.acquire()
+    assert actual is not conn
+    assert conn.closed
+
+
+def test_release_rollbacks_connections_left_inside_a_transaction():
+    pool = create_pool()
+    conn = pool.acquire()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.release(conn)
+    assert conn.rollbacks == 1
+
+
+def test_release_discards_connection_when_requested():
+    pool = create_pool()
+    conn = pool.acquire()
+    pool.release(conn, discard=True)
+    assert conn.closed
+    assert pool.stats()['size'] == 0
+
+
+def test_release_closes_idle_connections_above_min_size_when_they_expire():
+    pool = create_pool(min_size=1, max_size=2, max_idle_time=0)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    assert pool.stats()['size'] == 1
+    assert first.closed
+
+
+def test_warm_up_opens_min_size_connections():
+    pool = create_pool(min_size=2, max_size=4)
+    pool.warm_up()
+    assert pool.stats()['idle'] == 2
+
+
+def test_stats_returns_pool_usage_when_called():
+    pool = create_pool(min_size=0, max_size=3)
+    conn = pool.acquire()
+    pool.release(pool.acquire())
+    assert pool.stats() == {
+        'min_size': 0,
+        'max_size': 3,
+        'size': 2,
+        'in_use': 1,
+        'idle': 1,
+        'waits': 0,
+        'timeouts': 0
+    }
+    pool.release(conn)
+
+
+def test_close_closes_idle_connections_and_rejects_new_checkouts():
+    pool = create_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.close()
+    assert conn.closed
+    with pytest.raises(ConnectionPoolExhaustedException):
+        pool.acquire()
@@ -0,0 +1,35 @@
+from src.infrastructure.database.csv_copy_stream import CsvCopyStream
+
+
+def test_read_returns_all_rows_as_csv_when_size_is_not_provided():
+    stream = CsvCopyStream([('a', 1, 2.5), ('b', 3, 4.5)])
+    assert stream.read() == 'a,1,2.5\nb,3,4.5\n'
+
+
+def test_read_returns_at_most_size_characters_when_size_is_provided():
+    stream = CsvCopyStream([('device', 1)] * 3)
+    chunks = []
+    chunk = stream.read(5)
+    while chunk:
+        assert len(chunk) <= 5
+        chunks.append(chunk)
+        chunk = stream.read(5)
+    assert ''.join(chunks) == 'device,1\n' * 3
+
+
+def test_read_quotes_values_with_special_characters():
+    stream = CsvCopyStream([('a,"b"', 1)])
+    assert stream.read() == '"a,""b""",1\n'
+
+
+def test_read_renders_rows_lazily():
+    rendered_rows = []
+
+    def rows():
+        for x in range(CsvCopyStream._ROWS_PER_CHUNK * 3):
+            rendered_rows.append(x)
+            yield x,
+
+    stream = CsvCopyStream(rows())
+    stream.read(1)
+    assert len(rendered_rows) == CsvCopyStream._ROWS_PER_CHUNK
@@ -0,0 +1,112 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from psycopg2 import errors
+
+from src.infrastructure.database.measure_compactor import MeasureCompactor
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
+
+
+class MockedCursor:
+    def __init__(self, deleted_rows: list) -> None:
+        self.deleted_rows = deleted_rows
+        self.rowcount = 0
+        self.connection = self
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        if query.startswith('EXECUTE'):
+            self.rowcount = self.deleted_rows.pop(0)
+
+
+def create_compactor(deleted_rows: list, retention_days: int, rollups_retention_days: int) -> MeasureCompactor:
+    compactor = MeasureCompactor(retention_days=retention_days, rollups_retention_days=rollups_retention_days,
+                                 chunk_size=10)
+    cursor = MockedCursor(deleted_rows)
+    cursor.prepared_statements = set()
+    compactor._in_transaction = lambda run: run(cursor)
+    compactor._create_upcoming_partitions = lambda now, report: None
+    compactor._drop_expired_partitions = lambda expiration, dropped_partitions: 0
+    return compactor
+
+
+def test_run_deletes_chunks_until_a_chunk_is_not_full():
+    report = create_compactor([10, 10, 3], retention_days=30, rollups_retention_days=0).run(datetime(2021, 7, 17))
+    assert report.deleted_measures == 23
+    assert report.deleted_rollups == 0
+
+
+def test_run_deletes_rollups_when_they_have_a_retention_period():
+    report = create_compactor([10, 0], retention_days=0, rollups_retention_days=365).run(datetime(2021, 7, 17))
+    assert report.deleted_measures == 0
+    assert report.deleted_rollups == 10
+
+
+def test_run_keeps_everything_when_there_are_no_retention_periods():
+    report = create_compactor([], retention_days=0, rollups_retention_days=0).run(datetime(2021, 7, 17))
+    assert str(report).startswith('Removed 0 measures (0 dropped partitions) and 0 rollups in')
+
+
+@patch('src.infrastructure.database.measure_partition_manager.MeasurePartitionManager.get_expired_partitions',
+       new=lambda self, cursor, expiration: ['measures_2021w01', 'measures_2021w02'])
+def test_run_skips_the_locked_partitions_and_keeps_compacting():
+    errors_found = []
+    compactor = MeasureCompactor(retention_days=30, rollups_retention_days=365, chunk_size=10,
+                                 on_error=errors_found.append)
+    cursor = MockedCursor([4, 2])
+    cursor.prepared_statements = set()
+    compactor._in_transaction = lambda run: run(cursor)
+    compactor._create_upcoming_partitions = lambda now, report: None
+
+    def drop_partition(cursor, partition_name):
+        if partition_name == 'measures_2021w01':
+            raise errors.LockNotAvailable('canceling statement due to lock timeout')
+        return 7
+
+    compactor._drop_partition = drop_partition
+
+    report = compactor.run(datetime(2021, 7, 17))
+
+    assert report.skipped_partitions == ['measures_2021w01']
+    assert report.dropped_partitions == ['measures_2021w02']
+    # The rows of the skipped partition are deleted in chunks, and so are the rollups
+    assert report.deleted_measures == 11
+    assert report.deleted_rollups == 2
+    assert len(errors_found) == 1
+    assert 'Skipped the locked partitions measures_2021w01' in str(report)
+
+
+def test_run_creates_the_partitions_until_the_ones_created_in_advance():
+    created_ranges = []
+
+    def create_partitions(self, cursor, start, end):
+        created_ranges.append((start, end))
+        return ['measures_p20210712']
+
+    compactor = create_compactor([], retention_days=0, rollups_retention_days=0)
+    del compactor._create_upcoming_partitions
+    with patch('src.infrastructure.database.measure_partition_manager.MeasurePartitionManager.create_partitions',
+               new=create_partitions):
+        report = compactor.run(datetime(2021, 7, 17))
+
+    assert created_ranges == [(datetime(2021, 7, 17), MeasurePartitionManager().get_partitions_end(
+        datetime(2021, 7, 17)))]
+    assert report.created_partitions == ['measures_p20210712']
+    assert 'Created the partitions measures_p20210712' in str(report)
+
+
+def test_run_keeps_compacting_when_the_partitions_can_not_be_created_in_time():
+    errors_found = []
+    compactor = create_compactor([3], retention_days=30, rollups_retention_days=0)
+    compactor._on_error = errors_found.append
+    del compactor._create_upcoming_partitions
+
+    def create_partitions(self, cursor, start, end):
+        raise errors.LockNotAvailable('canceling statement due to lock timeout')
+
+    with patch('src.infrastructure.database.measure_partition_manager.MeasurePartitionManager.create_partitions',
+               new=create_partitions):
+        report = compactor.run(datetime(2021, 7, 17))
+
+    assert report.created_partitions == []
+    assert report.deleted_measures == 3
+    assert len(errors_found) == 1
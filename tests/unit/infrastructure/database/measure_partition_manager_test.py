@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from src.infrastructure.database.measure_partition_manager import MeasurePartitionManager
+
+
+class MockedCursor:
+    def __init__(self, partitions: list) -> None:
+        self.partitions = partitions
+        self.executed = []
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self.executed.append(query)
+
+    def fetchall(self) -> list:
+        return [
+            (name, 'DEFAULT' if start is None else f"FOR VALUES FROM ('{start}') TO ('{end}')")
+            for name, start, end in self.partitions
+        ]
+
+
+def test_get_partition_start_returns_the_monday_of_the_week_when_partitions_span_weeks():
+    manager = MeasurePartitionManager(partition_days=7)
+    assert manager.get_partition_start(datetime(2021, 7, 17, 19, 48)) == datetime(2021, 7, 12)
+
+
+def test_get_partition_start_returns_the_start_of_the_day_when_partitions_span_days():
+    manager = MeasurePartitionManager(partition_days=1)
+    assert manager.get_partition_start(datetime(2021, 7, 17, 19, 48)) == datetime(2021, 7, 17)
+
+
+def test_get_partitions_ignores_the_default_partition():
+    cursor = MockedCursor([
+        ('measures_p20210719', '2021-07-19 00:00:00', '2021-07-26 00:00:00'),
+        ('measures_default', None, None),
+        ('measures_p20210712', '2021-07-12 00:00:00', '2021-07-19 00:00:00'),
+    ])
+    assert MeasurePartitionManager(partition_days=7).get_partitions(cursor) == [
+        ('measures_p20210712', datetime(2021, 7, 12), datetime(2021, 7, 19)),
+        ('measures_p20210719', datetime(2021, 7, 19), datetime(2021, 7, 26)),
+    ]
+
+
+def test_create_partitions_only_creates_the_missing_ones():
+    cursor = MockedCursor([('measures_p20210712', '2021-07-12 00:00:00', '2021-07-19 00:00:00')])
+    manager = MeasurePartitionManager(partition_days=7)
+    actual = manager.create_partitions(cursor, datetime(2021, 7, 13), datetime(2021, 7, 27))
+    assert actual == ['measures_p20210719', 'measures_p20210726']
+
+
+def test_drop_expired_partitions_drops_the_partitions_older_than_the_retention_period():
+    cursor = MockedCursor([
+        ('measures_p20210712', '2021-07-12 00:00:00', '2021-07-19 00:00:00'),
+        ('measures_p20210719', '2021-07-19 00:00:00', '2021-07-26 00:00:00'),
+    ])
+    manager = MeasurePartitionManager(partition_days=7, retention_days=7)
+    assert manager.drop_expired_partitions(cursor, datetime(2021, 7, 27)) == ['measures_p20210712']
+    assert 'DROP TABLE measures_p20210712' in cursor.executed
+
+
+def test_drop_expired_partitions_keeps_every_partition_when_there_is_no_retention_period():
+    cursor = MockedCursor([('measures_p20210712', '2021-07-12 00:00:00', '2021-07-19 00:00:00')])
+    manager = MeasurePartitionManager(partition_days=7, retention_days=0)
+    assert manager.drop_expired_partitions(cursor, datetime(2021, 7, 27)) == []
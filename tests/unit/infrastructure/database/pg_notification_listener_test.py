@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import namedtuple
+
+import pytest
+
+from src.infrastructure.database.pg_notification_listener import PGNotificationListener
+
+Notify = namedtuple('Notify', ['pid', 'channel', 'payload'])
+
+
+class MockedConnection:
+    def __init__(self) -> None:
+        self.executed = []
+        self.notifies = []
+        self.closed = False
+        self._pending = []
+        self._read_fd, self._write_fd = os.pipe()
+
+    def set_isolation_level(self, level: int) -> None:
+        pass
+
+    def cursor(self) -> 'MockedCursor':
+        return MockedCursor(self)
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def poll(self) -> None:
+        os.read(self._read_fd, 1024)
+        self.notifies.extend(self._pending)
+        self._pending = []
+
+    def send(self, channel: str, payload: str) -> None:
+        self._pending.append(Notify(1, channel, payload))
+        os.write(self._write_fd, b'.')
+
+    def close(self) -> None:
+        self.closed = True
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+class MockedCursor:
+    def __init__(self, connection: MockedConnection) -> None:
+        self.connection = connection
+
+    def execute(self, query: str) -> None:
+        self.connection.executed.append(query)
+
+    def close(self) -> None:
+        pass
+
+
+def test_listener_hands_every_notification_payload_to_the_handler_of_its_channel():
+    connection = MockedConnection()
+    received = []
+    notified = threading.Event()
+
+    def on_notification(channel: str, payload: str) -> None:
+        received.append((channel, payload))
+        if len(received) == 3:
+            notified.set()
+
+    listener = PGNotificationListener({
+        'first_channel': lambda payload: on_notification('first_channel', payload),
+        'second_channel': lambda payload: on_notification('second_channel', payload)
+    }, connection_factory=lambda: connection, poll_interval=0.01)
+    listener.start()
+    try:
+        assert listener.wait_until_listening(1)
+        connection.send('first_channel', 'first')
+        connection.send('second_channel', 'second')
+        connection.send('first_channel', 'third')
+        assert notified.wait(1)
+    finally:
+        listener.stop(1)
+    assert received == [('first_channel', 'first'), ('second_channel', 'second'), ('first_channel', 'third')]
+    assert connection.executed == ['LISTEN first_channel', 'LISTEN second_channel']
+    assert connection.closed
+    assert not listener.is_running
+
+
+def test_listener_connects_again_after_a_failure():
+    connections = [MockedConnection()]
+    errors = []
+    connected = threading.Event()
+
+    def create_connection() -> MockedConnection:
+        if not errors:
+            raise ConnectionError()
+        return connections[0]
+
+    listener = PGNotificationListener({'channel': lambda payload: None}, on_connect=connected.set,
+                                      on_error=errors.append, connection_factory=create_connection,
+                                      poll_interval=0.01, reconnect_delay=0.01)
+    listener.start()
+    try:
+        assert connected.wait(1)
+    finally:
+        listener.stop(1)
+    assert len(errors) == 1
+    assert isinstance(errors[0], ConnectionError)
+
+
+def test_init_raises_exception_when_channel_is_not_a_valid_identifier():
+    with pytest.raises(ValueError):
+        PGNotificationListener({'channel; DROP TABLE Devices': lambda payload: None})
@@ -0,0 +1,61 @@
+import pytest
+
+from src.infrastructure.database.prepared_statement import PreparedStatement
+
+
+class MockedConnection:
+    def __init__(self) -> None:
+        self.prepared_statements = set()
+        self.executed = []
+
+    def cursor(self) -> 'MockedCursor':
+        return MockedCursor(self)
+
+
+class MockedCursor:
+    def __init__(self, connection: MockedConnection) -> None:
+        self.connection = connection
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self.connection.executed.append((query, params))
+
+    def close(self) -> None:
+        pass
+
+
+def test_params_count_returns_the_highest_positional_parameter():
+    statement = PreparedStatement('test_params_count', 'SELECT * FROM T WHERE a = $1 AND b = $2 OR c = $1')
+    assert statement.params_count == 2
+
+
+def test_execute_prepares_the_statement_only_once_per_connection():
+    statement = PreparedStatement('test_prepare_once', 'SELECT * FROM T WHERE a = $1')
+    connection = MockedConnection()
+    statement.execute(connection.cursor(), ('a',))
+    statement.execute(connection.cursor(), ('b',))
+    assert connection.executed == [
+        ('PREPARE test_prepare_once AS SELECT * FROM T WHERE a = $1', None),
+        ('EXECUTE test_prepare_once (%s)', ('a',)),
+        ('EXECUTE test_prepare_once (%s)', ('b',)),
+    ]
+
+
+def test_execute_prepares_the_statement_again_on_a_new_connection():
+    statement = PreparedStatement('test_prepare_per_connection', 'SELECT 1')
+    first_connection = MockedConnection()
+    second_connection = MockedConnection()
+    statement.execute(first_connection.cursor())
+    statement.execute(second_connection.cursor())
+    assert second_connection.executed[0] == ('PREPARE test_prepare_per_connection AS SELECT 1', None)
+
+
+def test_execute_raises_exception_when_params_do_not_match_the_query():
+    statement = PreparedStatement('test_wrong_params', 'SELECT * FROM T WHERE a = $1')
+    with pytest.raises(ValueError):
+        statement.execute(MockedConnection().cursor(), ())
+
+
+def test_init_raises_exception_when_another_statement_has_the_same_name():
+    PreparedStatement('test_duplicated_name', 'SELECT 1')
+    with pytest.raises(ValueError):
+        PreparedStatement('test_duplicated_name', 'SELECT 2')
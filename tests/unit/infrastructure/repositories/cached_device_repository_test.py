@@ -0,0 +1,71 @@
+import pytest
+
+from src.domain.models.device import Device
+from src.infrastructure.repositories.cached_device_repository import CachedDeviceRepository
+from src.infrastructure.repositories.device_pg_repository import DevicePGRepository
+
+DEVICE_ID = '5c7b5ffc-90e7-1b85-f041-0595c912c905'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    CachedDeviceRepository.get_cache().clear()
+
+
+def create_repository(exists: bool, calls: list) -> CachedDeviceRepository:
+    repository = DevicePGRepository()
+
+    def exists_for_user(device_id: str, user_id: str) -> bool:
+        calls.append((device_id, user_id))
+        return exists
+
+    def all_exist_for_user(device_ids: list, user_id: str) -> bool:
+        calls.append((sorted(device_ids), user_id))
+        return exists
+
+    repository.exists_for_user = exists_for_user
+    repository.all_exist_for_user = all_exist_for_user
+    repository.create = lambda device, user_id: None
+    return CachedDeviceRepository(repository)
+
+
+def test_exists_for_user_checks_the_repository_only_once_for_existent_devices():
+    calls = []
+    repository = create_repository(True, calls)
+    assert repository.exists_for_user(DEVICE_ID, 'user_id')
+    assert repository.exists_for_user(DEVICE_ID, 'user_id')
+    assert len(calls) == 1
+
+
+def test_exists_for_user_is_shared_between_instances():
+    calls = []
+    create_repository(True, calls).exists_for_user(DEVICE_ID, 'user_id')
+    create_repository(True, calls).exists_for_user(DEVICE_ID, 'user_id')
+    assert len(calls) == 1
+
+
+def test_create_invalidates_the_cached_ownership_of_the_device():
+    calls = []
+    repository = create_repository(False, calls)
+    assert not repository.exists_for_user(DEVICE_ID, 'user_id')
+    repository.create(Device(name='device', device_id=DEVICE_ID), 'user_id')
+    repository.exists_for_user(DEVICE_ID, 'user_id')
+    assert len(calls) == 2
+
+
+def test_all_exist_for_user_only_checks_the_devices_not_cached():
+    calls = []
+    repository = create_repository(True, calls)
+    other_device_id = '1f2e3d4c-5b6a-4798-8a7b-6c5d4e3f2a1b'
+    repository.exists_for_user(DEVICE_ID, 'user_id')
+    assert repository.all_exist_for_user([DEVICE_ID, other_device_id], 'user_id')
+    assert repository.all_exist_for_user([DEVICE_ID, other_device_id], 'user_id')
+    assert calls == [(DEVICE_ID, 'user_id'), ([other_device_id], 'user_id')]
+
+
+def test_all_exist_for_user_is_false_when_a_device_is_cached_as_inexistent():
+    calls = []
+    repository = create_repository(False, calls)
+    assert not repository.exists_for_user(DEVICE_ID, 'user_id')
+    assert not repository.all_exist_for_user([DEVICE_ID], 'user_id')
+    assert len(calls) == 1
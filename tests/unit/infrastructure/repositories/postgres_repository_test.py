@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.infrastructure.repositories.postgres_repository import PostgresRepository
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.connections = []
+
+    @contextmanager
+    def connection(self):
+        conn = MagicMock()
+        self.connections.append(conn)
+        yield conn
+
+
+@pytest.fixture
+def pool():
+    fake_pool = FakePool()
+    with patch('src.infrastructure.database.connection_pool.ConnectionPool.get_instance', return_value=fake_pool):
+        yield fake_pool
+
+
+def test_statements_run_in_a_transaction_each_outside_a_shared_transaction(pool):
+    repository = PostgresRepository()
+    repository._execute_query('SELECT 1')
+    repository._execute_query('SELECT 2')
+    assert len(pool.connections) == 2
+    assert all(x.commit.call_count == 1 for x in pool.connections)
+
+
+def test_statements_inside_a_shared_transaction_are_committed_together_on_one_connection(pool):
+    repository = PostgresRepository()
+    with PostgresRepository.shared_transaction():
+        repository._execute_query('SELECT 1')
+        with repository._transaction() as transaction:
+            repository._execute_query('SELECT 2', transaction)
+        with PostgresRepository.shared_transaction():
+            repository._execute_query('SELECT 3')
+        pool.connections[0].commit.assert_not_called()
+    assert len(pool.connections) == 1
+    pool.connections[0].commit.assert_called_once()
+    repository._execute_query('SELECT 4')
+    assert len(pool.connections) == 2
+
+
+def test_shared_transaction_is_rolled_back_when_a_statement_fails(pool):
+    repository = PostgresRepository()
+    with pytest.raises(ValueError):
+        with PostgresRepository.shared_transaction():
+            repository._execute_query('SELECT 1')
+            raise ValueError('Failed statement')
+    pool.connections[0].rollback.assert_called_once()
+    pool.connections[0].commit.assert_not_called()